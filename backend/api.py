@@ -5,56 +5,27 @@ from flask_cors import CORS
 from datetime import datetime, timedelta
 import re
 import os
-import json # JSON 모듈 추가
 
 from crawler import fetch_naver_news_for_api
+from news_cache import NewsCache
 from causal_analyzer import analyzer
 
 app = Flask(__name__)
 CORS(app)
 
 # --- 캐시 설정 ---
-# 인메모리 캐시 (서버 실행 중 사용)
-NEWS_CACHE = {}
 # 파일 기반 캐시 (서버 재시작 시 로드)
 CACHE_FILE = 'news_cache.json'
 CACHE_TTL_SECONDS = 300 # 5분 (크롤링 성공 시 갱신)
 FALLBACK_CACHE_TTL_SECONDS = 3600 * 6 # 6시간 (크롤링 실패 시 대체 캐시의 유효 기간)
+# 인메모리 캐시 (서버 실행 중 사용). 항목 수·크기 제한 LRU이며, 파일 저장은 백그라운드에서 합니다.
+NEWS_CACHE = NewsCache(CACHE_FILE, FALLBACK_CACHE_TTL_SECONDS)
 
-# --- 헬퍼 함수: 캐시 파일 로드 및 저장 ---
+# --- 헬퍼 함수: 캐시 파일 로드 ---
 def _load_cache():
-    """파일에서 캐시 데이터를 로드하여 NEWS_CACHE에 저장합니다."""
-    global NEWS_CACHE
-    if os.path.exists(CACHE_FILE):
-        try:
-            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                loaded_data = json.load(f)
-                temp_cache = {}
-                for key, (data, timestamp_str) in loaded_data.items():
-                    # JSON에 저장된 문자열 타임스탬프를 datetime 객체로 변환
-                    temp_cache[key] = (data, datetime.fromisoformat(timestamp_str))
-                NEWS_CACHE = temp_cache
-                app.logger.info(f"캐시 파일 '{CACHE_FILE}'에서 {len(NEWS_CACHE)}개의 항목 로드 성공.")
-        except (json.JSONDecodeError, FileNotFoundError, TypeError) as e:
-            app.logger.error(f"캐시 파일 로드 오류: {e}. 캐시를 초기화합니다.")
-            NEWS_CACHE = {} # 오류 발생 시 캐시 초기화
-    else:
-        app.logger.info(f"캐시 파일 '{CACHE_FILE}'을 찾을 수 없습니다. 새로운 캐시를 생성합니다.")
-        NEWS_CACHE = {}
-
-def _save_cache():
-    """NEWS_CACHE의 데이터를 파일에 저장합니다."""
-    # datetime 객체를 ISO 형식 문자열로 변환하여 저장
-    data_to_save = {}
-    for key, (data, timestamp) in NEWS_CACHE.items():
-        data_to_save[key] = (data, timestamp.isoformat())
-    
-    try:
-        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data_to_save, f, ensure_ascii=False, indent=4)
-        app.logger.info(f"캐시 데이터 {len(NEWS_CACHE)}개의 항목을 파일 '{CACHE_FILE}'에 저장 성공.")
-    except IOError as e:
-        app.logger.error(f"캐시 파일 저장 오류: {e}")
+    """파일에서 캐시 데이터를 로드하여 NEWS_CACHE에 저장합니다. 첫 조회 때도 자동으로 로드됩니다."""
+    NEWS_CACHE.load()
+    app.logger.info(f"뉴스 캐시 항목 {len(NEWS_CACHE)}개 준비 완료 (파일: '{CACHE_FILE}').")
 
 
 # --- 헬퍼 함수: 날짜 형식 통일 ---
@@ -92,9 +63,10 @@ def get_latest_news_api():
     now = datetime.now()
 
     # 1. 인메모리 캐시 확인 (서버 시작 시 파일에서 로드된 내용 포함)
-    # 유효한 캐시가 있다면 즉시 반환
-    if cache_key in NEWS_CACHE:
-        cached_data, timestamp = NEWS_CACHE[cache_key]
+    # 유효한 캐시가 있다면 즉시 반환. 대체 캐시 기간까지 지난 항목은 None으로 돌아옵니다.
+    cached = NEWS_CACHE.get(cache_key, now)
+    if cached is not None:
+        cached_data, timestamp = cached
         if now < timestamp + timedelta(seconds=CACHE_TTL_SECONDS):
             app.logger.info(f"뉴스 API: 유효한 인메모리 캐시 반환 (key: {cache_key})")
             return jsonify(cached_data)
@@ -117,16 +89,15 @@ def get_latest_news_api():
             item.pop('ai_keywords', None)
             processed_news.append(item)
 
-        # 3. 크롤링 결과 캐시에 저장 (성공한 경우에만) 및 파일에 저장
-        NEWS_CACHE[cache_key] = (processed_news, now)
-        _save_cache() # 파일에 캐시 저장
-        app.logger.info(f"뉴스 API: 캐시 업데이트 및 저장 (key: {cache_key})")
+        # 3. 크롤링 결과 캐시에 저장 (성공한 경우에만). 파일 저장은 백그라운드에서 모아서 합니다.
+        NEWS_CACHE.put(cache_key, processed_news, now)
+        app.logger.info(f"뉴스 API: 캐시 업데이트 (key: {cache_key})")
         return jsonify(processed_news)
     else: # 크롤링 실패
         app.logger.warning(f"뉴스 API: 크롤링 실패 (key: {cache_key}). 대체 캐시 확인.")
         # 4. 크롤링 실패 시, (만료되었더라도) 파일에서 로드된 기존 캐시가 있다면 반환
-        if cache_key in NEWS_CACHE:
-            cached_data, timestamp = NEWS_CACHE[cache_key]
+        if cached is not None:
+            cached_data, timestamp = cached
             # 폴백 캐시의 TTL도 고려하여 너무 오래된 것은 반환하지 않음 (선택 사항)
             if now < timestamp + timedelta(seconds=FALLBACK_CACHE_TTL_SECONDS):
                 app.logger.info(f"뉴스 API: 크롤링 실패, 만료되었지만 유효한 대체 캐시 반환 (key: {cache_key})")
@@ -0,0 +1,181 @@
+"""시세 병합 마이크로 벤치마크.
+
+10년치(약 2,500봉) 일별 시세에 대해 변경 전 세 가지 병합 함수와
+``price_merge.merge_price_records``를 비교합니다. 시나리오는 하루치 추가,
+마지막 봉 갱신, 최근 한 페이지(10봉) 재수집, 변경 없음입니다.
+
+사용법::
+
+    python benchmarks/bench_price_merge.py [연수]
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from price_merge import merge_price_records  # pylint: disable=wrong-import-position
+
+Record = Dict[str, object]
+
+
+def legacy_merge_ascending(existing: List[Record], new: List[Record]) -> Tuple[List[Record], int]:
+    """변경 전 ``daily_price_uploader.merge_prices``."""
+
+    if not new:
+        return existing, 0
+    merged: Dict[str, Record] = {}
+    for record in existing:
+        key = str(record.get("date"))
+        if key:
+            merged[key] = record
+    change_count = 0
+    for record in new:
+        key = str(record.get("date"))
+        if key not in merged or merged[key] != record:
+            merged[key] = record
+            change_count += 1
+    if change_count == 0:
+        return existing, 0
+    return sorted(merged.values(), key=lambda item: str(item.get("date", ""))), change_count
+
+
+def legacy_merge_descending(existing: List[Record], new: List[Record]) -> Tuple[List[Record], int]:
+    """변경 전 ``upload_prices.merge_prices``."""
+
+    merged: Dict[str, Record] = {}
+    for record in existing:
+        key = str(record.get("date", "")).strip()
+        if key:
+            merged[key] = record
+    change_count = 0
+    for record in new:
+        key = str(record.get("date", "")).strip()
+        if key not in merged or merged[key] != record:
+            merged[key] = record
+            change_count += 1
+    if change_count == 0:
+        return existing, 0
+    return sorted(merged.values(), key=lambda item: str(item.get("date", "")), reverse=True), change_count
+
+
+def _legacy_date_key(entry: Record) -> Tuple[int, object]:
+    for key in ("date", "tradeDate", "timestamp"):
+        if key in entry and entry[key]:
+            text = str(entry[key]).strip()
+            for fmt in ("%Y-%m-%d", "%Y.%m.%d", "%Y/%m/%d", "%Y%m%d"):
+                try:
+                    return (0, datetime.strptime(text, fmt).timestamp())
+                except ValueError:
+                    continue
+            return (1, text)
+    return (2, "")
+
+
+def legacy_merge_entries(existing: List[Record], new: List[Record]) -> Tuple[List[Record], bool]:
+    """변경 전 ``watchlist_price_refresher.merge_price_entries``."""
+
+    merged_map: Dict[Tuple[int, object], Record] = {}
+    changed = False
+    for record in existing:
+        merged_map[_legacy_date_key(record)] = dict(record)
+    for record in new:
+        key = _legacy_date_key(record)
+        merged_record = {**merged_map.get(key, {}), **record}
+        if merged_map.get(key) != merged_record:
+            merged_map[key] = merged_record
+            changed = True
+    entries = [merged_map[key] for key in sorted(merged_map, reverse=True)]
+    if not changed:
+        changed = len(entries) != len(existing) or any(a != b for a, b in zip(entries, existing))
+    return entries, changed
+
+
+def make_history(years: int) -> List[Record]:
+    """주말을 뺀 ``years``년치 오름차순 일별 시세."""
+
+    records: List[Record] = []
+    day = date(2015, 1, 2)
+    price = 10_000
+    while len(records) < years * 250:
+        if day.weekday() < 5:
+            price += (len(records) % 7) - 3
+            records.append(
+                {
+                    "date": day.isoformat(),
+                    "open": price,
+                    "high": price + 50,
+                    "low": price - 50,
+                    "close": price + 10,
+                    "volume": 100_000 + len(records),
+                }
+            )
+        day += timedelta(days=1)
+    return records
+
+
+def next_bar(last: Record) -> Record:
+    next_day = date.fromisoformat(str(last["date"])) + timedelta(days=1)
+    return {**last, "date": next_day.isoformat(), "close": int(last["close"]) + 5}  # type: ignore[call-overload]
+
+
+def scenarios(history: List[Record]) -> Dict[str, List[Record]]:
+    last = history[-1]
+    return {
+        "append 1": [next_bar(last)],
+        "update last": [{**last, "close": int(last["close"]) + 1}],  # type: ignore[call-overload]
+        "refetch 10": [dict(record) for record in reversed(history[-9:])] + [next_bar(last)],
+        "no change": [dict(record) for record in reversed(history[-10:])],
+    }
+
+
+def bench(func: Callable[[], object], number: int) -> float:
+    return min(timeit.Timer(func).repeat(repeat=5, number=number)) / number * 1000
+
+
+def main(argv: List[str]) -> int:
+    years = int(argv[0]) if argv else 10
+    ascending = make_history(years)
+    descending = list(reversed(ascending))
+    number = 50
+
+    print(f"{len(ascending)} bars ({years} years)")
+    print(f"{'scenario':<14}{'merge':<22}{'legacy ms':>11}{'kernel ms':>11}{'speedup':>9}")
+    for label, new in scenarios(ascending).items():
+        cases: List[Tuple[str, Callable[[], object], Callable[[], object]]] = [
+            (
+                "uploader (asc)",
+                lambda: legacy_merge_ascending(ascending, new),
+                lambda: merge_price_records(ascending, new),
+            ),
+            (
+                "upload_prices (desc)",
+                lambda: legacy_merge_descending(descending, new),
+                lambda: merge_price_records(descending, new, descending=True),
+            ),
+            (
+                "refresher (overlay)",
+                lambda: legacy_merge_entries(descending, new),
+                lambda: merge_price_records(
+                    descending, new, descending=True, overlay=True, fields=("date", "tradeDate", "timestamp")
+                ),
+            ),
+        ]
+        for name, legacy, kernel in cases:
+            expected, result = legacy(), kernel()
+            if list(expected[0]) != list(result[0]) or bool(expected[1]) != bool(result[1]):  # type: ignore[index]
+                print(f"  ! {label}/{name}: 병합 결과가 기존 구현과 다릅니다.")
+            legacy_ms = bench(legacy, number)
+            kernel_ms = bench(kernel, number)
+            print(f"{label:<14}{name:<22}{legacy_ms:>11.3f}{kernel_ms:>11.3f}{legacy_ms / kernel_ms:>8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
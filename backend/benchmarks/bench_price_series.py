@@ -0,0 +1,70 @@
+"""``PriceSeries`` 메모리·조회 벤치마크.
+
+같은 일별 시세를 dict 목록과 ``PriceSeries``로 들고 있을 때의 메모리 사용량과,
+날짜 조회·Firestore 형식 변환 시간을 비교합니다.
+
+사용법::
+
+    python benchmarks/bench_price_series.py [연수] [종목 수]
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_price_merge import make_history  # pylint: disable=wrong-import-position
+from price_series import PriceSeries  # pylint: disable=wrong-import-position
+
+
+def allocated(build: Callable[[], object]) -> tuple[object, int]:
+    """``build``가 만든 객체와 그 과정에서 남은 메모리(byte)를 반환합니다."""
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    value = build()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, after - before
+
+
+def main(argv: List[str]) -> int:
+    years = int(argv[0]) if argv else 1
+    tickers = int(argv[1]) if len(argv) > 1 else 200
+    template = make_history(years)
+
+    # Firestore에서 읽은 것처럼 종목마다 새 dict와 문자열을 만듭니다.
+    records, records_bytes = allocated(
+        lambda: [[{**bar, "date": str(bar["date"]).encode().decode()} for bar in template] for _ in range(tickers)]
+    )
+    series, series_bytes = allocated(lambda: [PriceSeries.from_records(rows) for rows in records])  # type: ignore[attr-defined]
+
+    bars = len(template)
+    print(f"{tickers} tickers x {bars} bars")
+    print(f"{'layout':<14}{'total MiB':>11}{'bytes/bar':>11}")
+    print(f"{'dict list':<14}{records_bytes / 2**20:>11.1f}{records_bytes / (tickers * bars):>11.1f}")
+    print(f"{'PriceSeries':<14}{series_bytes / 2**20:>11.1f}{series_bytes / (tickers * bars):>11.1f}")
+
+    sample_records = records[0]  # type: ignore[index]
+    sample = series[0]  # type: ignore[index]
+    target = sample_records[bars // 3]["date"]
+    for label, func in [
+        ("lookup dict (scan)", lambda: next(i for i, r in enumerate(sample_records) if r["date"] == target)),
+        ("lookup series", lambda: sample.index_of(target)),
+        ("from_records", lambda: PriceSeries.from_records(sample_records)),
+        ("to_records", lambda: sample.to_records()),
+    ]:
+        elapsed = min(timeit.Timer(func).repeat(repeat=5, number=50)) / 50 * 1000
+        print(f"{label:<22}{elapsed:>9.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,114 @@
+"""sise_day 파서 마이크로 벤치마크.
+
+기존 BeautifulSoup(html.parser) 경로와 ``naver_sise_parser.parse_sise_day``를
+저장된 페이지에 대해 비교해 페이지당 파싱 시간과 메모리 할당량을 출력합니다.
+
+사용법::
+
+    python benchmarks/bench_sise_parser.py [HTML 파일 ...]
+
+파일을 지정하지 않으면 ``benchmarks/fixtures/*.html``을 사용합니다. 실제 페이지는
+``https://finance.naver.com/item/sise_day.naver?code=<종목코드>&page=<n>`` 응답을
+UTF-8로 저장해 추가하면 됩니다.
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from naver_sise_parser import parse_sise_day, rows_to_records  # pylint: disable=wrong-import-position
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:  # pragma: no cover - 비교 대상 없이도 실행할 수 있게 합니다.
+    BeautifulSoup = None  # type: ignore
+
+
+def parse_with_bs4(html: str) -> List[Dict[str, int | str]]:
+    """변경 전 ``scrape_daily_prices``의 파싱 로직."""
+
+    soup = BeautifulSoup(html, "html.parser")
+    prices: List[Dict[str, int | str]] = []
+    for row in soup.select("table.type2 > tr[onmouseover]"):
+        cols = row.find_all("td")
+        if len(cols) < 7:
+            continue
+        date_str = cols[0].get_text(strip=True)
+        if not date_str:
+            continue
+        try:
+            prices.append(
+                {
+                    "date": date_str.replace(".", "-"),
+                    "close": int(cols[1].get_text(strip=True).replace(",", "")),
+                    "open": int(cols[3].get_text(strip=True).replace(",", "")),
+                    "high": int(cols[4].get_text(strip=True).replace(",", "")),
+                    "low": int(cols[5].get_text(strip=True).replace(",", "")),
+                    "volume": int(cols[6].get_text(strip=True).replace(",", "")),
+                }
+            )
+        except ValueError:
+            continue
+    return prices
+
+
+def parse_fast(html: str) -> List[Dict[str, int | str]]:
+    return rows_to_records(parse_sise_day(html))
+
+
+def measure(func: Callable[[str], object], html: str, repeat: int) -> tuple[float, int, int]:
+    """(페이지당 평균 시간[ms], 페이지당 할당 블록 수, 최대 사용 메모리[byte])를 반환합니다."""
+
+    timer = timeit.Timer(lambda: func(html))
+    best = min(timer.repeat(repeat=5, number=repeat)) / repeat
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    func(html)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    return best * 1000, blocks, peak
+
+
+def main(argv: List[str]) -> int:
+    paths = [Path(arg) for arg in argv] or sorted((BENCH_DIR / "fixtures").glob("*.html"))
+    if not paths:
+        print("벤치마크할 HTML 파일이 없습니다.")
+        return 1
+
+    parsers: Dict[str, Callable[[str], object]] = {"fast": parse_fast}
+    if BeautifulSoup is not None:
+        parsers = {"bs4": parse_with_bs4, **parsers}
+    else:
+        print("beautifulsoup4가 설치되어 있지 않아 기존 경로 비교는 생략합니다.")
+
+    print(f"{'file':<28}{'parser':<8}{'rows':>6}{'ms/page':>10}{'blocks':>10}{'peak KiB':>10}")
+    for path in paths:
+        html = path.read_text(encoding="utf-8")
+        expected = None
+        for label, func in parsers.items():
+            records = func(html)
+            if expected is None:
+                expected = records
+            elif records != expected:
+                print(f"  ! {path.name}: {label} 결과가 기준 파서와 다릅니다.")
+            elapsed_ms, blocks, peak = measure(func, html, repeat=200)
+            print(
+                f"{path.name:<28}{label:<8}{len(records):>6}"
+                f"{elapsed_ms:>10.3f}{blocks:>10}{peak / 1024:>10.1f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
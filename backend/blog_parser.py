@@ -5,6 +5,7 @@ import time
 import urllib.parse
 import requests
 from bs4 import BeautifulSoup
+import http_client
 # 💡 수정: constants.py에서 DEFAULT_HEADERS 임포트 (상대 경로 제거)
 from constants import DEFAULT_HEADERS 
 
@@ -132,7 +133,7 @@ def get_blog_post_content(post_url: str) -> str:
     headers = DEFAULT_HEADERS.copy()
 
     try:
-        response = requests.get(post_url, headers=headers, timeout=15)
+        response = http_client.get(post_url, headers=headers, timeout=15)
         response.raise_for_status() # HTTP 오류가 발생하면 예외 발생
         response.encoding = response.apparent_encoding # 인코딩 자동 감지
         main_soup = BeautifulSoup(response.text, 'html.parser')
@@ -151,7 +152,7 @@ def get_blog_post_content(post_url: str) -> str:
             time.sleep(0.5) # iframe 요청 전 딜레이 (과도한 요청 방지)
             iframe_headers = headers.copy()
             iframe_headers['Referer'] = post_url # Referer 헤더 추가 (일부 사이트에서 필요)
-            iframe_response = requests.get(iframe_src, headers=iframe_headers, timeout=15)
+            iframe_response = http_client.get(iframe_src, headers=iframe_headers, timeout=15)
             iframe_response.raise_for_status()
             iframe_response.encoding = iframe_response.apparent_encoding
             content_soup = BeautifulSoup(iframe_response.text, 'html.parser')
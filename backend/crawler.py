@@ -8,12 +8,12 @@ import random
 import os
 
 from constants import DEFAULT_HEADERS
+import http_client
 # from blog_parser import get_blog_post_content, _clean_and_filter_text_from_elements # GUI용이므로 주석 처리
 # from news_parser import extract_general_news_text, get_health_chosun_article_content # GUI용이므로 주석 처리
 
-# 💡 추가: requests.Session 객체 생성 (모든 요청에 재사용)
-session = requests.Session()
-session.headers.update(DEFAULT_HEADERS) # 기본 헤더를 세션에 적용
+# 모든 요청은 http_client의 공유 세션(연결 풀, 재시도 포함)을 재사용합니다.
+session = http_client.get_client().session
 
 # 뉴스 아이템 파싱 로직을 헬퍼 함수로 분리
 def _parse_single_naver_news_item(item_soup, search_url):
@@ -164,7 +164,7 @@ def scrape_content_for_gui(keyword, num_posts, fetch_content, status_callback, i
 
     try:
         # GUI 용에서는 verify=False를 유지 (로컬 환경 등의 SSL 문제 가능성)
-        search_response = requests.get(search_url, headers=headers, verify=False, timeout=10)
+        search_response = http_client.get(search_url, headers=headers, verify=False, timeout=10)
         search_response.raise_for_status()
 
         if search_type == "health_chosun_food":
@@ -390,7 +390,7 @@ def fetch_naver_news_for_api(keyword, num_items):
         }
 
         try:
-            resp = requests.get(api_url, headers=headers, params=params, timeout=10)
+            resp = http_client.get(api_url, headers=headers, params=params, timeout=10)
             resp.raise_for_status()
             items = resp.json().get("items", [])
         except requests.RequestException as e:
@@ -2,31 +2,113 @@
 
 from __future__ import annotations
 
+import argparse
 import json
 import logging
 import os
 import sys
-import time
-from datetime import date, datetime
+from bisect import bisect_left, bisect_right
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Dict, Iterable, List
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence
 
-import pandas as pd
 import requests
-from bs4 import BeautifulSoup
 import holidays
 import firebase_admin
 from firebase_admin import credentials, firestore
 
+import http_client
+from firestore_writer import FirestoreWriteSink
+from freshness_ledger import FreshnessLedger, latest_bar, open_ledger
+from naver_sise_parser import parse_sise_day, parse_sise_json, rows_to_records
+from price_merge import MergeResult, merge_price_records
+from price_storage import (
+    HEAD_SUMMARY_FIELDS,
+    PRICE_STORAGE_MODE,
+    STORAGE_MODE_CHUNKED,
+    plan_chunked_update,
+)
+from rate_limiter import AdaptiveRateLimiter, HostRateLimiter
+from scrape_checkpoint import ScrapeCheckpoint, filter_shard, parse_shard
+from scrape_pipeline import ParseStage, StageTimings, WriterStage
+from stock_universe import DEFAULT_STOCK_LIST_FILE, load_stock_universe
+
 LOGGER = logging.getLogger(__name__)
 logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
 
 DEFAULT_PAGES_TO_SCRAPE = int(os.getenv("PAGES_TO_SCRAPE", "1"))
 DEFAULT_DELAY_SECONDS = float(os.getenv("SCRAPE_DELAY_SECONDS", "0.3"))
+SCRAPE_CONCURRENCY = max(1, int(os.getenv("SCRAPE_CONCURRENCY", "8")))
+# 과거 시세 수집 경로: "sise_day"(페이지당 10행 HTML) 또는 "chart"(siseJson 일괄 응답)
+PRICE_HISTORY_SOURCE = os.getenv("PRICE_HISTORY_SOURCE", "sise_day").strip().lower()
+# sise_day 한 페이지(10거래일)에 해당하는 달력 일수. 주말과 공휴일을 감안해 넉넉히 잡습니다.
+CHART_CALENDAR_DAYS_PER_PAGE = 15
+NAVER_FINANCE_HOST = "finance.naver.com"
+NAVER_CHART_HOST = "api.finance.naver.com"
+# 기존 페이지 간 지연(SCRAPE_DELAY_SECONDS)과 같은 초당 요청 수를 전체 작업자가 나눠 씁니다.
+NAVER_REQUESTS_PER_SECOND = float(
+    os.getenv("NAVER_REQUESTS_PER_SECOND", str(1 / max(DEFAULT_DELAY_SECONDS, 0.01)))
+)
+# 적응형 속도 조절(AIMD)을 켜면 위 값은 시작 속도로만 쓰이고 아래 범위 안에서 조절됩니다.
+# 최대 속도가 설정한 요청 한도를 넘을 수 있으므로, 정기 실행은 고정 속도를 유지하고
+# 일회성 대량 수집(manual-bulk-scrape.yml)에서만 켭니다.
+ADAPTIVE_PACING = os.getenv("ADAPTIVE_PACING", "0").strip().lower() not in {"0", "false", "no"}
+NAVER_MIN_REQUESTS_PER_SECOND = float(os.getenv("NAVER_MIN_REQUESTS_PER_SECOND", "0.5"))
+NAVER_MAX_REQUESTS_PER_SECOND = float(os.getenv("NAVER_MAX_REQUESTS_PER_SECOND", "20"))
 PORTFOLIO_COLLECTION = os.getenv("PORTFOLIO_COLLECTION", "portfolioStocks")
+STOCK_PRICE_COLLECTION = os.getenv("STOCK_PRICE_COLLECTION", "stock_prices")
+PREFETCH_CHUNK_SIZE = max(1, int(os.getenv("FIRESTORE_PREFETCH_CHUNK_SIZE", "100")))
+# 업로드 시 병합에 필요한 필드만 읽어 오도록 제한합니다.
+UPLOAD_FIELD_MASK = ["prices", "name", "ticker", "hasFullHistory", "gapsCheckedThrough", *HEAD_SUMMARY_FIELDS]
 PORTFOLIO_INITIAL_PAGES = int(os.getenv("PORTFOLIO_INITIAL_PAGES", "10"))
-SCRIPT_DIR = Path(__file__).resolve().parent
-DEFAULT_STOCK_LIST_FILE = os.getenv("STOCK_LIST_FILE", str(SCRIPT_DIR / "stock_list.xlsx"))
+# 저장된 최신 날짜에 도달하면 페이지 수집을 멈춥니다. "0"으로 두면 항상 지정한 페이지를 모두 읽습니다.
+INCREMENTAL_SCRAPE = os.getenv("INCREMENTAL_SCRAPE", "1").strip().lower() not in {"0", "false", "no"}
+INCREMENTAL_GAP_LOOKBACK_BARS = int(os.getenv("INCREMENTAL_GAP_LOOKBACK_BARS", "30"))
+# 실제 거래일 달력으로 쓸 기준 종목. 거래 정지가 거의 없는 대형주의 저장된 봉 날짜를 씁니다.
+TRADING_CALENDAR_TICKER = os.getenv("TRADING_CALENDAR_TICKER", "005930").strip()
+# 새 봉이 끝에 붙기만 하면 배열 전체 대신 새 봉만 보냅니다.
+DELTA_WRITES = os.getenv("DELTA_WRITES", "1").strip().lower() not in {"0", "false", "no"}
+# 0이면 내려받은 스레드에서 바로 파싱하고, 1 이상이면 그 수만큼 파싱 전용 프로세스를 띄웁니다.
+PARSE_WORKERS = max(0, int(os.getenv("PARSE_WORKERS", "0")))
+PARSE_MAX_PENDING = max(1, int(os.getenv("PARSE_MAX_PENDING", str(max(PARSE_WORKERS, 1) * 2))))
+WRITE_QUEUE_SIZE = max(1, int(os.getenv("WRITE_QUEUE_SIZE", str(SCRAPE_CONCURRENCY * 2))))
+
+RATE_LIMITER: HostRateLimiter = (
+    AdaptiveRateLimiter(
+        NAVER_REQUESTS_PER_SECOND,
+        min_rate=NAVER_MIN_REQUESTS_PER_SECOND,
+        max_rate=NAVER_MAX_REQUESTS_PER_SECOND,
+    )
+    if ADAPTIVE_PACING
+    else HostRateLimiter(NAVER_REQUESTS_PER_SECOND)
+)
+STAGE_TIMINGS = StageTimings()
+INLINE_PARSER = ParseStage(timings=STAGE_TIMINGS)
+NAVER_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    )
+}
+
+
+class PriceFetchError(RuntimeError):
+    """시세 요청이 실패해 종목의 수집 결과를 믿을 수 없을 때 발생합니다."""
+
+
+@lru_cache(maxsize=None)
+def _korean_holidays(year: int) -> holidays.HolidayBase:
+    """연도별 대한민국 공휴일 목록을 한 번만 생성해 재사용합니다."""
+
+    return holidays.KR(years=year)
+
+
+# 공휴일은 아니지만 한국거래소가 쉬는 날(월, 일): 근로자의 날, 연말 휴장일.
+KRX_EXTRA_CLOSURES = {(5, 1), (12, 31)}
 
 
 def is_korean_trading_day(target_date: date | None = None) -> bool:
@@ -39,14 +121,97 @@ def is_korean_trading_day(target_date: date | None = None) -> bool:
     if target_date.weekday() >= 5:
         return False
 
-    # 대한민국 공휴일(대체공휴일 포함) 여부를 검사합니다.
-    korea_holidays = holidays.KR(years=target_date.year)
-    if target_date in korea_holidays:
+    # 대한민국 공휴일(대체공휴일 포함)과 거래소 자체 휴장일 여부를 검사합니다.
+    if target_date in _korean_holidays(target_date.year):
+        return False
+    if (target_date.month, target_date.day) in KRX_EXTRA_CLOSURES:
         return False
 
     return True
 
 
+def has_trading_day_between(older: date, newer: date) -> bool:
+    """두 날짜 사이(양 끝 제외)에 거래일이 하루라도 있는지 확인합니다."""
+
+    current = older + timedelta(days=1)
+    while current < newer:
+        if is_korean_trading_day(current):
+            return True
+        current += timedelta(days=1)
+    return False
+
+
+def load_trading_calendar(
+    db: firestore.Client,
+    ticker: str = TRADING_CALENDAR_TICKER,
+) -> List[str]:
+    """기준 종목의 저장된 봉 날짜(YYYY-MM-DD)를 실제 거래일 달력으로 읽습니다.
+
+    임시 휴장처럼 공휴일 목록에 없는 휴장일도 반영됩니다. 읽지 못하면 빈 목록이며,
+    그때는 공휴일 기준으로 판단합니다.
+    """
+
+    if not ticker:
+        return []
+    try:
+        snapshot = db.collection(STOCK_PRICE_COLLECTION).document(ticker).get(field_paths=["prices"])
+    except Exception:  # pylint: disable=broad-except
+        LOGGER.warning("거래일 달력 기준 종목 %s을 읽지 못했습니다.", ticker, exc_info=True)
+        return []
+    prices = (snapshot.to_dict() or {}).get("prices") if snapshot.exists else None
+    calendar = sorted({str(record.get("date", "")) for record in prices or [] if record.get("date")})
+    LOGGER.info("기준 종목 %s의 거래일 %d일을 달력으로 씁니다.", ticker, len(calendar))
+    return calendar
+
+
+def _has_gap(older: str, newer: str, calendar: Sequence[str] | None) -> bool:
+    if calendar and calendar[0] <= older and newer <= calendar[-1]:
+        # 달력이 구간을 덮으면 두 날짜 사이에 실제 거래일이 있었는지만 봅니다.
+        return bisect_left(calendar, newer) - bisect_right(calendar, older) > 0
+    return has_trading_day_between(date.fromisoformat(older), date.fromisoformat(newer))
+
+
+def find_resume_date(
+    existing_prices: Iterable[Dict[str, object]] | None,
+    lookback_bars: int = INCREMENTAL_GAP_LOOKBACK_BARS,
+    calendar: Sequence[str] | None = None,
+    checked_through: object = None,
+) -> str | None:
+    """증분 수집을 멈춰도 되는 기준 날짜(YYYY-MM-DD)를 계산합니다.
+
+    최근 ``lookback_bars``개 봉 안에 빠진 거래일이 있으면 가장 오래된 빈 구간의
+    직전 날짜를, 없으면 저장된 최신 날짜를 반환합니다. 저장된 데이터가 없으면
+    ``None``을 반환해 전체 페이지를 수집하게 합니다.
+
+    ``calendar``(``load_trading_calendar``)가 구간을 덮으면 실제 거래일과 비교하고, 아니면
+    공휴일 기준으로 판단합니다. ``checked_through`` 이전의 빈 구간은 이미 다시 수집해
+    보고도 봉이 없던 구간(거래 정지 등)이므로 건너뜁니다.
+    """
+
+    dates = sorted(
+        {
+            text
+            for text in (str(record.get("date", "")) for record in existing_prices or [])
+            if len(text) == 10 and text[4] == "-" and text[7] == "-"
+        }
+    )
+    if not dates:
+        return None
+
+    recent = dates[-max(lookback_bars, 1):]
+    checked = str(checked_through or "")
+    try:
+        for index in range(1, len(recent)):
+            if recent[index] <= checked:
+                continue
+            if _has_gap(recent[index - 1], recent[index], calendar):
+                return recent[index - 1]
+    except ValueError:
+        return recent[-1]
+
+    return recent[-1]
+
+
 def initialize_firestore() -> firestore.Client:
     """환경 변수 또는 파일에서 서비스 계정 키를 읽어 Firestore 클라이언트를 생성합니다."""
 
@@ -77,94 +242,182 @@ def initialize_firestore() -> firestore.Client:
     return firestore.client()
 
 
-def scrape_daily_prices(ticker: str, pages_to_scrape: int = DEFAULT_PAGES_TO_SCRAPE) -> List[Dict[str, int | str]]:
-    """주어진 종목 코드를 대상으로 페이지 수만큼 일별 시세를 수집합니다."""
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    """이터러블을 ``size`` 크기의 리스트 묶음으로 나눕니다."""
 
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0.0.0 Safari/537.36"
-        )
-    }
-    session = requests.Session()
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def prefetch_documents(
+    db: firestore.Client,
+    collection: str,
+    doc_ids: Sequence[str],
+    field_paths: Sequence[str] | None = None,
+    chunk_size: int = PREFETCH_CHUNK_SIZE,
+) -> Dict[str, Dict[str, object] | None]:
+    """여러 문서를 ``get_all`` 묶음 호출로 미리 읽어 {문서 ID: 데이터} 형태로 반환합니다.
+
+    존재하지 않는 문서는 ``None``으로 채우고, 조회에 실패한 묶음의 문서는 결과에서
+    제외해 호출 측이 개별 조회로 대체할 수 있게 합니다.
+    """
+
+    collection_ref = db.collection(collection)
+    results: Dict[str, Dict[str, object] | None] = {}
+    for chunk in chunked(dict.fromkeys(doc_ids), chunk_size):
+        refs = [collection_ref.document(doc_id) for doc_id in chunk]
+        try:
+            for snapshot in db.get_all(refs, field_paths=field_paths):
+                results[snapshot.id] = (snapshot.to_dict() or {}) if snapshot.exists else None
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.exception("%s 컬렉션 문서 %d건을 미리 읽지 못했습니다.", collection, len(chunk))
+    return results
+
+
+def scrape_daily_prices(
+    ticker: str,
+    pages_to_scrape: int = DEFAULT_PAGES_TO_SCRAPE,
+    stop_at_date: str | None = None,
+    parser: ParseStage | None = None,
+) -> List[Dict[str, int | str]]:
+    """주어진 종목 코드를 대상으로 페이지 수만큼 일별 시세를 수집합니다.
+
+    ``stop_at_date``(YYYY-MM-DD)가 주어지면 해당 날짜 이전(포함) 행이 나온 페이지까지만
+    읽고 멈춥니다. 기준 날짜의 봉도 결과에 포함되므로 장중에 저장된 봉은 갱신됩니다.
+    ``parser``가 주어지면 응답 파싱을 해당 단계(프로세스 풀 등)에 맡깁니다.
+
+    페이지 요청이 실패하면 일부만 모은 결과를 "새 데이터 없음"으로 오해하지 않도록
+    ``PriceFetchError``를 발생시킵니다.
+    """
+
+    parser = parser or INLINE_PARSER
     prices: List[Dict[str, int | str]] = []
 
     for page in range(1, pages_to_scrape + 1):
-        url = f"https://finance.naver.com/item/sise_day.naver?code={ticker}&page={page}"
+        url = f"https://{NAVER_FINANCE_HOST}/item/sise_day.naver?code={ticker}&page={page}"
         try:
-            response = session.get(url, headers=headers, timeout=10)
+            with STAGE_TIMINGS.measure("fetch"):
+                response = http_client.get(url, headers=NAVER_HEADERS, rate_limiter=RATE_LIMITER)
             response.raise_for_status()
         except requests.RequestException as exc:
-            LOGGER.warning("%s 종목 %d페이지 요청 중 오류 발생: %s", ticker, page, exc)
+            raise PriceFetchError(f"{ticker} 종목 {page}페이지 요청 중 오류 발생: {exc}") from exc
+
+        rows = parser(parse_sise_day, response.text)
+        if not rows:
             break
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        data_rows = soup.select("table.type2 > tr[onmouseover]")
-        if not data_rows:
+        prices.extend(rows_to_records(rows))
+
+        if stop_at_date and prices and str(prices[-1]["date"]) <= stop_at_date:
+            LOGGER.debug("%s 종목: %s 이전 데이터에 도달해 %d페이지에서 수집을 멈춥니다.", ticker, stop_at_date, page)
             break
 
-        for row in data_rows:
-            cols = row.find_all("td")
-            if len(cols) < 7:
-                continue
+    return prices
 
-            date_str = cols[0].get_text(strip=True)
-            if not date_str:
-                continue
 
-            try:
-                prices.append(
-                    {
-                        "date": date_str.replace(".", "-"),
-                        "close": int(cols[1].get_text(strip=True).replace(",", "")),
-                        "open": int(cols[3].get_text(strip=True).replace(",", "")),
-                        "high": int(cols[4].get_text(strip=True).replace(",", "")),
-                        "low": int(cols[5].get_text(strip=True).replace(",", "")),
-                        "volume": int(cols[6].get_text(strip=True).replace(",", "")),
-                    }
-                )
-            except ValueError:
-                LOGGER.debug("%s 종목 데이터 파싱 실패: %s", ticker, row)
-                continue
+def fetch_chart_prices(
+    ticker: str,
+    pages_to_scrape: int = DEFAULT_PAGES_TO_SCRAPE,
+    stop_at_date: str | None = None,
+    parser: ParseStage | None = None,
+) -> List[Dict[str, int | str]]:
+    """네이버 siseJson 차트 응답 한 번으로 ``pages_to_scrape`` 페이지 분량의 일별 시세를 수집합니다.
+
+    결과 형식과 정렬(최신순)은 ``scrape_daily_prices``와 같습니다. ``stop_at_date``가
+    주어지면 해당 날짜부터만 요청합니다. 요청이 실패하면 ``PriceFetchError``를 발생시킵니다.
+    """
+
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=pages_to_scrape * CHART_CALENDAR_DAYS_PER_PAGE)
+    if stop_at_date:
+        try:
+            start_date = max(start_date, date.fromisoformat(stop_at_date))
+        except ValueError:
+            pass
+
+    params = {
+        "symbol": ticker,
+        "requestType": "1",
+        "startTime": start_date.strftime("%Y%m%d"),
+        "endTime": end_date.strftime("%Y%m%d"),
+        "timeframe": "day",
+    }
 
-        time.sleep(DEFAULT_DELAY_SECONDS)
+    try:
+        with STAGE_TIMINGS.measure("fetch"):
+            response = http_client.get(
+                f"https://{NAVER_CHART_HOST}/siseJson.naver",
+                params=params,
+                headers=NAVER_HEADERS,
+                rate_limiter=RATE_LIMITER,
+            )
+        response.raise_for_status()
+    except requests.RequestException as exc:
+        raise PriceFetchError(f"{ticker} 종목 차트 데이터 요청 중 오류 발생: {exc}") from exc
+
+    rows = (parser or INLINE_PARSER)(parse_sise_json, response.text)
+    rows.reverse()
+    return rows_to_records(rows)
+
+
+def fetch_price_history(
+    ticker: str,
+    pages_to_scrape: int = DEFAULT_PAGES_TO_SCRAPE,
+    stop_at_date: str | None = None,
+    parser: ParseStage | None = None,
+) -> List[Dict[str, int | str]]:
+    """``PRICE_HISTORY_SOURCE`` 설정에 따라 일별 시세 수집 경로를 선택합니다."""
 
-    return prices
+    if PRICE_HISTORY_SOURCE == "chart":
+        return fetch_chart_prices(ticker, pages_to_scrape, stop_at_date=stop_at_date, parser=parser)
+    return scrape_daily_prices(ticker, pages_to_scrape, stop_at_date=stop_at_date, parser=parser)
 
 
 def merge_prices(
     existing_prices: List[Dict[str, int | str]],
     new_prices: List[Dict[str, int | str]],
 ) -> tuple[List[Dict[str, int | str]], int]:
-    """기존 데이터와 신규 데이터를 합쳐 날짜 기준으로 정렬하고 변경 수를 반환합니다."""
+    """기존 데이터와 신규 데이터를 합쳐 날짜 오름차순으로 정렬하고 변경 수를 반환합니다."""
 
-    if not new_prices:
+    result = merge_price_records(existing_prices, new_prices)
+    if not result.changed:
         return existing_prices, 0
+    return result.records, result.changed  # type: ignore[return-value]
 
-    merged: Dict[str, Dict[str, int | str]] = {}
-    for record in existing_prices:
-        date_key = str(record.get("date"))
-        if date_key:
-            merged[date_key] = record
-
-    change_count = 0
-    for record in new_prices:
-        date_key = str(record.get("date"))
-        if not date_key:
-            continue
-        if date_key not in merged:
-            merged[date_key] = record
-            change_count += 1
-        elif merged[date_key] != record:
-            merged[date_key] = record
-            change_count += 1
-
-    if change_count == 0:
-        return existing_prices, 0
 
-    sorted_records = sorted(merged.values(), key=lambda item: str(item.get("date", "")))
-    return sorted_records, change_count
+def plan_price_delta(
+    existing_prices: List[Dict[str, int | str]],
+    result: MergeResult,
+) -> tuple[List[Dict[str, int | str]], List[Dict[str, int | str]]] | None:
+    """병합 결과를 배열 원소 단위 쓰기로 표현할 수 있으면 (제거할 봉, 덧붙일 봉)을 반환합니다.
+
+    저장된 목록이 오름차순이고 새 봉이 모두 끝에 붙기만 했거나, 마지막 봉 하나만 바뀌고
+    나머지가 끝에 붙은 경우에만 해당합니다. 병합 커널은 바뀌지 않은 봉을 같은 객체로
+    유지하므로 동일성 비교만으로 판단합니다. 그 밖의 경우는 ``None``(전체 재작성)입니다.
+    """
+
+    merged = result.records
+    count = len(existing_prices)
+    if result.reordered or not result.changed or not count:
+        return None
+
+    inserted = len(merged) - count
+    if result.changed == inserted and merged[count - 1] is existing_prices[count - 1]:
+        return [], merged[count:]  # type: ignore[return-value]
+
+    last = existing_prices[count - 1]
+    if (
+        result.changed == inserted + 1
+        and merged[count - 1] is not last
+        and merged[count - 1].get("date") == last.get("date")
+        and (count == 1 or merged[count - 2] is existing_prices[count - 2])
+    ):
+        return [last], merged[count - 1:]  # type: ignore[return-value]
+    return None
 
 
 def upload_to_firestore(
@@ -174,21 +427,65 @@ def upload_to_firestore(
     new_prices: List[Dict[str, int | str]],
     existing_data: Dict[str, object] | None,
     mark_full_history: bool,
-) -> None:
-    """수집된 주가 데이터를 Firestore에 병합 저장합니다."""
+    writer: FirestoreWriteSink | None = None,
+    db: firestore.Client | None = None,
+    ledger: FreshnessLedger | None = None,
+    gaps_checked_through: str | None = None,
+) -> bool:
+    """수집된 주가 데이터를 Firestore에 병합 저장하고 쓰기가 발생했는지 반환합니다.
+
+    ``writer``가 주어지면 쓰기를 대기열에 넣고 바로 반환합니다. ``PRICE_STORAGE_MODE``가
+    ``chunked``이고 ``db``가 주어지면 바뀐 연도 문서와 헤드 문서만 씁니다. ``ledger``가
+    주어지면 쓴 종목의 최신 봉을 신선도 장부에 기록합니다. ``gaps_checked_through``가
+    주어지면 그 날짜까지의 빈 구간은 다시 수집해 확인했다고 ``gapsCheckedThrough``에 남깁니다.
+
+    단일 배열 방식에서 새 봉이 끝에 덧붙기만 하면 ``ArrayUnion``으로 새 봉만 보내고,
+    마지막 봉이 바뀌었으면 ``ArrayRemove``와 ``ArrayUnion``을 한 배치로 보냅니다.
+    """
 
     existing_data = existing_data or {}
-    existing_prices: List[Dict[str, int | str]] = list(existing_data.get("prices", []))  # type: ignore[arg-type]
-
-    merged_prices, change_count = merge_prices(existing_prices, new_prices)
+    existing_prices: List[Dict[str, int | str]] = existing_data.get("prices") or []  # type: ignore[assignment]
+
+    year_writes: List[tuple[firestore.DocumentReference, Dict[str, object]]] = []
+    removed: List[Dict[str, int | str]] = []
+    sent_bars = 0
+    if PRICE_STORAGE_MODE == STORAGE_MODE_CHUNKED and db is not None:
+        plan = plan_chunked_update(db, doc_ref, existing_data, new_prices)
+        change_count = plan.changed
+        price_fields = plan.head_fields
+        year_writes = plan.year_writes
+        total_bars = len(plan.head_fields.get("prices", ()))  # type: ignore[arg-type]
+        merged_prices = plan.head_fields.get("prices") or existing_prices
+    else:
+        result = merge_price_records(existing_prices, new_prices)
+        change_count = result.changed
+        total_bars = len(result.records)
+        merged_prices = result.records
+        # 마지막 봉 교체는 배치 커밋이 필요하므로 쓰기 대상(writer 또는 db)이 있을 때만 나눠 보냅니다.
+        can_batch = writer is not None or db is not None
+        delta = plan_price_delta(existing_prices, result) if change_count and DELTA_WRITES and can_batch else None
+        if not change_count:
+            price_fields = {}
+        elif delta is None:
+            price_fields = {"prices": result.records}
+            sent_bars = total_bars
+        else:
+            removed, appended = delta
+            price_fields = {"prices": firestore.ArrayUnion(appended)}
+            sent_bars = len(appended)
 
     updates: Dict[str, object] = {}
-    if change_count:
+    if price_fields:
+        updates.update(price_fields)
         updates.update({
-            "prices": merged_prices,
             "ticker": ticker,
             "name": name,
         })
+        # 화면과 알림은 currentPrice를 먼저 보므로 장중 갱신이 남긴 값이 묵지 않게 함께 맞춥니다.
+        newest = latest_bar(merged_prices)  # type: ignore[arg-type]
+        if newest is not None:
+            updates["currentPrice"] = newest.get("close")
+            updates["priceDate"] = newest.get("date")
     else:
         if existing_data.get("name") != name:
             updates["name"] = name
@@ -197,21 +494,53 @@ def upload_to_firestore(
 
     if mark_full_history and not existing_data.get("hasFullHistory"):
         updates["hasFullHistory"] = True
+    if gaps_checked_through and gaps_checked_through > str(existing_data.get("gapsCheckedThrough") or ""):
+        updates["gapsCheckedThrough"] = gaps_checked_through
 
     if not updates:
         LOGGER.info("%s (%s): 신규 데이터가 없어 업데이트를 건너뜁니다.", name, ticker)
-        return
+        return False
 
     updates["updatedAt"] = firestore.SERVER_TIMESTAMP
-    doc_ref.set(updates, merge=True)
+    if removed or year_writes:
+        # 같은 필드에 두 가지 배열 변환을 한 번에 걸 수 없어 제거와 추가를 한 배치로 보내고,
+        # 연도 문서도 헤드와 한 배치로 보내 헤드만 잘린 채 남는 일이 없게 합니다.
+        # BulkWriter는 순서와 원자성을 보장하지 않아 이런 쓰기에는 쓰지 않습니다.
+        operations: List[tuple[str, firestore.DocumentReference, Dict[str, object], Dict[str, object]]] = [
+            ("set", year_ref, year_data, {"notify": False}) for year_ref, year_data in year_writes
+        ]
+        if removed:
+            operations.append(("update", doc_ref, {"prices": firestore.ArrayRemove(removed)}, {}))
+        operations.append(("set", doc_ref, updates, {"merge": True}))
+        if writer is not None:
+            writer.commit_together(operations)
+        else:
+            batch = db.batch()  # type: ignore[union-attr]
+            for operation, ref, data, kwargs in operations:
+                kwargs = {key: value for key, value in kwargs.items() if key != "notify"}
+                getattr(batch, operation)(ref, data, **kwargs)
+            batch.commit()
+    elif writer is not None:
+        writer.set(doc_ref, updates, merge=True)
+    else:
+        doc_ref.set(updates, merge=True)
+
+    if ledger is not None:
+        ledger.record_prices(ticker, merged_prices)  # type: ignore[arg-type]
 
     if change_count:
+        detail = ""
+        if year_writes:
+            detail = f" (헤드는 최근 봉만, 연도 문서 {len(year_writes)}개 갱신)"
+        elif sent_bars != total_bars:
+            detail = f" (전송 {sent_bars}봉)"
         LOGGER.info(
-            "%s (%s): %d건의 변경 사항을 반영해 총 %d건으로 병합 저장했습니다.",
+            "%s (%s): %d건의 변경 사항을 반영해 총 %d건으로 병합 저장했습니다%s.",
             name,
             ticker,
             change_count,
-            len(merged_prices),
+            total_bars,
+            detail,
         )
     elif "hasFullHistory" in updates:
         LOGGER.info(
@@ -222,49 +551,16 @@ def upload_to_firestore(
         )
     else:
         LOGGER.info("%s (%s): 필드 정보만 최신화했습니다.", name, ticker)
+    return True
 
 
 def iter_stock_list(stock_list_file: str) -> Iterable[Dict[str, str]]:
-    """엑셀 파일에서 종목 코드와 이름 정보를 생성합니다."""
-
-    try:
-        df = pd.read_excel(stock_list_file)
-    except FileNotFoundError as exc:
-        raise FileNotFoundError(
-            f"'{stock_list_file}' 파일을 찾을 수 없습니다. 경로를 확인하세요."
-        ) from exc
-    except Exception as exc:  # pylint: disable=broad-except
-        raise RuntimeError(f"엑셀 파일을 읽는 중 오류가 발생했습니다: {exc}") from exc
+    """종목 목록 파일에서 종목 코드와 이름 정보를 생성합니다.
 
-    df.columns = [str(col).strip() for col in df.columns]
+    해석 결과는 ``stock_universe`` 캐시에 저장되어 다음 실행부터 엑셀을 다시 읽지 않습니다.
+    """
 
-    ticker_candidates = ["단축코드", "단축 코드", "티커", "종목코드"]
-    name_candidates = ["한글 종목약명", "한글종목약명", "종목명", "한글명"]
-
-    def resolve_column(candidates: List[str]) -> str:
-        for candidate in candidates:
-            if candidate in df.columns:
-                return candidate
-        raise KeyError(
-            "엑셀 파일에 필요한 열을 찾을 수 없습니다: "
-            + ", ".join(candidates)
-        )
-
-    ticker_col = resolve_column(ticker_candidates)
-    name_col = resolve_column(name_candidates)
-
-    df = df[[ticker_col, name_col]].dropna(how="any")
-    df[ticker_col] = (
-        df[ticker_col]
-        .astype(str)
-        .str.strip()
-        .str.replace(r"\.0$", "", regex=True)
-        .str.zfill(6)
-    )
-    df[name_col] = df[name_col].astype(str).str.strip()
-
-    for record in df.to_dict(orient="records"):
-        yield {"ticker": record[ticker_col], "name": record[name_col]}
+    return iter(load_stock_universe(stock_list_file))
 
 
 def fetch_portfolio_tickers(db: firestore.Client) -> set[str]:
@@ -287,9 +583,199 @@ def fetch_portfolio_tickers(db: firestore.Client) -> set[str]:
     return tickers
 
 
-def main() -> int:
+def process_ticker(
+    db: firestore.Client,
+    ticker: str,
+    name: str,
+    portfolio_tickers: set[str],
+    prefetched: Dict[str, Dict[str, object] | None] | None = None,
+    writer: FirestoreWriteSink | None = None,
+    parser: ParseStage | None = None,
+    write_stage: WriterStage | None = None,
+    ledger: FreshnessLedger | None = None,
+    calendar: Sequence[str] | None = None,
+) -> bool | None:
+    """단일 종목의 시세 수집과 업로드를 수행하고 쓰기가 발생했는지 반환합니다.
+
+    ``prefetched``에 종목 문서가 있으면 그대로 사용하고, 없을 때만 개별 조회합니다.
+    ``write_stage``가 주어지면 병합·업로드를 그 단계에 넘기고 ``None``을 반환합니다.
+    시세 요청이 실패하면 ``PriceFetchError``가 그대로 전달되어 실패 종목으로 집계되고,
+    체크포인트에도 완료로 남지 않습니다. ``calendar``는 빈 거래일을 찾을 때 쓰는 실제 거래일 달력입니다.
+    """
+
+    LOGGER.info("%s (%s) 데이터 수집 시작", name, ticker)
+
+    doc_ref = db.collection(STOCK_PRICE_COLLECTION).document(ticker)
+    if prefetched is not None and ticker in prefetched:
+        doc_data = prefetched[ticker]
+    else:
+        snapshot = doc_ref.get()
+        doc_data = snapshot.to_dict() if snapshot.exists else None
+
+    is_portfolio_ticker = ticker in portfolio_tickers
+    has_full_history = bool(doc_data and doc_data.get("hasFullHistory"))
+    pages_to_scrape = (
+        PORTFOLIO_INITIAL_PAGES
+        if is_portfolio_ticker and not has_full_history
+        else DEFAULT_PAGES_TO_SCRAPE
+    )
+
+    mark_full_history = is_portfolio_ticker and pages_to_scrape == PORTFOLIO_INITIAL_PAGES
+    # 포트폴리오 초기 적재는 전체 페이지가 필요하므로 증분 수집 대상에서 제외합니다.
+    needs_backfill = is_portfolio_ticker and not has_full_history
+    stop_at_date = None
+    latest_stored = None
+    if INCREMENTAL_SCRAPE and doc_data and not needs_backfill:
+        stop_at_date = find_resume_date(
+            doc_data.get("prices"),  # type: ignore[arg-type]
+            calendar=calendar,
+            checked_through=doc_data.get("gapsCheckedThrough"),
+        )
+        newest = latest_bar(doc_data.get("prices"))  # type: ignore[arg-type]
+        latest_stored = str(newest.get("date")) if newest is not None else None
+
+    prices = fetch_price_history(ticker, pages_to_scrape, stop_at_date=stop_at_date, parser=parser)
+
+    # 빈 구간 앞에서부터 다시 수집했는데도 봉이 없으면 거래 정지 등으로 실제로 빈 날이므로,
+    # 다음 실행부터는 그 구간 때문에 멀리 거슬러 가지 않도록 확인한 날짜를 남깁니다.
+    gaps_checked_through = None
+    if prices and stop_at_date and latest_stored and stop_at_date < latest_stored:
+        fetched = [str(record["date"]) for record in prices]
+        if min(fetched) <= stop_at_date:
+            gaps_checked_through = max(fetched)
+
+    upload: Callable[[], bool] = partial(
+        upload_to_firestore,
+        doc_ref,
+        ticker,
+        name,
+        prices,
+        doc_data,
+        mark_full_history,
+        writer,
+        db,
+        ledger,
+        gaps_checked_through,
+    )
+    if write_stage is not None:
+        write_stage.submit(ticker, upload)
+        return None
+    return upload()
+
+
+def run_concurrent_upload(
+    db: firestore.Client,
+    items: Iterable[Dict[str, str]],
+    portfolio_tickers: set[str],
+    concurrency: int = SCRAPE_CONCURRENCY,
+    writer: FirestoreWriteSink | None = None,
+    checkpoint: ScrapeCheckpoint | None = None,
+    parse_workers: int = PARSE_WORKERS,
+    ledger: FreshnessLedger | None = None,
+    calendar: Sequence[str] | None = None,
+) -> tuple[int, int]:
+    """여러 종목을 내려받기 → 파싱 → 병합·쓰기 파이프라인으로 처리하고 (성공, 실패) 건수를 반환합니다.
+
+    내려받기는 스레드 풀이 맡으며, 네이버 요청 속도는 ``RATE_LIMITER``가 전역으로
+    제한합니다. ``parse_workers``가 1 이상이면 파싱은 별도 프로세스 풀에서 실행되고,
+    병합과 업로드는 단일 작성 스레드가 ``WRITE_QUEUE_SIZE`` 크기의 대기열에서 꺼내
+    처리합니다. 기존 문서는 ``PREFETCH_CHUNK_SIZE`` 단위로 미리 읽어 작업자에게 넘깁니다.
+
+    ``checkpoint``가 주어지면 쓰기가 필요 없던 종목은 처리 직후, 쓰기가 대기열에
+    들어간 종목은 ``writer``가 반영을 확인한 뒤(``on_success``) 완료로 기록합니다.
+    """
+
+    succeeded = 0
+    failed = 0
+    pending: Dict[Future, str] = {}
+
+    def on_written(ticker: str, wrote: bool) -> None:
+        if checkpoint is not None and not (wrote and writer is not None):
+            checkpoint.mark_done(ticker)
+
+    def collect(done: Iterable[Future]) -> None:
+        nonlocal failed
+        for future in done:
+            ticker = pending.pop(future)
+            try:
+                future.result()
+            except Exception:  # pylint: disable=broad-except
+                failed += 1
+                LOGGER.exception("%s 종목 처리 중 오류 발생", ticker)
+
+    parser = ParseStage(parse_workers, PARSE_MAX_PENDING, STAGE_TIMINGS) if parse_workers else INLINE_PARSER
+    write_stage = WriterStage(WRITE_QUEUE_SIZE, on_done=on_written, timings=STAGE_TIMINGS)
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="scrape") as executor:
+            for chunk in chunked(items, PREFETCH_CHUNK_SIZE):
+                with STAGE_TIMINGS.measure("prefetch"):
+                    prefetched = prefetch_documents(
+                        db,
+                        STOCK_PRICE_COLLECTION,
+                        [item["ticker"] for item in chunk],
+                        field_paths=UPLOAD_FIELD_MASK,
+                    )
+                for item in chunk:
+                    # 제출 대기열을 동시성의 두 배로 제한해 종목 목록 전체를 한꺼번에 올리지 않습니다.
+                    if len(pending) >= concurrency * 2:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    future = executor.submit(
+                        process_ticker,
+                        db,
+                        item["ticker"],
+                        item["name"],
+                        portfolio_tickers,
+                        prefetched,
+                        writer,
+                        parser,
+                        write_stage,
+                        ledger,
+                        calendar,
+                    )
+                    pending[future] = item["ticker"]
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+    finally:
+        written, write_failed = write_stage.close()
+        if parser is not INLINE_PARSER:
+            parser.close()
+
+    succeeded += written
+    failed += write_failed
+    return succeeded, failed
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """명령행 인자를 해석합니다. 각 값은 환경 변수로도 지정할 수 있습니다."""
+
+    parser = argparse.ArgumentParser(description="네이버 금융 일별 시세를 Firestore에 업로드합니다.")
+    parser.add_argument(
+        "--shard",
+        default=os.getenv("SCRAPE_SHARD", ""),
+        help="종목 코드 해시 기준으로 나눈 샤드 중 처리할 번호 (예: 0/4)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=os.getenv("SCRAPE_CHECKPOINT_FILE", ""),
+        help="완료한 종목을 기록해 재실행 시 이어서 처리할 체크포인트 파일 경로",
+    )
+    parser.add_argument(
+        "--run-key",
+        default=os.getenv("SCRAPE_RUN_KEY", ""),
+        help="체크포인트를 이어받을 실행 구분 키 (기본값: 오늘 날짜와 샤드)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
     """스크립트 실행 진입점."""
 
+    args = parse_args(argv)
+    shard_index, shard_total = parse_shard(args.shard)
+
     today = datetime.now().date()
     if not is_korean_trading_day(today):
         LOGGER.info(
@@ -302,37 +788,68 @@ def main() -> int:
     db = initialize_firestore()
     portfolio_tickers = fetch_portfolio_tickers(db)
 
-    for item in iter_stock_list(stock_list_file):
-        ticker = item["ticker"]
-        name = item["name"]
-        LOGGER.info("%s (%s) 데이터 수집 시작", name, ticker)
-
-        doc_ref = db.collection("stock_prices").document(ticker)
-        snapshot = doc_ref.get()
-        doc_data = snapshot.to_dict() if snapshot.exists else None
-
-        is_portfolio_ticker = ticker in portfolio_tickers
-        has_full_history = bool(doc_data and doc_data.get("hasFullHistory"))
-        pages_to_scrape = (
-            PORTFOLIO_INITIAL_PAGES
-            if is_portfolio_ticker and not has_full_history
-            else DEFAULT_PAGES_TO_SCRAPE
-        )
+    if shard_total > 1:
+        # 샤드가 동시에 실행되므로 서버가 받는 전체 요청 속도가 같도록 나눠 씁니다.
+        RATE_LIMITER.scale(1 / shard_total)
+        LOGGER.info("샤드 %d/%d 종목만 처리합니다.", shard_index, shard_total)
 
-        prices = scrape_daily_prices(ticker, pages_to_scrape)
-        mark_full_history = is_portfolio_ticker and pages_to_scrape == PORTFOLIO_INITIAL_PAGES
+    ledger = open_ledger(db)
+    checkpoint = None
+    if args.checkpoint:
+        run_key = args.run_key or f"{today.isoformat()}:{shard_index}/{shard_total}"
+        checkpoint = ScrapeCheckpoint(args.checkpoint, run_key)
 
-        upload_to_firestore(
-            doc_ref,
-            ticker,
-            name,
-            prices,
-            doc_data,
-            mark_full_history,
+    items: Iterable[Dict[str, str]] = filter_shard(
+        iter_stock_list(stock_list_file), shard_index, shard_total
+    )
+    if checkpoint is not None:
+        items = (item for item in items if not checkpoint.is_done(item["ticker"]))
+
+    LOGGER.info(
+        "동시 작업자 %d개, 파싱 프로세스 %d개, 네이버 요청 한도 초당 %.2f회(%s), 수집 경로 %s로 시작합니다.",
+        SCRAPE_CONCURRENCY,
+        PARSE_WORKERS,
+        RATE_LIMITER.default_rate,
+        "적응형" if ADAPTIVE_PACING else "고정",
+        PRICE_HISTORY_SOURCE,
+    )
+    try:
+        with FirestoreWriteSink(
+            db, on_success=checkpoint.mark_done if checkpoint is not None else None
+        ) as writer:
+            succeeded, failed = run_concurrent_upload(
+                db,
+                items,
+                portfolio_tickers,
+                writer=writer,
+                checkpoint=checkpoint,
+                ledger=ledger,
+                calendar=load_trading_calendar(db),
+            )
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+    write_stats = writer.stats
+    if ledger is not None:
+        # 쓰기가 확인된 종목만 장부에 남기려고 작성기를 닫은 뒤에 기록합니다.
+        ledger.discard(
+            path.split("/")[1]
+            for path in write_stats.failed_paths
+            if path.startswith(f"{STOCK_PRICE_COLLECTION}/")
         )
-
-    LOGGER.info("모든 종목 업데이트 완료")
-    return 0
+        ledger.flush()
+
+    LOGGER.info("모든 종목 업데이트 완료 (성공 %d건, 실패 %d건)", succeeded, failed)
+    LOGGER.info("Firestore 쓰기 결과: %s", write_stats.summary())
+    http_client.get_client().log_stats(LOGGER)
+    RATE_LIMITER.log_rates(LOGGER)
+    STAGE_TIMINGS.log_summary(LOGGER)
+    if write_stats.failed:
+        LOGGER.error("쓰기에 실패한 문서: %s", ", ".join(write_stats.failed_paths))
+    if checkpoint is not None and (failed or write_stats.failed):
+        # 체크포인트로 이어받을 수 있으므로 실패를 알려 재실행을 유도합니다.
+        return 1
+    return 1 if (failed or write_stats.failed) and not succeeded else 0
 
 
 if __name__ == "__main__":
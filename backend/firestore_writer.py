@@ -0,0 +1,230 @@
+"""Firestore 쓰기를 호출 스레드와 분리해 모아서 전송하는 write-behind 저장소."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Sequence, Set, Tuple
+
+from google.cloud import firestore as google_firestore
+
+LOGGER = logging.getLogger(__name__)
+
+# Firestore 커밋 한 번에 담을 수 있는 최대 작업 수입니다.
+MAX_BATCH_OPERATIONS = 500
+WRITE_MAX_ATTEMPTS = int(os.getenv("FIRESTORE_WRITE_MAX_ATTEMPTS", "5"))
+WRITE_RETRY_BASE_SECONDS = float(os.getenv("FIRESTORE_WRITE_RETRY_BASE_SECONDS", "1.0"))
+
+
+@dataclass
+class WriteStats:
+    """한 번의 실행 동안 누적된 쓰기 결과."""
+
+    queued: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    failed_paths: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return f"요청 {self.queued}건, 성공 {self.succeeded}건, 실패 {self.failed}건"
+
+
+class FirestoreWriteSink:
+    """``BulkWriter``로 쓰기를 대기열에 넣고 종료 시 한 번에 비웁니다.
+
+    ``BulkWriter``가 흐름 제어(500/50/5 증가 규칙)와 재시도를 맡으며, 이를 지원하지
+    않는 클라이언트에서는 최대 500개 작업 단위의 배치 커밋으로 대체합니다.
+    ``on_success``를 주면 실제로 반영된 문서의 ID마다 호출합니다. ``notify=False``로
+    넣은 쓰기(하위 컬렉션 문서 등)는 알리지 않습니다.
+    """
+
+    def __init__(
+        self,
+        db: google_firestore.Client,
+        max_attempts: int = WRITE_MAX_ATTEMPTS,
+        on_success: Callable[[str], None] | None = None,
+    ) -> None:
+        self._db = db
+        self._max_attempts = max(1, max_attempts)
+        self._on_success = on_success
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = WriteStats()
+
+        self._bulk_writer = None
+        self._batch = None
+        self._batch_paths: List[str] = []
+        self._silent_paths: Set[str] = set()
+
+        if hasattr(db, "bulk_writer"):
+            self._bulk_writer = db.bulk_writer()
+            self._bulk_writer.on_write_result(self._on_write_result)
+            self._bulk_writer.on_write_error(self._on_write_error)
+        else:
+            LOGGER.info("BulkWriter를 사용할 수 없어 배치 커밋 방식으로 저장합니다.")
+
+    # --- BulkWriter 콜백 ---
+    def _on_write_result(self, reference, result, bulk_writer) -> None:
+        with self._lock:
+            self.stats.succeeded += 1
+            silent = reference.path in self._silent_paths
+            self._silent_paths.discard(reference.path)
+        if self._on_success is not None and not silent:
+            self._on_success(reference.id)
+
+    def _on_write_error(self, error, bulk_writer) -> bool:
+        # BulkWriteFailure는 문서를 직접 갖지 않고 실패한 작업(operation)을 통해 가리킵니다.
+        path = error.operation.reference.path
+        if error.attempts < self._max_attempts:
+            LOGGER.debug(
+                "%s 쓰기 재시도 (%d/%d): %s",
+                path,
+                error.attempts,
+                self._max_attempts,
+                error.message,
+            )
+            return True
+
+        LOGGER.error("%s 쓰기 실패: %s", path, error.message)
+        with self._lock:
+            self.stats.failed += 1
+            self.stats.failed_paths.append(path)
+            self._silent_paths.discard(path)
+        return False
+
+    # --- 쓰기 API ---
+    def set(
+        self,
+        doc_ref: google_firestore.DocumentReference,
+        data: Dict[str, object],
+        merge: bool = False,
+        notify: bool = True,
+    ) -> None:
+        """문서 전체 또는 병합 쓰기를 대기열에 추가합니다."""
+
+        if not notify:
+            with self._lock:
+                self._silent_paths.add(doc_ref.path)
+        self._enqueue("set", doc_ref, data, merge=merge)
+
+    def update(
+        self,
+        doc_ref: google_firestore.DocumentReference,
+        data: Dict[str, object],
+    ) -> None:
+        """필드 갱신을 대기열에 추가합니다."""
+
+        self._enqueue("update", doc_ref, data)
+
+    def _enqueue(self, operation: str, doc_ref, data: Dict[str, object], **kwargs) -> None:
+        if self._closed:
+            raise RuntimeError("이미 닫힌 FirestoreWriteSink에는 쓸 수 없습니다.")
+
+        with self._lock:
+            self.stats.queued += 1
+
+        if self._bulk_writer is not None:
+            getattr(self._bulk_writer, operation)(doc_ref, data, **kwargs)
+            return
+
+        with self._lock:
+            if self._batch is None:
+                self._batch = self._db.batch()
+            getattr(self._batch, operation)(doc_ref, data, **kwargs)
+            self._batch_paths.append(doc_ref.path)
+            if len(self._batch_paths) >= MAX_BATCH_OPERATIONS:
+                self._commit_batch_locked()
+
+    def commit_together(
+        self,
+        operations: Sequence[Tuple[str, google_firestore.DocumentReference, Dict[str, object], Dict[str, object]]],
+    ) -> None:
+        """(작업 이름, 문서, 데이터, 추가 인자) 목록을 WriteBatch 하나로 즉시 커밋합니다.
+
+        ``BulkWriter``는 같은 문서에 대한 쓰기의 순서와 원자성을 보장하지 않으므로,
+        순서대로 함께 반영되어야 하는 쓰기(배열 원소 제거 후 추가, 연도 문서와 헤드 등)에
+        사용합니다. 추가 인자에 ``notify=False``를 넣으면 ``set``과 같이 성공을 알리지 않습니다.
+        """
+
+        if self._closed:
+            raise RuntimeError("이미 닫힌 FirestoreWriteSink에는 쓸 수 없습니다.")
+
+        batch = self._db.batch()
+        paths: List[str] = []
+        silent: Set[str] = set()
+        for operation, doc_ref, data, kwargs in operations:
+            kwargs = dict(kwargs)
+            if not kwargs.pop("notify", True):
+                silent.add(doc_ref.path)
+            getattr(batch, operation)(doc_ref, data, **kwargs)
+            paths.append(doc_ref.path)
+        with self._lock:
+            self.stats.queued += len(paths)
+            self._silent_paths.update(silent)
+        committed = self._commit_with_retry(batch, paths)
+        with self._lock:
+            self._record_batch_locked(paths, committed)
+
+    def _commit_batch_locked(self) -> None:
+        batch, paths = self._batch, self._batch_paths
+        self._batch, self._batch_paths = None, []
+        if batch is None or not paths:
+            return
+        self._record_batch_locked(paths, self._commit_with_retry(batch, paths))
+
+    def _commit_with_retry(self, batch, paths: List[str]) -> bool:
+        for attempt in range(1, self._max_attempts + 1):
+            try:
+                batch.commit()
+                return True
+            except Exception as exc:  # pylint: disable=broad-except
+                if attempt == self._max_attempts:
+                    LOGGER.error("배치 커밋 실패 (%d건): %s", len(paths), exc)
+                    return False
+                delay = WRITE_RETRY_BASE_SECONDS * (2 ** (attempt - 1))
+                LOGGER.warning("배치 커밋 재시도 %d/%d (%.1f초 후): %s", attempt, self._max_attempts, delay, exc)
+                time.sleep(delay)
+        return False
+
+    def _record_batch_locked(self, paths: List[str], committed: bool) -> None:
+        if not committed:
+            self.stats.failed += len(paths)
+            self.stats.failed_paths.extend(paths)
+            self._silent_paths.difference_update(paths)
+            return
+        self.stats.succeeded += len(paths)
+        if self._on_success is not None:
+            for path in paths:
+                if path in self._silent_paths:
+                    self._silent_paths.discard(path)
+                    continue
+                self._on_success(path.rsplit("/", 1)[-1])
+
+    def flush(self) -> None:
+        """대기 중인 쓰기가 모두 끝날 때까지 기다립니다."""
+
+        if self._bulk_writer is not None:
+            self._bulk_writer.flush()
+            return
+        with self._lock:
+            self._commit_batch_locked()
+
+    def close(self) -> WriteStats:
+        """남은 쓰기를 비우고 실행 통계를 반환합니다."""
+
+        if not self._closed:
+            if self._bulk_writer is not None:
+                self._bulk_writer.close()
+            else:
+                self.flush()
+            self._closed = True
+        return self.stats
+
+    def __enter__(self) -> "FirestoreWriteSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -0,0 +1,166 @@
+"""종목별 마지막 갱신 시각과 최신 봉을 모아 두는 신선도 장부(``priceFreshness``).
+
+``stock_prices/{ticker}`` 문서를 종목마다 읽지 않고도 어느 종목을 갱신해야 하는지 판단할
+수 있도록, 몇 개의 샤드 문서에 다음과 같은 맵을 둡니다::
+
+    priceFreshness/shard-00 = {
+        "tickers": {"005930": {"refreshedAt": ..., "latestDate": "2024-05-31", "latestClose": 75300}},
+        "updatedAt": ...,
+    }
+
+종목은 코드의 CRC32 값으로 ``FRESHNESS_LEDGER_SHARDS``개 샤드에 나뉘므로 관심 종목 전체의
+신선도를 샤드 수만큼의 읽기로 확인합니다. 기록은 메모리에 모았다가 ``flush``에서 샤드별
+``set(merge=True)`` 한 번으로 보냅니다. 장부는 판단을 돕는 보조 자료라서, 장부에 없는
+종목은 호출하는 쪽이 시세 문서를 직접 확인합니다.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import zlib
+from typing import Dict, Iterable, Mapping, Sequence
+
+from google.cloud import firestore as google_firestore
+
+from price_merge import record_key
+
+LOGGER = logging.getLogger(__name__)
+
+FRESHNESS_LEDGER_COLLECTION = os.getenv("FRESHNESS_LEDGER_COLLECTION", "priceFreshness")
+FRESHNESS_LEDGER_SHARDS = max(1, int(os.getenv("FRESHNESS_LEDGER_SHARDS", "4")))
+FRESHNESS_LEDGER = os.getenv("FRESHNESS_LEDGER", "1").strip().lower() not in {"0", "false", "no"}
+
+LedgerEntry = Dict[str, object]
+
+
+def shard_id(ticker: str, shards: int = FRESHNESS_LEDGER_SHARDS) -> str:
+    return f"shard-{zlib.crc32(ticker.encode()) % shards:02d}"
+
+
+def latest_bar(prices: Iterable[Mapping[str, object]] | None) -> Mapping[str, object] | None:
+    """정렬 방향과 관계없이 날짜가 가장 늦은 봉을 찾습니다."""
+
+    latest: Mapping[str, object] | None = None
+    latest_key = -1
+    for record in prices or ():
+        key = record_key(record, ("date", "tradeDate", "timestamp"))
+        if key is not None and key > latest_key:
+            latest, latest_key = record, key
+    return latest
+
+
+class FreshnessLedger:
+    """신선도 장부 샤드를 읽고, 갱신 기록을 모아 한꺼번에 씁니다.
+
+    ``record``는 여러 작업 스레드에서 동시에 불러도 됩니다.
+    """
+
+    def __init__(
+        self,
+        db: google_firestore.Client,
+        collection: str = FRESHNESS_LEDGER_COLLECTION,
+        shards: int = FRESHNESS_LEDGER_SHARDS,
+    ) -> None:
+        self._db = db
+        self._collection_ref = db.collection(collection)
+        self._shards = shards
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, LedgerEntry]] = {}
+
+    def __enter__(self) -> "FreshnessLedger":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.flush()
+
+    # --- 읽기 -------------------------------------------------------------------------
+
+    def read(self, tickers: Sequence[str]) -> Dict[str, LedgerEntry]:
+        """``tickers``가 속한 샤드만 읽어 장부에 있는 종목의 항목을 반환합니다."""
+
+        refs = [
+            self._collection_ref.document(shard)
+            for shard in sorted({shard_id(ticker, self._shards) for ticker in tickers})
+        ]
+        if not refs:
+            return {}
+        recorded: Dict[str, LedgerEntry] = {}
+        for snapshot in self._db.get_all(refs, field_paths=["tickers"]):
+            if snapshot.exists:
+                recorded.update((snapshot.to_dict() or {}).get("tickers") or {})
+        return {ticker: recorded[ticker] for ticker in tickers if ticker in recorded}
+
+    # --- 기록 -------------------------------------------------------------------------
+
+    def record(
+        self,
+        ticker: str,
+        latest_date: object = None,
+        latest_close: object = None,
+        refreshed_at: object = google_firestore.SERVER_TIMESTAMP,
+    ) -> None:
+        """종목의 갱신 시각과 최신 봉을 대기열에 넣습니다. 날짜·종가가 없으면 시각만 바꿉니다."""
+
+        entry: LedgerEntry = {"refreshedAt": refreshed_at}
+        if latest_date is not None:
+            entry["latestDate"] = latest_date
+            entry["latestClose"] = latest_close
+        with self._lock:
+            self._pending.setdefault(shard_id(ticker, self._shards), {})[ticker] = entry
+
+    def record_prices(self, ticker: str, prices: Iterable[Mapping[str, object]] | None) -> None:
+        """시세 목록에서 최신 봉을 찾아 기록합니다."""
+
+        bar = latest_bar(prices)
+        if bar is None:
+            self.record(ticker)
+            return
+        self.record(ticker, bar.get("date") or bar.get("tradeDate"), bar.get("close"))
+
+    def discard(self, tickers: Iterable[str]) -> None:
+        """아직 쓰지 않은 기록에서 ``tickers``를 뺍니다. 시세 쓰기가 실패한 종목에 씁니다."""
+
+        with self._lock:
+            for ticker in tickers:
+                self._pending.get(shard_id(ticker, self._shards), {}).pop(ticker, None)
+
+    def flush(self) -> int:
+        """모아 둔 기록을 샤드별로 한 번씩 병합 저장하고 기록한 종목 수를 반환합니다.
+
+        쓰기에 실패하면 기록을 대기열로 되돌리되, 그 사이 새로 들어온 기록은 덮어쓰지 않습니다.
+        """
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        pending = {shard: entries for shard, entries in pending.items() if entries}
+        if not pending:
+            return 0
+
+        batch = self._db.batch()
+        for shard, entries in pending.items():
+            batch.set(
+                self._collection_ref.document(shard),
+                {"tickers": entries, "updatedAt": google_firestore.SERVER_TIMESTAMP},
+                merge=True,
+            )
+        written = sum(len(entries) for entries in pending.values())
+        try:
+            batch.commit()
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.warning("신선도 장부 %d건을 쓰지 못했습니다. 다음 기록 때 다시 시도합니다.", written, exc_info=True)
+            with self._lock:
+                for shard, entries in pending.items():
+                    current = self._pending.setdefault(shard, {})
+                    for ticker, entry in entries.items():
+                        current.setdefault(ticker, entry)
+            return 0
+        LOGGER.debug("신선도 장부 샤드 %d개에 %d개 종목을 기록했습니다.", len(pending), written)
+        return written
+
+
+def open_ledger(db: google_firestore.Client) -> FreshnessLedger | None:
+    """``FRESHNESS_LEDGER``가 켜져 있으면 장부를 엽니다."""
+
+    return FreshnessLedger(db) if FRESHNESS_LEDGER else None
@@ -0,0 +1,172 @@
+"""백엔드 스크래퍼가 함께 쓰는 연결 풀 기반 HTTP 클라이언트."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from constants import DEFAULT_HEADERS
+from rate_limiter import HostRateLimiter
+
+LOGGER = logging.getLogger(__name__)
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", os.getenv("SCRAPE_CONCURRENCY", "8")))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+@dataclass
+class HostStats:
+    """호스트별 요청 지연 시간과 오류 누계."""
+
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def average_latency(self) -> float:
+        return self.total_latency / self.requests if self.requests else 0.0
+
+
+class HttpClient:
+    """keep-alive 연결 풀과 지수 백오프 재시도를 갖춘 ``requests.Session`` 래퍼.
+
+    5xx/429 응답은 ``Retry-After`` 헤더를 존중하며 재시도하고, 호스트별 요청 수,
+    오류 수, 재시도 수, 지연 시간을 집계합니다.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = HTTP_POOL_SIZE,
+        max_retries: int = HTTP_MAX_RETRIES,
+        backoff_factor: float = HTTP_BACKOFF_FACTOR,
+        timeout: tuple[float, float] = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+    ) -> None:
+        self.timeout = timeout
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=max(pool_size, 1),
+            pool_maxsize=max(pool_size, 1),
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._stats: Dict[str, HostStats] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, host: str, latency: float, error: bool, retries: int) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(host, HostStats())
+            stats.requests += 1
+            stats.retries += retries
+            stats.total_latency += latency
+            stats.max_latency = max(stats.max_latency, latency)
+            if error:
+                stats.errors += 1
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        rate_limiter: HostRateLimiter | None = None,
+        **kwargs,
+    ) -> requests.Response:
+        """요청을 보내고 호스트별 통계를 기록합니다. 예외는 그대로 전달합니다.
+
+        ``rate_limiter``가 주어지면 요청 전에 토큰을 확보하고, 응답 상태와 지연 시간을
+        돌려주어 적응형 속도 조절에 쓰이게 합니다.
+        """
+
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlparse(url).netloc
+        if rate_limiter is not None:
+            rate_limiter.acquire(host)
+
+        started = time.monotonic()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            latency = time.monotonic() - started
+            self._record(host, latency, True, 0)
+            if rate_limiter is not None:
+                rate_limiter.observe(host, None, latency)
+            raise
+
+        latency = time.monotonic() - started
+        retry_state = getattr(response.raw, "retries", None)
+        history = retry_state.history if retry_state is not None else ()
+        self._record(host, latency, response.status_code >= 400, len(history))
+        if rate_limiter is not None:
+            rate_limiter.observe(
+                host,
+                response.status_code,
+                latency,
+                [entry.status for entry in history],
+            )
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def stats(self) -> Dict[str, HostStats]:
+        """호스트별 통계의 복사본을 반환합니다."""
+
+        with self._lock:
+            return {host: HostStats(**vars(stats)) for host, stats in self._stats.items()}
+
+    def log_stats(self, logger: logging.Logger = LOGGER) -> None:
+        for host, stats in sorted(self.stats().items()):
+            logger.info(
+                "HTTP %s: 요청 %d건, 오류 %d건, 재시도 %d회, 평균 %.0fms, 최대 %.0fms",
+                host,
+                stats.requests,
+                stats.errors,
+                stats.retries,
+                stats.average_latency * 1000,
+                stats.max_latency * 1000,
+            )
+
+
+_CLIENT: HttpClient | None = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """프로세스 전체에서 공유하는 클라이언트를 반환합니다."""
+
+    global _CLIENT
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = HttpClient()
+    return _CLIENT
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """공유 클라이언트로 GET 요청을 보냅니다."""
+
+    return get_client().get(url, **kwargs)
@@ -0,0 +1,110 @@
+"""``stock_prices`` 문서를 연도 분할 저장 방식(``PRICE_STORAGE_MODE=chunked``)으로 옮기는 스크립트.
+
+사용법::
+
+    python migrate_price_storage.py --dry-run
+    python migrate_price_storage.py --ticker 005930 --ticker 000660
+    python migrate_price_storage.py --limit 100
+
+문서마다 연도 문서와 헤드 문서를 한 배치로 커밋하므로 중간에 멈춰도 반쯤 옮겨진 문서는
+남지 않고, 이미 옮긴 문서는 건너뛰어 다시 실행해도 됩니다.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+from typing import Iterable, Sequence
+
+from firebase_admin import firestore
+
+from daily_price_uploader import STOCK_PRICE_COLLECTION, initialize_firestore
+from price_storage import PRICE_HEAD_RECENT_BARS, is_chunked, plan_chunked_update
+
+LOGGER = logging.getLogger(__name__)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="stock_prices 문서를 연도 분할 저장 방식으로 옮깁니다.")
+    parser.add_argument("--dry-run", action="store_true", help="쓰지 않고 옮길 내용만 출력합니다.")
+    parser.add_argument("--ticker", action="append", default=[], help="옮길 종목 코드 (여러 번 지정 가능)")
+    parser.add_argument("--limit", type=int, default=0, help="옮길 최대 문서 수 (0이면 전체)")
+    parser.add_argument(
+        "--recent-bars",
+        type=int,
+        default=PRICE_HEAD_RECENT_BARS,
+        help="헤드 문서에 남길 최근 봉 수",
+    )
+    return parser.parse_args(argv)
+
+
+def iter_price_documents(db: firestore.Client, tickers: Sequence[str]) -> Iterable:
+    collection_ref = db.collection(STOCK_PRICE_COLLECTION)
+    if tickers:
+        return db.get_all([collection_ref.document(ticker) for ticker in tickers])
+    return collection_ref.stream()
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    db = initialize_firestore()
+
+    migrated = skipped = empty = failed = 0
+    for snapshot in iter_price_documents(db, args.ticker):
+        if args.limit and migrated >= args.limit:
+            break
+        if not snapshot.exists:
+            LOGGER.warning("%s 문서가 없습니다.", snapshot.id)
+            continue
+
+        data = snapshot.to_dict() or {}
+        if is_chunked(data):
+            skipped += 1
+            continue
+
+        plan = plan_chunked_update(db, snapshot.reference, data, [], recent_bars=args.recent_bars)
+        if not plan.year_writes:
+            empty += 1
+            continue
+
+        bars = sum(len(year_data["prices"]) for _, year_data in plan.year_writes)  # type: ignore[arg-type]
+        LOGGER.info(
+            "%s: %d봉을 연도 문서 %d개(%s)로 나누고 헤드에 최근 %d봉을 남깁니다.",
+            snapshot.id,
+            bars,
+            len(plan.year_writes),
+            ", ".join(str(year_data["year"]) for _, year_data in plan.year_writes),
+            len(plan.head_fields.get("prices", [])),  # type: ignore[arg-type]
+        )
+        if args.dry_run:
+            migrated += 1
+            continue
+
+        batch = db.batch()
+        for year_ref, year_data in plan.year_writes:
+            batch.set(year_ref, year_data)
+        batch.set(snapshot.reference, {**plan.head_fields, "updatedAt": firestore.SERVER_TIMESTAMP}, merge=True)
+        try:
+            batch.commit()
+        except Exception:  # pylint: disable=broad-except
+            failed += 1
+            LOGGER.exception("%s 문서를 옮기지 못했습니다.", snapshot.id)
+            continue
+        migrated += 1
+
+    LOGGER.info(
+        "%s: 옮김 %d건, 이미 분할됨 %d건, 시세 없음 %d건, 실패 %d건",
+        "미리보기" if args.dry_run else "완료",
+        migrated,
+        skipped,
+        empty,
+        failed,
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
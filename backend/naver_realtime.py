@@ -0,0 +1,128 @@
+"""네이버 금융 실시간 시세(polling) API로 여러 종목의 현재가를 한 번에 받아 오는 모듈.
+
+``polling.finance.naver.com/api/realtime?query=SERVICE_ITEM:005930,000660`` 한 번의 요청으로
+여러 종목의 현재가(``nv``), 시가(``ov``), 고가(``hv``), 저가(``lv``), 누적 거래량(``aq``)을
+JSON으로 받습니다. 장중에는 종목마다 sise_day HTML을 내려받는 대신 이 값으로 오늘 봉만
+갱신합니다.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Mapping, Sequence
+
+import requests
+
+import http_client
+from rate_limiter import HostRateLimiter
+
+LOGGER = logging.getLogger(__name__)
+
+NAVER_POLLING_HOST = "polling.finance.naver.com"
+# 한 요청에 담을 종목 수. 너무 길면 URL 길이 제한에 걸리므로 수십 개 단위로 나눕니다.
+REALTIME_BATCH_SIZE = max(1, int(os.getenv("REALTIME_BATCH_SIZE", "50")))
+
+_KST = timezone(timedelta(hours=9))
+
+
+@dataclass(frozen=True)
+class RealtimeQuote:
+    """한 종목의 실시간 시세. ``as_of``는 응답 기준 시각(KST)입니다."""
+
+    ticker: str
+    price: int
+    open: int
+    high: int
+    low: int
+    volume: int
+    market_status: str = ""
+    as_of: datetime | None = None
+
+    def today_bar(self, trade_date: str) -> Dict[str, int | str] | None:
+        """``trade_date``(YYYY-MM-DD)의 봉으로 바꿉니다. 아직 체결이 없으면 ``None``입니다."""
+
+        if self.volume <= 0 or self.open <= 0:
+            return None
+        return {
+            "date": trade_date,
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.price,
+            "volume": self.volume,
+        }
+
+
+def _as_int(value: object) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        value = value.replace(",", "").strip() or 0
+    return int(float(value))  # type: ignore[arg-type]
+
+
+def parse_realtime_json(text: str) -> Dict[str, RealtimeQuote]:
+    """실시간 시세 응답에서 {종목 코드: ``RealtimeQuote``}를 만듭니다.
+
+    형식이 맞지 않는 항목은 건너뜁니다.
+    """
+
+    payload = json.loads(text)
+    result: Mapping[str, object] = payload.get("result") or {}
+    as_of = None
+    if result.get("time"):
+        as_of = datetime.fromtimestamp(_as_int(result["time"]) / 1000, tz=_KST)
+
+    quotes: Dict[str, RealtimeQuote] = {}
+    for area in result.get("areas") or []:  # type: ignore[union-attr]
+        for item in area.get("datas") or []:
+            ticker = str(item.get("cd") or "").strip()
+            if not ticker:
+                continue
+            try:
+                quotes[ticker] = RealtimeQuote(
+                    ticker=ticker,
+                    price=_as_int(item.get("nv")),
+                    open=_as_int(item.get("ov")),
+                    high=_as_int(item.get("hv")),
+                    low=_as_int(item.get("lv")),
+                    volume=_as_int(item.get("aq")),
+                    market_status=str(item.get("ms") or ""),
+                    as_of=as_of,
+                )
+            except (TypeError, ValueError):
+                LOGGER.debug("%s 실시간 시세 항목을 해석하지 못했습니다: %s", ticker, item)
+    return quotes
+
+
+def fetch_realtime_quotes(
+    tickers: Sequence[str],
+    rate_limiter: HostRateLimiter | None = None,
+    headers: Mapping[str, str] | None = None,
+    batch_size: int = REALTIME_BATCH_SIZE,
+) -> Dict[str, RealtimeQuote]:
+    """``tickers``의 실시간 시세를 ``batch_size``개씩 묶어 요청합니다.
+
+    실패한 묶음의 종목은 결과에서 빠지므로, 호출하는 쪽이 다른 경로로 대신 수집합니다.
+    """
+
+    unique = list(dict.fromkeys(tickers))
+    quotes: Dict[str, RealtimeQuote] = {}
+    for start in range(0, len(unique), batch_size):
+        chunk = unique[start:start + batch_size]
+        try:
+            response = http_client.get(
+                f"https://{NAVER_POLLING_HOST}/api/realtime",
+                params={"query": "SERVICE_ITEM:" + ",".join(chunk)},
+                headers=dict(headers or {}),
+                rate_limiter=rate_limiter,
+            )
+            response.raise_for_status()
+            quotes.update(parse_realtime_json(response.text))
+        except (requests.RequestException, ValueError) as exc:
+            LOGGER.warning("실시간 시세 %d개 종목 요청 중 오류 발생: %s", len(chunk), exc)
+    return quotes
@@ -0,0 +1,106 @@
+"""네이버 금융 일별 시세 응답 전용 경량 파서.
+
+BeautifulSoup 트리를 만들지 않고 sise_day 페이지의 ``table.type2`` 행이나
+siseJson 차트 응답의 배열 행을 훑어 (날짜, 시가, 고가, 저가, 종가, 거래량)
+튜플을 바로 만들어 냅니다.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, List, Tuple
+
+PriceRow = Tuple[str, int, int, int, int, int]
+
+PRICE_FIELDS = ("date", "open", "high", "low", "close", "volume")
+
+_DATE_RE = re.compile(r"(\d{4})\.(\d{2})\.(\d{2})")
+# 태그 속성(class="tah p11" 등)의 숫자를 피하도록 태그 사이 텍스트에서만 숫자를 찾습니다.
+_NUMBER_RE = re.compile(r"(?:^|>)\s*(\d[\d,]*)\s*(?:<|$)")
+
+# siseJson 행: ["20240102", 시가, 고가, 저가, 종가, 거래량, 외국인소진율]
+_CHART_ROW_RE = re.compile(
+    r'\[\s*"(\d{4})(\d{2})(\d{2})"\s*,'
+    r"\s*([\d.]+)\s*,\s*([\d.]+)\s*,\s*([\d.]+)\s*,\s*([\d.]+)\s*,\s*([\d.]+)"
+)
+
+# sise_day 표의 열 순서: 날짜, 종가, 전일비, 시가, 고가, 저가, 거래량
+_CLOSE, _OPEN, _HIGH, _LOW, _VOLUME = 1, 3, 4, 5, 6
+
+
+def _to_int(cell: str) -> int | None:
+    match = _NUMBER_RE.search(cell)
+    if match is None:
+        return None
+    return int(match.group(1).replace(",", ""))
+
+
+def parse_sise_day(html: str) -> List[PriceRow]:
+    """sise_day HTML에서 (날짜, 시가, 고가, 저가, 종가, 거래량) 튜플 목록을 추출합니다.
+
+    날짜는 ``YYYY-MM-DD`` 문자열이며 페이지에 표시된 순서(최신순)를 유지합니다.
+    날짜나 숫자가 비어 있는 구분용 행은 건너뜁니다.
+    """
+
+    table_start = html.find('class="type2"')
+    if table_start < 0:
+        return []
+    table_end = html.find("</table>", table_start)
+    table = html[table_start:table_end if table_end >= 0 else len(html)]
+
+    rows: List[PriceRow] = []
+    # 정규식 역추적 없이 문자열 분할만으로 행과 셀을 잘라 냅니다.
+    for row_html in table.split("<tr")[1:]:
+        tag_end = row_html.find(">")
+        if "onmouseover" not in row_html[:tag_end]:
+            continue
+
+        cells = [
+            cell[cell.find(">") + 1:cell.find("</td>")]
+            for cell in row_html[tag_end:].split("<td")[1:]
+        ]
+        if len(cells) < 7:
+            continue
+
+        date_match = _DATE_RE.search(cells[0])
+        if date_match is None:
+            continue
+
+        close = _to_int(cells[_CLOSE])
+        open_ = _to_int(cells[_OPEN])
+        high = _to_int(cells[_HIGH])
+        low = _to_int(cells[_LOW])
+        volume = _to_int(cells[_VOLUME])
+        if close is None or open_ is None or high is None or low is None or volume is None:
+            continue
+
+        year, month, day = date_match.groups()
+        rows.append((f"{year}-{month}-{day}", open_, high, low, close, volume))
+
+    return rows
+
+
+def parse_sise_json(text: str) -> List[PriceRow]:
+    """siseJson 차트 응답에서 (날짜, 시가, 고가, 저가, 종가, 거래량) 튜플 목록을 추출합니다.
+
+    응답은 작은따옴표 헤더가 섞인 JSON 유사 배열이므로 데이터 행만 정규식으로 읽습니다.
+    결과는 응답 순서(오래된 날짜부터)를 유지합니다.
+    """
+
+    return [
+        (
+            f"{year}-{month}-{day}",
+            int(float(open_)),
+            int(float(high)),
+            int(float(low)),
+            int(float(close)),
+            int(float(volume)),
+        )
+        for year, month, day, open_, high, low, close, volume in _CHART_ROW_RE.findall(text)
+    ]
+
+
+def rows_to_records(rows: Iterable[PriceRow]) -> List[Dict[str, int | str]]:
+    """파서 결과 튜플을 Firestore에 저장하는 딕셔너리 형태로 변환합니다."""
+
+    return [dict(zip(PRICE_FIELDS, row)) for row in rows]
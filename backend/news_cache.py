@@ -0,0 +1,210 @@
+"""뉴스 API 응답을 담는 크기 제한 LRU 캐시와 파일 저장.
+
+키는 사용자가 보낸 검색어로 만들어지므로 개수(``NEWS_CACHE_MAX_ENTRIES``)와 직렬화한
+크기(``NEWS_CACHE_MAX_BYTES``)를 모두 제한하고, 넘치면 가장 오래 쓰지 않은 항목부터
+버립니다. 유효 기간은 호출하는 쪽이 항목의 저장 시각으로 판단하며, 대체 캐시 기간
+(``fallback_ttl``)이 지난 항목은 더 쓸 일이 없으므로 조회·저장 때 지웁니다.
+
+파일 저장은 요청 처리 경로에서 하지 않습니다. ``put``은 변경 표시만 하고, 백그라운드
+스레드가 ``NEWS_CACHE_FLUSH_SECONDS`` 동안 모인 변경을 한 번에 씁니다. 항목마다 넣을 때
+직렬화해 둔 JSON 조각을 이어 붙이므로 저장할 때 데이터를 다시 직렬화하지 않고, 같은
+디렉터리의 임시 파일에 쓴 뒤 ``os.replace``로 바꿔 끼우므로 작업자가 도중에 죽어도 파일이
+깨지지 않습니다. 파일 형식은 ``{키: [데이터, ISO 시각]}``으로 이전과 같습니다.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+NEWS_CACHE_MAX_ENTRIES = max(1, int(os.getenv("NEWS_CACHE_MAX_ENTRIES", "512")))
+NEWS_CACHE_MAX_BYTES = max(1, int(os.getenv("NEWS_CACHE_MAX_BYTES", str(8 * 1024 * 1024))))
+NEWS_CACHE_FLUSH_SECONDS = max(0.0, float(os.getenv("NEWS_CACHE_FLUSH_SECONDS", "2")))
+
+
+class _Entry(NamedTuple):
+    data: Any
+    timestamp: datetime
+    encoded: str
+
+
+class NewsCache:
+    """뉴스 목록을 (데이터, 저장 시각)으로 보관합니다. 모든 메서드는 여러 스레드에서 불러도 됩니다.
+
+    파일은 처음 조회하거나 저장할 때 한 번 읽습니다.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        fallback_ttl: float,
+        max_entries: int = NEWS_CACHE_MAX_ENTRIES,
+        max_bytes: int = NEWS_CACHE_MAX_BYTES,
+        flush_seconds: float = NEWS_CACHE_FLUSH_SECONDS,
+    ) -> None:
+        self.path = Path(path)
+        self._fallback_ttl = timedelta(seconds=fallback_ttl)
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._loaded = False
+        self._dirty = threading.Event()
+        self._writer: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """보관 중인 항목을 직렬화한 크기의 합."""
+
+        with self._lock:
+            return self._bytes
+
+    # --- 조회·저장 ---------------------------------------------------------------------
+
+    def get(self, key: str, now: datetime | None = None) -> Tuple[Any, datetime] | None:
+        """(데이터, 저장 시각)을 반환하고 최근 사용으로 표시합니다. 없거나 너무 오래됐으면 ``None``입니다."""
+
+        self.load()
+        now = now or datetime.now()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.timestamp + self._fallback_ttl:
+                self._entries.move_to_end(key)
+                return entry.data, entry.timestamp
+            if entry is not None:
+                self._remove_locked(key)
+        if entry is not None:
+            self._schedule_flush()
+        return None
+
+    def put(self, key: str, data: Any, timestamp: datetime | None = None) -> None:
+        """항목을 넣고 제한을 넘는 만큼 오래된 항목을 버린 뒤, 파일 저장을 예약합니다.
+
+        혼자서 ``max_bytes``를 넘는 항목은 보관하지 않습니다.
+        """
+
+        self.load()
+        entry = _Entry(data, timestamp or datetime.now(), json.dumps(data, ensure_ascii=False))
+        size = self._size(key, entry)
+        with self._lock:
+            self._remove_locked(key)
+            if size > self._max_bytes:
+                LOGGER.warning("뉴스 캐시 항목이 너무 커서(%d bytes) 보관하지 않습니다: %s", size, key)
+            else:
+                self._entries[key] = entry
+                self._bytes += size
+                self._evict_locked()
+        self._schedule_flush()
+
+    def _size(self, key: str, entry: _Entry) -> int:
+        return len(key.encode("utf-8")) + len(entry.encoded.encode("utf-8"))
+
+    def _remove_locked(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= self._size(key, entry)
+
+    def _evict_locked(self) -> None:
+        while self._entries and (len(self._entries) > self._max_entries or self._bytes > self._max_bytes):
+            key, entry = self._entries.popitem(last=False)
+            self._bytes -= self._size(key, entry)
+            LOGGER.debug("뉴스 캐시에서 오래 쓰지 않은 항목을 버립니다: %s", key)
+
+    # --- 파일 ---------------------------------------------------------------------------
+
+    def load(self) -> None:
+        """캐시 파일을 한 번만 읽어 들입니다. 대체 캐시 기간이 지난 항목은 건너뜁니다."""
+
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not self.path.exists():
+                LOGGER.info("뉴스 캐시 파일 '%s'이 없어 빈 캐시로 시작합니다.", self.path)
+                return
+            try:
+                with self.path.open("r", encoding="utf-8") as handle:
+                    stored: Dict[str, Any] = json.load(handle)
+                now = datetime.now()
+                for key, (data, timestamp_text) in stored.items():
+                    timestamp = datetime.fromisoformat(timestamp_text)
+                    if now >= timestamp + self._fallback_ttl:
+                        continue
+                    entry = _Entry(data, timestamp, json.dumps(data, ensure_ascii=False))
+                    self._entries[key] = entry
+                    self._bytes += self._size(key, entry)
+                self._evict_locked()
+            except (OSError, ValueError, TypeError) as exc:
+                LOGGER.error("뉴스 캐시 파일 '%s'을 읽지 못해 빈 캐시로 시작합니다: %s", self.path, exc)
+                self._entries.clear()
+                self._bytes = 0
+                return
+            LOGGER.info("뉴스 캐시 파일 '%s'에서 %d개 항목을 읽었습니다.", self.path, len(self._entries))
+
+    def flush(self) -> bool:
+        """현재 항목을 임시 파일에 쓴 뒤 원자적으로 바꿔 끼웁니다. 성공하면 참입니다."""
+
+        self._dirty.clear()
+        with self._lock:
+            snapshot = [(key, entry.encoded, entry.timestamp) for key, entry in self._entries.items()]
+        body = ",\n".join(
+            f"{json.dumps(key, ensure_ascii=False)}: [{encoded}, \"{timestamp.isoformat()}\"]"
+            for key, encoded, timestamp in snapshot
+        )
+        directory = self.path.parent
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            handle, temp_name = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(handle, "w", encoding="utf-8") as stream:
+                    stream.write("{\n" + body + "\n}\n")
+                    stream.flush()
+                    os.fsync(stream.fileno())
+                os.replace(temp_name, self.path)
+            except BaseException:
+                Path(temp_name).unlink(missing_ok=True)
+                raise
+        except OSError as exc:
+            LOGGER.error("뉴스 캐시 파일 '%s' 저장 오류: %s", self.path, exc)
+            self._dirty.set()
+            return False
+        LOGGER.debug("뉴스 캐시 %d개 항목을 '%s'에 저장했습니다.", len(snapshot), self.path)
+        return True
+
+    def _schedule_flush(self) -> None:
+        self._dirty.set()
+        with self._lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(target=self._write_behind, name="news-cache-writer", daemon=True)
+            self._writer.start()
+        atexit.register(self._flush_at_exit)
+
+    def _write_behind(self) -> None:
+        while True:
+            self._dirty.wait()
+            # 잠시 기다려 그 사이 들어온 변경을 한 번의 쓰기로 모읍니다.
+            time.sleep(self._flush_seconds)
+            if not self.flush():
+                time.sleep(max(self._flush_seconds, 1.0))
+
+    def _flush_at_exit(self) -> None:
+        if self._dirty.is_set():
+            self.flush()
@@ -4,6 +4,7 @@ import re
 import urllib.parse
 import requests
 from bs4 import BeautifulSoup
+import http_client
 # 💡 수정: blog_parser 임포트도 절대 경로 임포트로
 from blog_parser import is_news_reporter_line, NEWS_END_MARKERS, _clean_and_filter_text_from_elements
 # 💡 수정: constants.py에서 DEFAULT_HEADERS 임포트 (상대 경로 제거)
@@ -16,7 +17,7 @@ def extract_general_news_text(url: str, summary_from_list: str = None) -> str:
     이 함수는 GUI 앱의 본문 수집에 사용될 수 있습니다.
     """
     try:
-        response = requests.get(url, headers=DEFAULT_HEADERS, timeout=10)
+        response = http_client.get(url, headers=DEFAULT_HEADERS, timeout=10)
         response.raise_for_status()
 
         html_content = response.text 
@@ -111,7 +112,7 @@ def get_health_chosun_article_content(article_url: str) -> str:
     이 함수는 GUI 앱의 본문 수집에 사용될 수 있습니다.
     """
     try:
-        response = requests.get(article_url, headers=DEFAULT_HEADERS, timeout=10)
+        response = http_client.get(article_url, headers=DEFAULT_HEADERS, timeout=10)
         response.raise_for_status()
 
         try:
@@ -0,0 +1,80 @@
+"""pykrx 일별 시세를 종목별 열 단위 ``.npz`` 파일로 보관하는 로컬 캐시.
+
+``portfolio_updater``는 실행할 때마다 1년치 시세를 받지만, 어제까지의 봉은 대부분 바뀌지
+않습니다. 받은 시세를 ``{OHLCV_CACHE_DIR}/{ticker}.npz``에 날짜·시가·고가·저가·종가·거래량
+열 배열과 받은 기간(``covered``: 시작·끝 YYYYMMDD)으로 저장해 두고, 다음 실행에서는 캐시가
+덮는 기간 이후의 꼬리만 새로 요청합니다.
+
+파일은 같은 디렉터리의 임시 파일에 쓴 뒤 ``os.replace``로 바꿔 끼우므로, 도중에 멈춰도
+읽는 쪽이 반쯤 쓴 파일을 보지 않습니다. 종목마다 파일이 따로라 서로 다른 종목은 여러
+스레드에서 동시에 읽고 써도 됩니다.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+from price_series import PriceSeries
+
+LOGGER = logging.getLogger(__name__)
+
+OHLCV_CACHE = os.getenv("OHLCV_CACHE", "1").strip().lower() not in {"0", "false", "no"}
+OHLCV_CACHE_DIR = os.getenv("OHLCV_CACHE_DIR", str(Path(__file__).resolve().parent / ".cache" / "ohlcv"))
+
+_COLUMNS = ("dates", "open", "high", "low", "close", "volume")
+
+CachedSeries = Tuple[PriceSeries, int, int]
+
+
+class OhlcvCache:
+    """종목별 시세와 그 시세를 받은 기간을 읽고 씁니다."""
+
+    def __init__(self, directory: str | Path = OHLCV_CACHE_DIR) -> None:
+        self.directory = Path(directory)
+
+    def path(self, ticker: str) -> Path:
+        return self.directory / f"{ticker}.npz"
+
+    def load(self, ticker: str) -> CachedSeries | None:
+        """(시세, 받은 기간 시작, 받은 기간 끝)을 반환합니다. 없거나 읽을 수 없으면 ``None``입니다."""
+
+        path = self.path(ticker)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                covered_from, covered_through = (int(value) for value in data["covered"])
+                series = PriceSeries(*(data[name] for name in _COLUMNS))
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.warning("%s 시세 캐시를 읽지 못해 새로 받습니다: %s", ticker, path, exc_info=True)
+            return None
+        return series, covered_from, covered_through
+
+    def store(self, ticker: str, series: PriceSeries, covered_from: int, covered_through: int) -> None:
+        """시세와 받은 기간을 임시 파일에 쓴 뒤 원자적으로 바꿔 끼웁니다."""
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        handle, temp_name = tempfile.mkstemp(prefix=f".{ticker}.", suffix=".npz", dir=self.directory)
+        try:
+            with os.fdopen(handle, "wb") as stream:
+                np.savez_compressed(
+                    stream,
+                    covered=np.array([covered_from, covered_through], dtype=np.int64),
+                    **{name: series.column(name) for name in _COLUMNS},
+                )
+            os.replace(temp_name, self.path(ticker))
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+
+def open_cache() -> OhlcvCache | None:
+    """``OHLCV_CACHE``가 켜져 있으면 캐시를 엽니다."""
+
+    return OhlcvCache() if OHLCV_CACHE else None
@@ -2,20 +2,63 @@
 
 from __future__ import annotations
 
+import json
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Iterable, List, Tuple
-
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+from functools import partial
+from typing import Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
 from google.cloud import firestore
 from pykrx import stock
 
+from freshness_ledger import FreshnessLedger, latest_bar, open_ledger
+from ohlcv_cache import OhlcvCache, open_cache
+from price_series import PriceSeries
+from price_storage import (
+    HEAD_SUMMARY_FIELDS,
+    PRICE_STORAGE_MODE,
+    STORAGE_MODE_CHUNKED,
+    is_chunked,
+    plan_chunked_update,
+    read_price_history,
+)
+from scrape_pipeline import WriterStage
+from target_hits import needs_evaluation, plan_leg_hits, start_key
+
 LOGGER = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 FIRESTORE_COLLECTION_PRICES = 'stock_prices'
 PORTFOLIO_COLLECTION = "portfolioStocks"
 BATCH_WRITE_LIMIT = 400
+# Firestore WriteBatch 한 번에 담을 수 있는 쓰기 수의 상한입니다.
+MAX_BATCH_OPERATIONS = 500
+# 커밋 요청 하나의 크기 상한(10 MiB)보다 여유를 둔 배치당 추정 바이트 상한과, 대기 중인
+# 종목 크기를 어림할 봉 하나의 추정 바이트입니다.
+MAX_BATCH_BYTES = max(1, int(os.getenv("PORTFOLIO_MAX_BATCH_BYTES", str(8 * 1024 * 1024))))
+PRICE_RECORD_BYTES = 128
 FETCH_DAYS = 365
+# "ticker"는 종목마다 1년치를 조회하고, "date"는 거래일마다 전 종목 시세를 한 번에 조회합니다.
+FETCH_MODE_TICKER = "ticker"
+FETCH_MODE_DATE = "date"
+FETCH_MODE = os.getenv("PORTFOLIO_FETCH_MODE", FETCH_MODE_TICKER).strip().lower()
+# "date" 모드에서 새로 받을 기간(일). 나머지 기간은 저장된 시세로 채우고, 저장된 시세가
+# 없거나 이 기간 앞에서 끊긴 종목은 "ticker" 경로로 1년치를 받습니다.
+REFRESH_DAYS = max(1, int(os.getenv("PORTFOLIO_REFRESH_DAYS", "5")))
+PREFETCH_CHUNK_SIZE = 100
+OHLC_COLUMNS = ("시가", "고가", "저가", "종가")
+# "ticker" 모드에서 pykrx를 동시에 호출할 스레드 수와 실패 시 재시도 횟수·기본 대기(초)입니다.
+FETCH_CONCURRENCY = max(1, int(os.getenv("PORTFOLIO_FETCH_CONCURRENCY", "4")))
+FETCH_RETRIES = max(1, int(os.getenv("PORTFOLIO_FETCH_RETRIES", "3")))
+FETCH_RETRY_BASE_SECONDS = float(os.getenv("PORTFOLIO_FETCH_RETRY_SECONDS", "1.0"))
+# 수집 결과가 커밋을 기다리며 쌓일 수 있는 최대 종목 수입니다. 작성 스레드가 배치 하나를
+# 모으는 동안 수집 쪽이 잠깐 앞서 나갈 만큼만 두어, 메모리에는 배치 하나와 이 분량만 남습니다.
+COMMIT_QUEUE_SIZE = max(1, int(os.getenv("PORTFOLIO_COMMIT_QUEUE_SIZE", str(BATCH_WRITE_LIMIT // 4))))
 
 
 def get_all_tickers() -> List[str]:
@@ -28,90 +71,458 @@ def get_all_tickers() -> List[str]:
     return tickers
 
 
-def fetch_price_history(ticker: str) -> List[Dict[str, object]]:
-    """단일 종목의 1년치 일별 시세를 조회해 직렬화 가능한 리스트로 변환합니다."""
+def _key_to_date(key: int) -> date:
+    return date(key // 10000, key // 100 % 100, key % 100)
+
+
+def _date_to_key(day: date) -> int:
+    return day.year * 10000 + day.month * 100 + day.day
+
 
-    end_date = datetime.today()
-    start_date = end_date - timedelta(days=FETCH_DAYS)
-    df = stock.get_market_ohlcv_by_date(
-        start_date.strftime("%Y%m%d"),
-        end_date.strftime("%Y%m%d"),
-        ticker,
+def fetch_ohlcv(ticker: str, start: date, end: date) -> PriceSeries:
+    """``start``~``end`` 기간 일별 시세를 pykrx로 조회해 ``PriceSeries``로 반환합니다.
+
+    DataFrame 열을 그대로 배열로 옮기므로 봉마다 dict를 만들지 않습니다.
+    """
+
+    df = stock.get_market_ohlcv_by_date(start.strftime("%Y%m%d"), end.strftime("%Y%m%d"), ticker)
+    if df is None or df.empty:
+        return PriceSeries()
+
+    index = df.index
+    return PriceSeries(
+        (index.year * 10000 + index.month * 100 + index.day).to_numpy(),
+        df["시가"].to_numpy(),
+        df["고가"].to_numpy(),
+        df["저가"].to_numpy(),
+        df["종가"].to_numpy(),
+        df["거래량"].to_numpy(),
     )
 
-    if df.empty:
+
+def fetch_ohlcv_with_retry(
+    ticker: str,
+    start: date,
+    end: date,
+    attempts: int = FETCH_RETRIES,
+) -> PriceSeries:
+    """``fetch_ohlcv``가 실패하면 지수적으로 늘어나는 간격을 두고 ``attempts``번까지 시도합니다."""
+
+    for attempt in range(1, attempts + 1):
+        try:
+            return fetch_ohlcv(ticker, start, end)
+        except Exception as exc:  # pylint: disable=broad-except
+            if attempt >= attempts:
+                raise
+            delay = FETCH_RETRY_BASE_SECONDS * (2 ** (attempt - 1))
+            LOGGER.warning("%s 종목 시세 조회 재시도 %d/%d (%.1f초 후): %s", ticker, attempt, attempts, delay, exc)
+            time.sleep(delay)
+    return PriceSeries()
+
+
+def fetch_price_history(
+    ticker: str,
+    cache: OhlcvCache | None = None,
+    today: date | None = None,
+) -> PriceSeries:
+    """단일 종목의 ``FETCH_DAYS``일치 일별 시세를 반환합니다.
+
+    ``cache``에 기간 시작부터 받아 둔 시세가 있으면 마지막 두 봉부터만 다시 받아
+    병합합니다. 마지막 봉은 장중에 받았을 수 있어 다시 받고, 그 앞 봉은 이미 확정된
+    값이므로 달라졌다면 액면분할 등으로 수정주가가 다시 계산된 것으로 보고 기간 전체를
+    새로 받습니다.
+    """
+
+    end = today or date.today()
+    window_start = end - timedelta(days=FETCH_DAYS)
+    cached = cache.load(ticker) if cache is not None else None
+
+    series: PriceSeries | None = None
+    if cached is not None and cached[1] <= _date_to_key(window_start) and len(cached[0]) >= 2:
+        stored = cached[0]
+        anchor = stored[-2]
+        tail = fetch_ohlcv_with_retry(ticker, _key_to_date(anchor[0]), end)  # type: ignore[index]
+        position = tail.index_of(anchor[0])  # type: ignore[index]
+        if position is not None and tail[position] == anchor:
+            series, _ = stored.merge(tail)
+        else:
+            LOGGER.info("%s 종목의 확정된 봉이 캐시와 달라 기간 전체를 다시 받습니다.", ticker)
+
+    if series is None:
+        series = fetch_ohlcv_with_retry(ticker, window_start, end)
+        if not series and cached is not None and cached[0]:
+            # 일시적으로 빈 응답이 온 것일 수 있어 캐시를 지우지 않고 이전 시세를 씁니다.
+            LOGGER.warning("%s 종목 조회 결과가 비어 캐시된 시세를 씁니다.", ticker)
+            return cached[0].between(window_start)
+
+    series = series.between(window_start)
+    if cache is not None:
+        try:
+            cache.store(ticker, series, _date_to_key(window_start), _date_to_key(end))
+        except OSError:
+            LOGGER.warning("%s 시세 캐시를 쓰지 못했습니다.", ticker, exc_info=True)
+    if not series:
         LOGGER.warning("%s 종목에서 가격 데이터를 찾을 수 없습니다.", ticker)
-        return []
-
-    df = df.reset_index().rename(
-        columns={
-            "날짜": "date",
-            "시가": "open",
-            "고가": "high",
-            "저가": "low",
-            "종가": "close",
-            "거래량": "volume",
-        }
-    )
+    return series
 
-    df["date"] = df["date"].dt.strftime("%Y-%m-%d")
-    records: List[Dict[str, object]] = df.to_dict(orient="records")
-    return records
 
+def iter_weekdays(start: date, end: date) -> Iterator[date]:
+    current = start
+    while current <= end:
+        if current.weekday() < 5:
+            yield current
+        current += timedelta(days=1)
 
-def commit_in_batches(
-    db: firestore.Client,
-    writes: Iterable[Tuple[firestore.DocumentReference, Dict[str, object]]],
-) -> None:
-    """Firestore 배치 쓰기를 수행합니다."""
 
-    batch = db.batch()
-    counter = 0
-    for counter, (doc_ref, data) in enumerate(writes, start=1):
-        batch.set(doc_ref, data)
-        if counter % BATCH_WRITE_LIMIT == 0:
-            batch.commit()
-            batch = db.batch()
-    if counter % BATCH_WRITE_LIMIT != 0:
-        batch.commit()
+def is_closed_market_frame(df: pd.DataFrame) -> bool:
+    """전 종목 시세 표의 시가·고가·저가·종가가 모두 0이면 휴장일 응답으로 봅니다."""
 
+    return not df[list(OHLC_COLUMNS)].to_numpy().any()
 
-def update_stock_prices(db: firestore.Client, tickers: List[str]) -> None:
-    """주가 정보를 Firestore에 저장합니다."""
 
-    updates: List[Tuple[firestore.DocumentReference, Dict[str, object]]] = []
-    for ticker in tickers:
+def fetch_market_snapshots(
+    start: date,
+    end: date,
+    tickers: Iterable[str] | None = None,
+) -> List[Tuple[int, pd.DataFrame]]:
+    """``start``~``end`` 거래일마다 전 종목 시세를 한 번씩 조회해 (YYYYMMDD, DataFrame) 목록으로 반환합니다.
+
+    pykrx는 휴장일에도 빈 표 대신 모든 종목의 시가·고가·저가·종가가 0인 표를 돌려주므로,
+    빈 표와 함께 이런 표도 휴장일로 보고 건너뜁니다. ``tickers``가 주어지면 받은 즉시 그 종목
+    행만 남겨 시장 전체 표를 들고 있지 않습니다.
+    """
+
+    wanted = list(tickers) if tickers is not None else None
+
+    snapshots: List[Tuple[int, pd.DataFrame]] = []
+    for day in iter_weekdays(start, end):
         try:
-            prices = fetch_price_history(ticker)
+            df = stock.get_market_ohlcv(day.strftime("%Y%m%d"), market="ALL")
         except Exception:  # pylint: disable=broad-except
-            LOGGER.exception("%s 종목 가격 수집 실패", ticker)
+            LOGGER.exception("%s 전 종목 시세 조회 실패", day.isoformat())
             continue
+        if df is None or df.empty or is_closed_market_frame(df):
+            continue
+        if wanted is not None:
+            df = df[df.index.astype(str).isin(wanted)]
+        snapshots.append((day.year * 10000 + day.month * 100 + day.day, df))
+    LOGGER.info("%s~%s 거래일 %d일의 전 종목 시세를 조회했습니다.", start, end, len(snapshots))
+    return snapshots
+
+
+def pivot_snapshots(
+    snapshots: Sequence[Tuple[int, pd.DataFrame]],
+    tickers: Iterable[str] | None = None,
+) -> Dict[str, PriceSeries]:
+    """날짜별 전 종목 시세를 종목별 ``PriceSeries``로 바꿉니다.
+
+    모든 날짜를 한 표로 이어 붙여 (종목, 날짜) 순으로 정렬한 뒤, 종목이 바뀌는 경계만
+    NumPy로 찾아 열 배열을 잘라 넘깁니다. 행마다 파이썬 객체를 만들지 않습니다.
+    """
+
+    if not snapshots:
+        return {}
+    frames = []
+    for day_key, df in snapshots:
+        frame = df[["시가", "고가", "저가", "종가", "거래량"]].copy()
+        frame.index = frame.index.astype(str).rename("ticker")
+        frame["date"] = day_key
+        frames.append(frame)
+    table = pd.concat(frames)
+    if tickers is not None:
+        table = table[table.index.isin(list(tickers))]
+    if table.empty:
+        return {}
+    table = table.reset_index().sort_values(["ticker", "date"], kind="stable")
+
+    codes = table["ticker"].to_numpy()
+    columns = [
+        table[name].to_numpy(dtype=np.int64)
+        for name in ("date", "시가", "고가", "저가", "종가", "거래량")
+    ]
+    bounds = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(codes)]))
+    return {
+        str(codes[start]): PriceSeries(*(column[start:end] for column in columns))
+        for start, end in zip(starts, ends)
+    }
 
-        doc_ref = db.collection(FIRESTORE_COLLECTION_PRICES).document(ticker)
-        updates.append(
-            (
-                doc_ref,
-                {
-                    "ticker": ticker,
-                    "prices": prices,
-                    "updatedAt": firestore.SERVER_TIMESTAMP,
-                },
-            )
-        )
 
-    if updates:
-        commit_in_batches(db, updates)
-        LOGGER.info("총 %d개 종목 가격을 Firestore에 반영했습니다.", len(updates))
+def iter_price_documents(
+    db: firestore.Client,
+    tickers: Sequence[str],
+    field_paths: Sequence[str],
+) -> Iterator[Tuple[str, Dict[str, object]]]:
+    """``stock_prices`` 문서를 ``PREFETCH_CHUNK_SIZE``개씩 ``get_all``로 읽어 (종목, 데이터)를 내보냅니다."""
+
+    collection_ref = db.collection(FIRESTORE_COLLECTION_PRICES)
+    for start in range(0, len(tickers), PREFETCH_CHUNK_SIZE):
+        refs = [collection_ref.document(ticker) for ticker in tickers[start:start + PREFETCH_CHUNK_SIZE]]
+        for snapshot in db.get_all(refs, field_paths=list(field_paths)):
+            if snapshot.exists:
+                yield snapshot.id, snapshot.to_dict() or {}
+
+
+def load_stored_series(db: firestore.Client, tickers: Sequence[str]) -> Dict[str, PriceSeries]:
+    """저장된 ``prices``를 ``get_all`` 묶음으로 읽어 ``PriceSeries``로 반환합니다."""
+
+    return {
+        ticker: PriceSeries.from_records(data.get("prices"))  # type: ignore[arg-type]
+        for ticker, data in iter_price_documents(db, tickers, ["prices"])
+    }
+
+
+def collect_by_ticker(
+    tickers: Iterable[str],
+    cache: OhlcvCache | None = None,
+    concurrency: int = FETCH_CONCURRENCY,
+) -> Iterator[Tuple[str, PriceSeries]]:
+    """종목마다 ``fetch_price_history``를 스레드 풀에서 호출하고, 끝나는 순서대로 내보냅니다.
+
+    제출 대기열은 동시성의 두 배로 제한해 종목 목록 전체를 한꺼번에 올리지 않습니다.
+    재시도 끝에도 실패한 종목은 로그만 남기고 건너뜁니다.
+    """
+
+    pending: Dict[Future, str] = {}
+
+    def collect(done: Iterable[Future]) -> Iterator[Tuple[str, PriceSeries]]:
+        for future in done:
+            ticker = pending.pop(future)
+            try:
+                prices = future.result()
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception("%s 종목 가격 수집 실패", ticker)
+                continue
+            yield ticker, prices
+
+    today = date.today()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="pykrx") as executor:
+        for ticker in tickers:
+            if len(pending) >= concurrency * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from collect(done)
+            pending[executor.submit(fetch_price_history, ticker, cache, today)] = ticker
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from collect(done)
+
+
+def collect_by_date(
+    db: firestore.Client,
+    tickers: Sequence[str],
+    refresh_days: int = REFRESH_DAYS,
+) -> Iterator[Tuple[str, PriceSeries]]:
+    """거래일마다 전 종목 시세를 받아 종목별로 나눕니다.
+
+    최근 ``refresh_days``일만 받아 저장된 시세에 병합하고, 결과는 ``FETCH_DAYS`` 기간으로
+    잘라 ``ticker`` 모드와 같은 모양을 유지합니다. 기본값이면 pykrx 호출은 그 기간의
+    거래일 수만큼입니다. 피벗과 저장된 시세 읽기는 ``PREFETCH_CHUNK_SIZE``개 종목씩 나눠
+    하므로 한 번에 한 묶음만 메모리에 둡니다. 저장된 시세가 없거나 받은 기간 앞에서
+    끊긴 종목(신규 상장 등)은 마지막에 ``collect_by_ticker``로 1년치를 받습니다.
+    """
+
+    end_date = datetime.today().date()
+    window_start = end_date - timedelta(days=FETCH_DAYS)
+    fetch_start = max(window_start, end_date - timedelta(days=refresh_days))
+    snapshots = fetch_market_snapshots(fetch_start, end_date, tickers)
+    needs_history = fetch_start > window_start
+    backfill: List[str] = []
+
+    for offset in range(0, len(tickers), PREFETCH_CHUNK_SIZE):
+        chunk = tickers[offset:offset + PREFETCH_CHUNK_SIZE]
+        fetched = pivot_snapshots(snapshots, chunk)
+        stored = load_stored_series(db, [ticker for ticker in chunk if ticker in fetched]) if needs_history else {}
+        for ticker in chunk:
+            prices = fetched.get(ticker)
+            if prices is None:
+                LOGGER.warning("%s 종목에서 가격 데이터를 찾을 수 없습니다.", ticker)
+                continue
+            if needs_history:
+                history = stored.get(ticker)
+                # 저장된 마지막 봉이 받은 기간보다 앞이면 그 사이가 비어 있을 수 있습니다.
+                if not history or history.dates[-1] < _date_to_key(fetch_start):
+                    backfill.append(ticker)
+                    continue
+                prices, _ = history.merge(prices)
+                prices = prices.between(window_start)
+            yield ticker, prices
+
+    if backfill:
+        LOGGER.info("저장된 시세가 없거나 끊긴 %d개 종목은 종목별로 1년치를 받습니다.", len(backfill))
+        yield from collect_by_ticker(backfill, open_cache())
+
+
+def _estimate_bytes(data: Mapping[str, object]) -> int:
+    """쓰기 데이터의 JSON 직렬화 길이로 Firestore 요청 크기를 어림합니다."""
+
+    return len(json.dumps(data, default=str))
+
+
+class BatchCommitter:
+    """종목 시세를 모았다가 ``limit``개가 차거나 추정 크기가 ``max_bytes``에 이르는 대로 WriteBatch로 커밋합니다.
+
+    ``WriterStage`` 작성 스레드 하나에서만 호출하므로 잠금 없이 상태를 다룹니다. 커밋할
+    때 헤드 문서의 저장 방식 필드를 ``get_all`` 한 번으로 읽어, 연도 분할 문서이거나
+    ``PRICE_STORAGE_MODE``가 ``chunked``이면 ``plan_chunked_update``로 연도 문서와 헤드를
+    함께 쓰고, 아니면 헤드의 ``prices``만 바꿉니다. 어느 쪽이든 ``merge=True``로 써서
+    요약 필드 등 다른 필드는 보존합니다. 배치는 쓰기 수(``MAX_BATCH_OPERATIONS``)와
+    직렬화 크기 추정치(``max_bytes``) 중 먼저 차는 쪽에서 나눕니다. 커밋된 종목만 신선도 장부에 기록하며, 실패한
+    배치는 건수만 세고 다음 배치를 이어 갑니다.
+    """
+
+    def __init__(
+        self,
+        db: firestore.Client,
+        ledger: FreshnessLedger | None = None,
+        limit: int = BATCH_WRITE_LIMIT,
+        max_bytes: int = MAX_BATCH_BYTES,
+    ) -> None:
+        self._db = db
+        self._collection_ref = db.collection(FIRESTORE_COLLECTION_PRICES)
+        self._ledger = ledger
+        self._limit = limit
+        self._max_bytes = max_bytes
+        self._pending: List[Tuple[str, PriceSeries]] = []
+        self._pending_bytes = 0
+        self.committed = 0
+        self.failed = 0
+
+    def add(self, ticker: str, prices: PriceSeries) -> bool:
+        self._pending.append((ticker, prices))
+        self._pending_bytes += len(prices) * PRICE_RECORD_BYTES
+        if len(self._pending) >= self._limit or self._pending_bytes >= self._max_bytes:
+            self.flush()
+        return True
+
+    def _head_fields(self) -> List[str]:
+        # 단일 배열 문서를 연도 문서로 옮길 때만 기존 배열이 필요합니다.
+        if PRICE_STORAGE_MODE == STORAGE_MODE_CHUNKED:
+            return ["prices", *HEAD_SUMMARY_FIELDS]
+        return list(HEAD_SUMMARY_FIELDS)
+
+    def _writes_for(
+        self,
+        ticker: str,
+        prices: PriceSeries,
+        head_data: Mapping[str, object] | None,
+    ) -> List[Tuple[firestore.DocumentReference, Dict[str, object], bool]]:
+        """종목 하나를 반영할 (문서, 데이터, 병합 여부) 목록을 만듭니다."""
+
+        doc_ref = self._collection_ref.document(ticker)
+        records = prices.to_records()
+        head: Dict[str, object] = {
+            "ticker": ticker,
+            "currentPrice": prices.close[-1] if prices else None,
+            "priceDate": prices.last_date,
+            "updatedAt": firestore.SERVER_TIMESTAMP,
+        }
+        if PRICE_STORAGE_MODE != STORAGE_MODE_CHUNKED and not is_chunked(head_data):
+            return [(doc_ref, {**head, "prices": records}, True)]
+
+        plan = plan_chunked_update(self._db, doc_ref, head_data, records)
+        writes = [(year_ref, year_data, False) for year_ref, year_data in plan.year_writes]
+        # 연도 문서를 먼저 넣어 헤드가 가리키는 연도가 항상 존재하도록 합니다.
+        writes.append((doc_ref, {**head, **plan.head_fields}, True))
+        return writes
+
+    def flush(self) -> None:
+        pending, self._pending = self._pending, []
+        self._pending_bytes = 0
+        if not pending:
+            return
+        heads = dict(iter_price_documents(self._db, [ticker for ticker, _ in pending], self._head_fields()))
+
+        batch = self._db.batch()
+        operations = size = 0
+        tickers: List[Tuple[str, str | None, int | None]] = []
+        for ticker, prices in pending:
+            try:
+                writes = self._writes_for(ticker, prices, heads.get(ticker))
+            except Exception:  # pylint: disable=broad-except
+                self.failed += 1
+                LOGGER.exception("%s 종목 연도 문서 계획 실패", ticker)
+                continue
+            write_size = sum(_estimate_bytes(data) for _, data, _ in writes)
+            if tickers and (
+                operations + len(writes) > MAX_BATCH_OPERATIONS or size + write_size > self._max_bytes
+            ):
+                self._commit(batch, tickers)
+                batch, operations, size, tickers = self._db.batch(), 0, 0, []
+            for doc_ref, data, merge in writes:
+                batch.set(doc_ref, data, merge=merge)
+            operations += len(writes)
+            size += write_size
+            tickers.append((ticker, prices.last_date, prices.close[-1] if prices else None))
+        self._commit(batch, tickers)
+
+    def _commit(self, batch, tickers: List[Tuple[str, str | None, int | None]]) -> None:  # type: ignore[no-untyped-def]
+        if not tickers:
+            return
+        try:
+            batch.commit()
+        except Exception:  # pylint: disable=broad-except
+            self.failed += len(tickers)
+            LOGGER.exception("%d개 종목 배치 커밋 실패 (%s 등)", len(tickers), tickers[0][0])
+            return
+        self.committed += len(tickers)
+        LOGGER.info("%d개 종목 가격을 커밋했습니다 (누적 %d개).", len(tickers), self.committed)
+        if self._ledger is not None:
+            for ticker, last_date, last_close in tickers:
+                self._ledger.record(ticker, last_date, last_close)
+            self._ledger.flush()
+
+
+def update_stock_prices(
+    db: firestore.Client,
+    tickers: List[str],
+    ledger: FreshnessLedger | None = None,
+    mode: str = FETCH_MODE,
+) -> None:
+    """주가 정보를 Firestore에 저장하고, ``ledger``가 주어지면 신선도 장부도 갱신합니다.
+
+    ``mode``가 ``"date"``이면 거래일 단위 전 종목 조회(``collect_by_date``)를, 아니면
+    로컬 시세 캐시를 쓰는 종목별 병렬 조회(``collect_by_ticker``)를 씁니다.
+    수집한 종목은 ``COMMIT_QUEUE_SIZE`` 크기의 대기열을 거쳐 작성 스레드가 배치가 찰
+    때마다 바로 커밋하므로, 수집과 커밋이 겹쳐 돌고 메모리에는 대기열과 배치 하나 분량만
+    남습니다. 도중에 멈춰도 이미 커밋한 배치는 보존됩니다.
+    """
+
+    if mode == FETCH_MODE_DATE:
+        collected = collect_by_date(db, tickers)
+    else:
+        collected = collect_by_ticker(tickers, open_cache())
+    committer = BatchCommitter(db, ledger)
+    stage = WriterStage(COMMIT_QUEUE_SIZE)
+    try:
+        for ticker, prices in collected:
+            stage.submit(ticker, partial(committer.add, ticker, prices))
+    finally:
+        stage.close()
+        committer.flush()
+
+    LOGGER.info(
+        "총 %d개 종목 가격을 Firestore에 반영했습니다 (실패 %d개).",
+        committer.committed,
+        committer.failed + stage.failed,
+    )
 
 
 def calculate_progress(legs: List[Dict[str, object]], last_price: float) -> Dict[str, float]:
-    """매수·매도 레그 정보를 기반으로 진행률과 완료 개수를 계산합니다."""
+    """매수·매도 레그 정보를 기반으로 진행률과 완료 개수를 계산합니다.
+
+    목표가에 한 번이라도 닿아 ``hitDate``가 있는 레그는 현재가와 관계없이 완료로 셉니다.
+    """
 
     buy_legs = [leg for leg in legs if leg.get("type") == "BUY"]
     sell_legs = [leg for leg in legs if leg.get("type") == "SELL"]
 
-    buy_completed = sum(1 for leg in buy_legs if last_price <= float(leg.get("targetPrice", 0)))
-    sell_completed = sum(1 for leg in sell_legs if last_price >= float(leg.get("targetPrice", 0)))
+    buy_completed = sum(
+        1 for leg in buy_legs if leg.get("hitDate") or last_price <= float(leg.get("targetPrice", 0))
+    )
+    sell_completed = sum(
+        1 for leg in sell_legs if leg.get("hitDate") or last_price >= float(leg.get("targetPrice", 0))
+    )
 
     buy_total = len(buy_legs)
     sell_total = len(sell_legs)
@@ -130,50 +541,155 @@ def calculate_progress(legs: List[Dict[str, object]], last_price: float) -> Dict
     }
 
 
-def update_portfolio_status(db: firestore.Client) -> None:
-    """포트폴리오 종목 상태를 최신 가격에 맞춰 갱신합니다."""
+def evaluate_status(legs: List[Dict[str, object]], last_price: float) -> Dict[str, object]:
+    """레그 목록과 현재가로 상태 문서에 쓸 필드를 계산합니다."""
 
-    portfolio_ref = db.collection(PORTFOLIO_COLLECTION)
-    price_ref = db.collection(FIRESTORE_COLLECTION_PRICES)
+    progress = calculate_progress(legs, last_price)
 
-    for stock_doc in portfolio_ref.stream():
-        data = stock_doc.to_dict()
-        ticker = data.get("ticker")
-        if not ticker:
-            LOGGER.warning("%s 문서에 종목 코드가 없습니다.", stock_doc.id)
-            continue
+    status = "진행전"
+    if progress["buyCompleted"] > 0:
+        status = "진행중"
+    if progress["buyCompleted"] == progress["buyTotal"] and progress["sellCompleted"] == progress["sellTotal"]:
+        status = "완료"
 
-        price_snapshot = price_ref.document(ticker).get()
-        if not price_snapshot.exists:
-            LOGGER.warning("%s 종목의 가격 정보가 없습니다.", ticker)
+    return {
+        "lastPrice": last_price,
+        "status": status,
+        "statusUpdatedAt": firestore.SERVER_TIMESTAMP,
+        **progress,
+    }
+
+
+def load_legs_by_stock(
+    db: firestore.Client,
+) -> Dict[str, List[Tuple[firestore.DocumentReference, Dict[str, object]]]]:
+    """``legs`` 컬렉션 그룹을 한 번 조회해 포트폴리오 종목 문서 ID별로 (레그 참조, 데이터)를 묶습니다."""
+
+    legs_by_stock: Dict[str, List[Tuple[firestore.DocumentReference, Dict[str, object]]]] = {}
+    for leg_doc in db.collection_group("legs").stream():
+        stock_ref = leg_doc.reference.parent.parent
+        # 같은 이름의 하위 컬렉션이 다른 곳에 있어도 포트폴리오 종목의 레그만 씁니다.
+        if stock_ref is None or stock_ref.parent.id != PORTFOLIO_COLLECTION:
             continue
+        legs_by_stock.setdefault(stock_ref.id, []).append((leg_doc.reference, leg_doc.to_dict() or {}))
+    return legs_by_stock
+
+
+def load_hit_histories(db: firestore.Client, start_keys: Mapping[str, int]) -> Dict[str, PriceSeries]:
+    """도달일을 평가할 종목의 시세를 ``PriceSeries``로 읽습니다.
+
+    ``start_keys``는 종목별로 다시 봐야 하는 첫 날짜(YYYYMMDD, 0이면 처음부터)입니다.
+    헤드 문서만으로 그 날짜까지 거슬러 갈 수 없는 연도 분할 문서는 필요한 연도 문서를
+    더 읽습니다.
+    """
+
+    histories: Dict[str, PriceSeries] = {}
+    collection_ref = db.collection(FIRESTORE_COLLECTION_PRICES)
+    for ticker, data in iter_price_documents(db, list(start_keys), ["prices", *HEAD_SUMMARY_FIELDS]):
+        series = PriceSeries.from_records(data.get("prices"))  # type: ignore[arg-type]
+        start = start_keys[ticker]
+        if is_chunked(data) and (not series or series.dates[0] > start):
+            series = PriceSeries.from_records(
+                read_price_history(db, collection_ref.document(ticker), start=start or None, head_data=data)
+            )
+        histories[ticker] = series
+    return histories
+
+
+def load_last_prices(db: firestore.Client, tickers: Sequence[str]) -> Dict[str, float]:
+    """종목별 최신가를 읽습니다.
+
+    먼저 헤드 요약 필드(``currentPrice``, ``lastClose``)만 읽고, 요약 필드가 없는 옛
+    문서만 ``prices``를 읽어 날짜가 가장 늦은 봉의 종가를 씁니다.
+    """
 
-        prices = price_snapshot.to_dict().get("prices", [])
-        if not prices:
-            LOGGER.warning("%s 종목의 가격 리스트가 비어 있습니다.", ticker)
+    last_prices: Dict[str, float] = {}
+    for ticker, data in iter_price_documents(db, tickers, ["currentPrice", "lastClose"]):
+        value = data.get("currentPrice")
+        if value is None:
+            value = data.get("lastClose")
+        if value is not None:
+            last_prices[ticker] = float(value)  # type: ignore[arg-type]
+
+    missing = [ticker for ticker in tickers if ticker not in last_prices]
+    for ticker, data in iter_price_documents(db, missing, ["prices"]):
+        bar = latest_bar(data.get("prices"))  # type: ignore[arg-type]
+        if bar is not None and bar.get("close") is not None:
+            last_prices[ticker] = float(bar["close"])  # type: ignore[arg-type]
+    return last_prices
+
+
+def update_portfolio_status(db: firestore.Client) -> None:
+    """포트폴리오 종목 상태와 레그별 목표가 도달일을 최신 가격에 맞춰 갱신합니다.
+
+    종목 수와 관계없이 포트폴리오 조회 1회, ``legs`` 컬렉션 그룹 조회 1회, 가격 헤드와
+    시세 ``get_all`` 묶음, 배치 쓰기 묶음으로만 끝나도록 모아서 처리합니다. 도달일은
+    ``target_hits`` 엔진이 종목별로 한 번에 계산하며, 종목 문서의 ``hitsEvaluatedThrough``
+    이후 봉만 다시 봅니다.
+    """
+
+    stocks = [
+        (stock_doc.reference, stock_doc.to_dict() or {})
+        for stock_doc in db.collection(PORTFOLIO_COLLECTION).stream()
+    ]
+    legs_by_stock = load_legs_by_stock(db)
+    tickers = sorted({str(data["ticker"]) for _, data in stocks if data.get("ticker")})
+    last_prices = load_last_prices(db, tickers)
+
+    start_keys: Dict[str, int] = {}
+    for stock_ref, data in stocks:
+        if not data.get("ticker"):
             continue
+        for _, leg in legs_by_stock.get(stock_ref.id, []):
+            if needs_evaluation(leg):
+                key = start_key(leg, data.get("hitsEvaluatedThrough"))
+                ticker = str(data["ticker"])
+                start_keys[ticker] = min(key, start_keys.get(ticker, key))
+    histories = load_hit_histories(db, start_keys)
 
-        last_price = float(prices[-1]["close"])
-        legs = [leg_doc.to_dict() for leg_doc in stock_doc.reference.collection("legs").stream()]
+    batch = db.batch()
+    pending = updated = hits = 0
 
-        progress = calculate_progress(legs, last_price)
+    def queue_update(ref: firestore.DocumentReference, payload: Dict[str, object]) -> None:
+        nonlocal batch, pending
+        batch.update(ref, payload)
+        pending += 1
+        if pending >= BATCH_WRITE_LIMIT:
+            batch.commit()
+            batch, pending = db.batch(), 0
 
-        status = "진행전"
-        if progress["buyCompleted"] > 0:
-            status = "진행중"
-        if progress["buyCompleted"] == len([leg for leg in legs if leg.get("type") == "BUY"]) and progress[
-            "sellCompleted"
-        ] == len([leg for leg in legs if leg.get("type") == "SELL"]):
-            status = "완료"
+    for stock_ref, data in stocks:
+        ticker = data.get("ticker")
+        if not ticker:
+            LOGGER.warning("%s 문서에 종목 코드가 없습니다.", stock_ref.id)
+            continue
+        series = histories.get(str(ticker))
+        last_price = last_prices.get(str(ticker))
+        if last_price is None and series:
+            last_price = float(series.close[-1])
+        if last_price is None:
+            LOGGER.warning("%s 종목의 가격 정보가 없습니다.", ticker)
+            continue
 
-        update_payload = {
-            "lastPrice": last_price,
-            "status": status,
-            "statusUpdatedAt": firestore.SERVER_TIMESTAMP,
-            **progress,
-        }
-        stock_doc.reference.update(update_payload)
-        LOGGER.info("%s 종목 상태를 %s로 갱신했습니다.", ticker, status)
+        legs = legs_by_stock.get(stock_ref.id, [])
+        evaluated: Dict[str, object] = {}
+        if series:
+            plans = plan_leg_hits(series, [leg for _, leg in legs], data.get("hitsEvaluatedThrough"))
+            for (leg_ref, leg), plan in zip(legs, plans):
+                if plan is None:
+                    continue
+                queue_update(leg_ref, plan)
+                leg.update(plan)
+                hits += 1 if plan["hitDate"] else 0
+            evaluated["hitsEvaluatedThrough"] = series.last_date
+
+        update_payload = {**evaluate_status([leg for _, leg in legs], last_price), **evaluated}
+        queue_update(stock_ref, update_payload)
+        updated += 1
+        LOGGER.info("%s 종목 상태를 %s로 갱신합니다.", ticker, update_payload["status"])
+    if pending:
+        batch.commit()
+    LOGGER.info("포트폴리오 종목 %d개의 상태를 갱신했습니다 (새 목표가 도달 %d건).", updated, hits)
 
 
 def main() -> None:
@@ -181,7 +697,7 @@ def main() -> None:
 
     db = firestore.Client()
     tickers = get_all_tickers()
-    update_stock_prices(db, tickers)
+    update_stock_prices(db, tickers, open_ledger(db))
     update_portfolio_status(db)
 
 
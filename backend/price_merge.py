@@ -0,0 +1,220 @@
+"""일별 시세 목록 병합 커널.
+
+날짜를 YYYYMMDD 정수 키로 바꿔 비교하고, 이미 정렬된 기존 목록은 새 데이터가 시작되는
+위치를 이분 탐색으로 찾은 뒤 뒷부분만 선형 병합합니다. 저장 형식(``YYYY-MM-DD``)만
+들어 있는 기존 목록은 날짜 문자열을 그대로 키로 씁니다. 기존 목록이 정렬되어 있지
+않거나 날짜가 중복되면 한 번 정규화한 뒤 같은 방식으로 병합합니다.
+
+기존 목록에서 날짜 값은 있지만 해석할 수 없는 항목은 버리지 않고 원래 순서대로
+결과의 가장 오래된 쪽에 그대로 남깁니다. 날짜 필드가 아예 없는 항목은 버립니다.
+"""
+
+from __future__ import annotations
+
+import operator
+from bisect import bisect_left
+from datetime import date, datetime
+from itertools import islice
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Sequence, Tuple
+
+PriceRecord = Mapping[str, object]
+
+DATE_FIELDS: Tuple[str, ...] = ("date",)
+
+
+class MergeResult(NamedTuple):
+    """병합 결과.
+
+    ``changed``는 새로 추가되거나 내용이 바뀐 날짜 수이고, ``reordered``는 기존 목록을
+    정렬하거나 중복·날짜 필드가 없는 항목을 걸러내야 했는지를 나타냅니다. 둘 다 없으면
+    ``records``는 입력으로 받은 기존 목록 그대로입니다.
+    """
+
+    records: List[PriceRecord]
+    changed: int
+    reordered: bool
+
+
+def date_key(value: object) -> int | None:
+    """날짜 값을 YYYYMMDD 정수로 바꿉니다. 해석할 수 없으면 ``None``을 반환합니다.
+
+    ``YYYY-MM-DD``, ``YYYY.MM.DD``, ``YYYY/MM/DD``, ``YYYYMMDD`` 문자열과 ISO 8601
+    일시 문자열, ``date``/``datetime``, YYYYMMDD 정수, 유닉스 타임스탬프(초·밀리초)를
+    지원합니다.
+    """
+
+    if isinstance(value, str):
+        text = value.strip()
+        if len(text) == 10 and text[4] in "-./" and text[7] == text[4]:
+            try:
+                return int(text[:4]) * 10000 + int(text[5:7]) * 100 + int(text[8:10])
+            except ValueError:
+                return None
+        if len(text) == 8 and text.isdigit():
+            return int(text)
+        if not text:
+            return None
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            return None
+        return parsed.year * 10000 + parsed.month * 100 + parsed.day
+    if isinstance(value, (date, datetime)):
+        return value.year * 10000 + value.month * 100 + value.day
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if isinstance(value, int) and 19000101 <= value <= 99991231:
+        return value
+    seconds = value / 1000 if value > 1e11 else value
+    try:
+        parsed = datetime.fromtimestamp(seconds)
+    except (OverflowError, OSError, ValueError):
+        return None
+    return parsed.year * 10000 + parsed.month * 100 + parsed.day
+
+
+def record_key(record: PriceRecord, fields: Sequence[str] = DATE_FIELDS) -> int | None:
+    """``fields`` 중 처음으로 값이 있는 필드로 레코드의 날짜 키를 구합니다."""
+
+    for field in fields:
+        value = record.get(field)
+        if value:
+            return date_key(value)
+    return None
+
+
+def _iso_text(key: int) -> str:
+    return f"{key // 10000:04d}-{key // 100 % 100:02d}-{key % 100:02d}"
+
+
+def _is_iso_dates(values: List[object]) -> bool:
+    """모든 값이 ``YYYY-MM-DD`` 모양(길이와 구분자 위치)의 문자열인지 한 번에 확인합니다."""
+
+    try:
+        joined = "\n".join(values)  # type: ignore[arg-type]
+    except TypeError:
+        return False
+    count = len(values)
+    return (
+        len(joined) == count * 11 - 1
+        and joined[4::11] == "-" * count
+        and joined[7::11] == "-" * count
+        and joined.count("-") == count * 2
+    ) or not values
+
+
+def _keyed_ascending(
+    records: List[PriceRecord],
+    fields: Sequence[str],
+    descending: bool,
+) -> Tuple[List[object], List[PriceRecord], bool, bool, List[PriceRecord]]:
+    """기존 목록을 오름차순 (키 목록, 레코드 목록)으로 바꿉니다.
+
+    (키, 레코드, 정규화가 필요했는지, 키가 ISO 문자열인지, 날짜를 해석하지 못한 레코드)를
+    반환합니다. 모든 날짜가 저장 형식인 ``YYYY-MM-DD`` 문자열이면 문자열 자체를 키로 써서
+    항목마다 날짜를 해석하지 않고, 정렬 여부도 C 수준 비교로만 확인합니다. 해석하지 못한
+    레코드는 결과를 뒤집었을 때 원래 순서가 되도록 정렬 방향에 맞춰 돌려줍니다.
+    """
+
+    raw = [record.get(fields[0]) for record in records]
+    canonical = _is_iso_dates(raw)
+
+    if canonical:
+        keys: List[object] = raw  # type: ignore[assignment]
+        kept = records
+        dropped = False
+        unparsed: List[PriceRecord] = []
+    else:
+        keys, kept, dropped, unparsed = [], [], False, []
+        for record in records:
+            key = record_key(record, fields)
+            if key is not None:
+                keys.append(key)
+                kept.append(record)
+            elif any(record.get(field) for field in fields):
+                unparsed.append(record)
+            else:
+                dropped = True
+
+    if descending:
+        keys = keys[::-1]
+        kept = kept[::-1]
+        unparsed = unparsed[::-1]
+
+    if all(map(operator.lt, keys, islice(keys, 1, None))):
+        return keys, kept, dropped, canonical, unparsed
+
+    # 정렬이 깨졌거나 날짜가 중복된 경우: 원래 목록에서 나중에 나온 항목을 남깁니다.
+    by_key: Dict[object, PriceRecord] = {}
+    ordered = zip(reversed(keys), reversed(kept)) if descending else zip(keys, kept)
+    for key, record in ordered:
+        by_key[key] = record
+    sorted_keys = sorted(by_key)  # type: ignore[type-var]
+    return sorted_keys, [by_key[key] for key in sorted_keys], True, canonical, unparsed
+
+
+def merge_price_records(
+    existing: Iterable[PriceRecord] | None,
+    new: Iterable[PriceRecord] | None,
+    *,
+    descending: bool = False,
+    overlay: bool = False,
+    fields: Sequence[str] = DATE_FIELDS,
+) -> MergeResult:
+    """기존 시세 목록에 새 시세를 날짜 기준으로 병합합니다.
+
+    ``descending``은 기존 목록과 결과의 정렬 방향(최신순 여부)입니다. 같은 날짜가 있으면
+    새 레코드로 바꾸며, ``overlay``가 참이면 기존 레코드 위에 새 필드만 덮어씁니다.
+    같은 날짜의 레코드만 서로 비교하므로 전체 목록을 다시 비교하지 않습니다.
+    """
+
+    existing_list = existing if isinstance(existing, list) else list(existing or [])
+
+    updates: Dict[object, PriceRecord] = {}
+    for record in new or ():
+        key = record_key(record, fields)
+        if key is None:
+            continue
+        if overlay and key in updates:
+            updates[key] = {**updates[key], **record}
+        else:
+            updates[key] = record
+
+    if not updates:
+        return MergeResult(existing_list, 0, False)
+
+    keys, records, reordered, canonical, unparsed = _keyed_ascending(existing_list, fields, descending)
+    new_keys = sorted(updates)
+    if canonical:
+        updates = {_iso_text(key): record for key, record in updates.items()}  # type: ignore[misc]
+        new_keys = [_iso_text(key) for key in new_keys]  # type: ignore[misc]
+
+    start = bisect_left(keys, new_keys[0])  # type: ignore[arg-type]
+    merged: List[PriceRecord] = [*unparsed, *records[:start]]
+    changed = 0
+    index, total = start, len(keys)
+    for key in new_keys:
+        while index < total and keys[index] < key:  # type: ignore[operator]
+            merged.append(records[index])
+            index += 1
+        record = updates[key]
+        if index < total and keys[index] == key:
+            current = records[index]
+            index += 1
+            if overlay:
+                if all(field in current and current[field] == value for field, value in record.items()):
+                    merged.append(current)
+                    continue
+                record = {**current, **record}
+            elif current == record:
+                merged.append(current)
+                continue
+        merged.append(record)
+        changed += 1
+    merged.extend(records[index:])
+
+    if not changed and not reordered:
+        return MergeResult(existing_list, 0, False)
+    if descending:
+        merged.reverse()
+    return MergeResult(merged, changed, reordered)
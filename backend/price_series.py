@@ -0,0 +1,252 @@
+"""열 단위 배열에 일별 시세를 담는 ``PriceSeries``.
+
+봉마다 dict와 날짜 문자열을 만드는 대신 날짜(YYYYMMDD 정수)와 시가·고가·저가·종가·
+거래량을 각각 ``array``에 담아 종목당 메모리를 크게 줄입니다. Firestore에 쓰거나
+읽을 때만 ``to_records``/``from_records``로 dict 목록과 오가고, 그 사이에서는 배열
+그대로 잘라 쓰고 병합합니다.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+from price_merge import DATE_FIELDS, date_key, record_key
+
+PRICE_COLUMNS: Tuple[str, ...] = ("open", "high", "low", "close", "volume")
+Bar = Tuple[int, int, int, int, int, int]
+
+# 날짜와 가격은 32비트, 거래량은 64비트 정수로 저장합니다.
+_TYPECODES = {"dates": "i", "open": "i", "high": "i", "low": "i", "close": "i", "volume": "q"}
+
+
+def _column(name: str, values: object = ()) -> array:
+    """시퀀스나 NumPy/pandas 배열로 열을 만듭니다. NumPy 배열은 바이트 단위로 복사합니다."""
+
+    column = array(_TYPECODES[name])
+    if hasattr(values, "astype") and hasattr(values, "tobytes"):
+        column.frombytes(values.astype(f"i{column.itemsize}", copy=False).tobytes())  # type: ignore[union-attr]
+    else:
+        column.extend(values)  # type: ignore[arg-type]
+    return column
+
+
+def _iso_date(key: int) -> str:
+    return f"{key // 10000:04d}-{key // 100 % 100:02d}-{key % 100:02d}"
+
+
+def _as_int(value: object) -> int:
+    if isinstance(value, str):
+        value = value.replace(",", "").strip() or 0
+    return int(round(float(value)))  # type: ignore[arg-type]
+
+
+class PriceSeries:
+    """날짜 오름차순으로 정렬된 일별 시세 열 묶음."""
+
+    __slots__ = ("dates", "open", "high", "low", "close", "volume")
+
+    def __init__(
+        self,
+        dates: object = (),
+        open: object = (),  # pylint: disable=redefined-builtin
+        high: object = (),
+        low: object = (),
+        close: object = (),
+        volume: object = (),
+    ) -> None:
+        self.dates = _column("dates", dates)
+        self.open = _column("open", open)
+        self.high = _column("high", high)
+        self.low = _column("low", low)
+        self.close = _column("close", close)
+        self.volume = _column("volume", volume)
+        lengths = {len(self.dates), len(self.open), len(self.high), len(self.low), len(self.close), len(self.volume)}
+        if len(lengths) > 1:
+            raise ValueError("모든 열의 길이가 같아야 합니다.")
+
+    # --- 생성 -------------------------------------------------------------------------
+
+    @classmethod
+    def from_bars(cls, bars: Iterable[Sequence[object]]) -> "PriceSeries":
+        """(날짜, 시가, 고가, 저가, 종가, 거래량) 튜플로 만듭니다. 날짜 순서와 중복은 정리합니다.
+
+        ``naver_sise_parser``가 반환하는 행을 그대로 넘길 수 있습니다.
+        """
+
+        by_date: Dict[int, Bar] = {}
+        for bar in bars:
+            key = date_key(bar[0])
+            if key is None:
+                continue
+            by_date[key] = (key, *(_as_int(value) for value in bar[1:6]))  # type: ignore[assignment]
+        return cls._from_sorted_bars(by_date)
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[Mapping[str, object]] | None,
+        fields: Sequence[str] = DATE_FIELDS,
+    ) -> "PriceSeries":
+        """Firestore의 ``prices`` 목록(dict 목록)으로 만듭니다. 정렬 방향은 상관없습니다.
+
+        날짜를 해석할 수 없는 항목은 건너뛰고, 같은 날짜가 여러 번 나오면 나중 항목을 씁니다.
+        """
+
+        by_date: Dict[int, Bar] = {}
+        for record in records or ():
+            key = record_key(record, fields)
+            if key is None:
+                continue
+            try:
+                by_date[key] = (key, *(_as_int(record.get(name) or 0) for name in PRICE_COLUMNS))  # type: ignore[assignment]
+            except (TypeError, ValueError):
+                continue
+        return cls._from_sorted_bars(by_date)
+
+    @classmethod
+    def _from_sorted_bars(cls, by_date: Dict[int, Bar]) -> "PriceSeries":
+        series = cls()
+        for key in sorted(by_date):
+            series._append(by_date[key])
+        return series
+
+    def _append(self, bar: Bar) -> None:
+        self.dates.append(bar[0])
+        self.open.append(bar[1])
+        self.high.append(bar[2])
+        self.low.append(bar[3])
+        self.close.append(bar[4])
+        self.volume.append(bar[5])
+
+    # --- 조회 -------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __bool__(self) -> bool:
+        return bool(self.dates)
+
+    def __iter__(self) -> Iterator[Bar]:
+        return zip(self.dates, self.open, self.high, self.low, self.close, self.volume)
+
+    def __getitem__(self, index: int | slice) -> "Bar | PriceSeries":
+        if isinstance(index, slice):
+            series = PriceSeries.__new__(PriceSeries)
+            for name in self.__slots__:
+                setattr(series, name, getattr(self, name)[index])
+            return series
+        return (
+            self.dates[index],
+            self.open[index],
+            self.high[index],
+            self.low[index],
+            self.close[index],
+            self.volume[index],
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PriceSeries):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    @property
+    def nbytes(self) -> int:
+        """열 배열이 차지하는 바이트 수."""
+
+        return sum(getattr(self, name).itemsize * len(getattr(self, name)) for name in self.__slots__)
+
+    @property
+    def first_date(self) -> str | None:
+        return _iso_date(self.dates[0]) if self.dates else None
+
+    @property
+    def last_date(self) -> str | None:
+        return _iso_date(self.dates[-1]) if self.dates else None
+
+    def index_of(self, value: object) -> int | None:
+        """날짜에 해당하는 봉의 위치를 이분 탐색으로 찾습니다. 없으면 ``None``입니다."""
+
+        key = date_key(value)
+        if key is None:
+            return None
+        position = bisect_left(self.dates, key)
+        if position < len(self.dates) and self.dates[position] == key:
+            return position
+        return None
+
+    def between(self, start: object = None, end: object = None) -> "PriceSeries":
+        """``start`` 이상 ``end`` 이하 날짜 구간을 잘라 반환합니다. 비워 두면 끝까지입니다."""
+
+        start_key = date_key(start) if start is not None else None
+        end_key = date_key(end) if end is not None else None
+        lo = bisect_left(self.dates, start_key) if start_key is not None else 0
+        hi = bisect_right(self.dates, end_key) if end_key is not None else len(self.dates)
+        return self[lo:hi]  # type: ignore[return-value]
+
+    def column(self, name: str):  # type: ignore[no-untyped-def]
+        """열을 NumPy 배열로 반환합니다. 메모리를 복사하지 않는 읽기 전용 뷰입니다."""
+
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        values = getattr(self, name)
+        view = np.frombuffer(values, dtype=f"i{values.itemsize}") if len(values) else np.empty(0, f"i{values.itemsize}")
+        view.flags.writeable = False
+        return view
+
+    # --- 변환 -------------------------------------------------------------------------
+
+    def to_records(self, descending: bool = False) -> List[Dict[str, int | str]]:
+        """Firestore에 저장하는 dict 목록으로 바꿉니다."""
+
+        records = [
+            {
+                "date": _iso_date(key),
+                "open": open_,
+                "high": high,
+                "low": low,
+                "close": close,
+                "volume": volume,
+            }
+            for key, open_, high, low, close, volume in self
+        ]
+        if descending:
+            records.reverse()
+        return records
+
+    # --- 병합 -------------------------------------------------------------------------
+
+    def merge(self, other: "PriceSeries") -> Tuple["PriceSeries", int]:
+        """``other``의 봉으로 덮어쓴 새 시리즈와 추가·변경된 봉 수를 반환합니다.
+
+        ``other``가 시작하는 위치를 이분 탐색으로 찾아 그 앞부분은 배열째 복사하고,
+        겹치는 뒷부분만 한 번 훑어 병합합니다. 바뀐 것이 없으면 ``self``를 그대로 반환합니다.
+        """
+
+        if not other:
+            return self, 0
+
+        start = bisect_left(self.dates, other.dates[0])
+        merged = self[:start]
+        changed = 0
+        index, total = start, len(self.dates)
+        for bar in other:
+            key = bar[0]
+            while index < total and self.dates[index] < key:
+                merged._append(self[index])  # type: ignore[union-attr, arg-type]
+                index += 1
+            if index < total and self.dates[index] == key:
+                if self[index] != bar:
+                    changed += 1
+                index += 1
+            else:
+                changed += 1
+            merged._append(bar)  # type: ignore[union-attr]
+        tail = self[index:]
+        for name in self.__slots__:
+            getattr(merged, name).extend(getattr(tail, name))
+
+        if not changed:
+            return self, 0
+        return merged, changed  # type: ignore[return-value]
@@ -0,0 +1,200 @@
+"""``stock_prices`` 문서의 시세 저장 방식과 읽기 API.
+
+``PRICE_STORAGE_MODE``가 ``inline``(기본값)이면 지금처럼 문서 하나의 ``prices`` 배열에
+전체 이력을 담습니다. ``chunked``이면 이력을 ``stock_prices/{ticker}/priceYears/{YYYY}``
+연도 문서로 나누고, 헤드 문서(``stock_prices/{ticker}``)에는 최근 ``PRICE_HEAD_RECENT_BARS``개
+봉과 요약 필드(``storageMode``, ``years``, ``firstDate``, ``lastDate``, ``lastClose``)만
+둡니다. 헤드의 ``prices``는 기존과 같은 형식이므로 최근 시세만 읽는 화면은 그대로 동작하고,
+긴 구간이 필요하면 ``read_price_history``로 연도 문서를 모아 읽습니다.
+
+아직 ``inline``인 문서는 ``chunked`` 모드로 처음 갱신할 때 연도 문서로 옮겨지며,
+한꺼번에 옮기려면 ``migrate_price_storage.py``를 사용합니다.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from google.cloud import firestore as google_firestore
+
+from price_merge import date_key, merge_price_records, record_key
+
+LOGGER = logging.getLogger(__name__)
+
+STORAGE_MODE_INLINE = "inline"
+STORAGE_MODE_CHUNKED = "chunked"
+PRICE_STORAGE_MODE = os.getenv("PRICE_STORAGE_MODE", STORAGE_MODE_INLINE).strip().lower()
+PRICE_HEAD_RECENT_BARS = max(1, int(os.getenv("PRICE_HEAD_RECENT_BARS", "250")))
+PRICE_CHUNK_COLLECTION = os.getenv("PRICE_CHUNK_COLLECTION", "priceYears")
+
+# 갱신 여부를 판단하려고 헤드 문서에서 함께 읽어야 하는 필드입니다.
+HEAD_SUMMARY_FIELDS = ["storageMode", "years", "firstDate", "lastDate", "lastClose"]
+
+PriceRecord = Mapping[str, object]
+
+
+@dataclass
+class ChunkedUpdate:
+    """연도 분할 저장을 위해 실행할 쓰기 목록.
+
+    ``year_writes``는 (연도 문서 참조, 데이터) 목록이고, ``head_fields``는 헤드 문서에
+    병합할 필드입니다. ``changed``는 추가·변경된 봉 수입니다.
+    """
+
+    year_writes: List[Tuple[google_firestore.DocumentReference, Dict[str, object]]] = field(default_factory=list)
+    head_fields: Dict[str, object] = field(default_factory=dict)
+    changed: int = 0
+    migrated: bool = False
+
+
+def is_chunked(head_data: Mapping[str, object] | None) -> bool:
+    return bool(head_data) and head_data.get("storageMode") == STORAGE_MODE_CHUNKED  # type: ignore[union-attr]
+
+
+def chunk_ref(doc_ref: google_firestore.DocumentReference, year: int) -> google_firestore.DocumentReference:
+    return doc_ref.collection(PRICE_CHUNK_COLLECTION).document(str(year))
+
+
+def split_by_year(records: Iterable[PriceRecord] | None) -> Dict[int, List[PriceRecord]]:
+    """시세 목록을 연도별로 나눕니다. 날짜를 해석할 수 없는 항목은 버립니다."""
+
+    by_year: Dict[int, List[PriceRecord]] = {}
+    for record in records or ():
+        key = record_key(record)
+        if key is not None:
+            by_year.setdefault(key // 10000, []).append(record)
+    return by_year
+
+
+def _read_year_docs(
+    db: google_firestore.Client,
+    doc_ref: google_firestore.DocumentReference,
+    years: Iterable[int],
+) -> Dict[int, List[PriceRecord]]:
+    refs = [chunk_ref(doc_ref, year) for year in sorted(set(years))]
+    if not refs:
+        return {}
+    stored: Dict[int, List[PriceRecord]] = {}
+    for snapshot in db.get_all(refs, field_paths=["prices"]):
+        if snapshot.exists:
+            stored[int(snapshot.id)] = list((snapshot.to_dict() or {}).get("prices") or [])
+    return stored
+
+
+def plan_chunked_update(
+    db: google_firestore.Client,
+    doc_ref: google_firestore.DocumentReference,
+    head_data: Mapping[str, object] | None,
+    new_prices: Sequence[PriceRecord],
+    recent_bars: int = PRICE_HEAD_RECENT_BARS,
+) -> ChunkedUpdate:
+    """``new_prices``를 연도 문서에 병합하고 헤드 문서를 갱신하는 쓰기 목록을 만듭니다.
+
+    바뀐 봉이 있는 연도 문서만 다시 쓰며, 필요한 연도 문서만 ``get_all``로 읽습니다.
+    헤드 문서가 아직 ``inline`` 형식이면 기존 배열을 연도 문서로 함께 옮깁니다. 이때도
+    이미 있는 연도 문서와 병합하므로 앞서 옮겨 둔 오래된 봉은 지워지지 않습니다.
+    """
+
+    head_data = head_data or {}
+    head_prices: List[PriceRecord] = list(head_data.get("prices") or [])  # type: ignore[call-overload]
+    new_by_year = split_by_year(new_prices)
+    migrating = not is_chunked(head_data)
+    inline_by_year = split_by_year(head_prices) if migrating else {}
+
+    if not new_by_year and not inline_by_year:
+        return ChunkedUpdate()
+
+    known_years = {int(year) for year in head_data.get("years") or []}  # type: ignore[union-attr]
+    years_to_write = set(new_by_year) | set(inline_by_year)
+    # 분할 형식 문서는 기록된 연도만 읽으면 되지만, 옮기는 중에는 어느 연도가 있는지 모릅니다.
+    years_to_read = years_to_write if migrating else years_to_write & known_years
+    stored_by_year = _read_year_docs(db, doc_ref, years_to_read)
+
+    update = ChunkedUpdate(migrated=migrating)
+    first_date = head_data.get("firstDate")
+    for year in sorted(years_to_write):
+        base = stored_by_year.get(year, [])
+        if year in inline_by_year:
+            base = merge_price_records(base, inline_by_year[year]).records
+        result = merge_price_records(base, new_by_year.get(year))
+        update.changed += result.changed
+        if result.records and (
+            first_date is None or (record_key(result.records[0]) or 0) < (date_key(first_date) or 0)
+        ):
+            first_date = result.records[0].get("date")
+        if result.changed or result.reordered or year in inline_by_year:
+            update.year_writes.append(
+                (
+                    chunk_ref(doc_ref, year),
+                    {
+                        "year": year,
+                        "ticker": doc_ref.id,
+                        "prices": result.records,
+                        "updatedAt": google_firestore.SERVER_TIMESTAMP,
+                    },
+                )
+            )
+
+    if not update.year_writes:
+        return update
+
+    # 헤드가 내림차순으로 저장된 옛 문서일 수도 있어 빈 목록 기준으로 다시 정렬합니다.
+    recent = merge_price_records([], [*head_prices, *new_prices]).records[-recent_bars:]
+    update.head_fields = {
+        "prices": recent,
+        "storageMode": STORAGE_MODE_CHUNKED,
+        "years": sorted(known_years | years_to_write),
+        "firstDate": first_date,
+        "lastDate": recent[-1].get("date") if recent else head_data.get("lastDate"),
+        "lastClose": recent[-1].get("close") if recent else head_data.get("lastClose"),
+    }
+    return update
+
+
+def read_price_history(
+    db: google_firestore.Client,
+    doc_ref: google_firestore.DocumentReference,
+    start: object = None,
+    end: object = None,
+    head_data: Mapping[str, object] | None = None,
+) -> List[PriceRecord]:
+    """저장 방식과 관계없이 ``start``~``end``(포함) 구간의 시세를 날짜 오름차순으로 반환합니다.
+
+    분할 형식이면 구간에 걸친 연도 문서만 읽습니다. ``head_data``를 주면 헤드 문서를 다시
+    읽지 않습니다.
+    """
+
+    if head_data is None:
+        snapshot = doc_ref.get()
+        if not snapshot.exists:
+            return []
+        head_data = snapshot.to_dict() or {}
+
+    start_key = date_key(start) if start is not None else None
+    end_key = date_key(end) if end is not None else None
+
+    if is_chunked(head_data):
+        years = [
+            int(year)
+            for year in head_data.get("years") or []  # type: ignore[union-attr]
+            if (start_key is None or int(year) >= start_key // 10000)
+            and (end_key is None or int(year) <= end_key // 10000)
+        ]
+        stored = _read_year_docs(db, doc_ref, years)
+        records: List[PriceRecord] = [record for year in sorted(stored) for record in stored[year]]
+        # 연도 문서가 반영되기 전에 헤드에만 들어간 최신 봉이 있을 수 있어 한 번 더 합칩니다.
+        records = merge_price_records(records, head_data.get("prices")).records  # type: ignore[arg-type]
+    else:
+        records = merge_price_records([], head_data.get("prices")).records  # type: ignore[arg-type]
+
+    if start_key is None and end_key is None:
+        return records
+    return [
+        record
+        for record in records
+        if (start_key is None or (record_key(record) or 0) >= start_key)
+        and (end_key is None or (record_key(record) or 0) <= end_key)
+    ]
@@ -0,0 +1,222 @@
+"""호스트 단위 토큰 버킷 요청 속도 제한기와 AIMD 적응형 속도 조절기."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable
+from urllib.parse import urlparse
+
+LOGGER = logging.getLogger(__name__)
+
+# 서버가 부담을 느낀다고 보는 응답 상태 코드입니다.
+THROTTLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """초당 ``rate``개의 토큰을 채우고 최대 ``capacity``개까지 모아 두는 스레드 안전 버킷."""
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        if rate <= 0:
+            raise ValueError("rate는 0보다 커야 합니다.")
+        self.rate = float(rate)
+        self.capacity = max(float(capacity), 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def set_rate(self, rate: float) -> None:
+        """지금까지 쌓인 토큰을 유지한 채 충전 속도를 바꿉니다."""
+
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """토큰을 확보할 때까지 대기하고 실제로 기다린 시간(초)을 반환합니다."""
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class HostRateLimiter:
+    """호스트별로 독립된 토큰 버킷을 관리합니다."""
+
+    def __init__(self, default_rate: float, burst: float = 1.0) -> None:
+        self.default_rate = default_rate
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, host: str, rate: float, burst: float | None = None) -> None:
+        """특정 호스트의 초당 요청 수를 지정합니다."""
+
+        with self._lock:
+            self._buckets[host] = TokenBucket(rate, self.burst if burst is None else burst)
+
+    def bucket_for(self, host: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.default_rate, self.burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url_or_host: str) -> float:
+        """URL 또는 호스트 이름에 해당하는 버킷에서 토큰 하나를 확보합니다."""
+
+        return self.bucket_for(_host_of(url_or_host)).acquire()
+
+    def observe(
+        self,
+        url_or_host: str,
+        status_code: int | None,
+        latency: float,
+        retried_statuses: Iterable[int | None] = (),
+    ) -> None:
+        """응답 결과를 전달받습니다. 고정 속도 제한기에서는 아무 것도 하지 않습니다."""
+
+    def current_rate(self, url_or_host: str) -> float:
+        return self.bucket_for(_host_of(url_or_host)).rate
+
+    def scale(self, factor: float) -> None:
+        """여러 프로세스가 같은 서버를 나눠 쓸 때 모든 호스트의 속도를 비율대로 조정합니다."""
+
+        with self._lock:
+            self.default_rate *= factor
+            buckets = list(self._buckets.values())
+        for bucket in buckets:
+            bucket.set_rate(bucket.rate * factor)
+
+    def log_rates(self, logger: logging.Logger = LOGGER) -> None:
+        with self._lock:
+            buckets = dict(self._buckets)
+        for host, bucket in sorted(buckets.items()):
+            logger.info("%s 요청 속도: 초당 %.2f회", host, bucket.rate)
+
+
+def _host_of(url_or_host: str) -> str:
+    return urlparse(url_or_host).netloc if "://" in url_or_host else url_or_host
+
+
+@dataclass
+class _PacingState:
+    ewma_latency: float = 0.0
+    baseline_latency: float = 0.0
+    last_decrease: float = 0.0
+    peak_rate: float = 0.0
+    decreases: int = 0
+
+
+class AdaptiveRateLimiter(HostRateLimiter):
+    """AIMD(가산 증가, 곱셈 감소) 방식으로 호스트별 요청 속도를 스스로 조절합니다.
+
+    정상 응답이 이어지고 지연 시간이 기준치의 ``latency_tolerance``배 이내이면 초당
+    ``increase_step``회씩 속도를 올리고, 429/5xx 응답이나 시간 초과가 관측되면 속도에
+    ``decrease_factor``를 곱합니다. 한 번 줄인 뒤 ``cooldown`` 초 동안은 같은 혼잡으로
+    보고 추가로 줄이지 않습니다.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float,
+        min_rate: float,
+        max_rate: float,
+        increase_step: float = 0.5,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        cooldown: float = 2.0,
+        burst: float = 1.0,
+    ) -> None:
+        super().__init__(initial_rate, burst)
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self._states: Dict[str, _PacingState] = {}
+        self._state_lock = threading.Lock()
+
+    def scale(self, factor: float) -> None:
+        super().scale(factor)
+        self.min_rate *= factor
+        self.max_rate *= factor
+
+    def observe(
+        self,
+        url_or_host: str,
+        status_code: int | None,
+        latency: float,
+        retried_statuses: Iterable[int | None] = (),
+    ) -> None:
+        host = _host_of(url_or_host)
+        bucket = self.bucket_for(host)
+        throttled = (
+            status_code is None
+            or status_code in THROTTLE_STATUS_CODES
+            or any(code is None or code in THROTTLE_STATUS_CODES for code in retried_statuses)
+        )
+
+        with self._state_lock:
+            state = self._states.setdefault(host, _PacingState(peak_rate=bucket.rate))
+            rate = bucket.rate
+            now = time.monotonic()
+
+            if throttled:
+                if now - state.last_decrease < self.cooldown:
+                    return
+                new_rate = max(self.min_rate, rate * self.decrease_factor)
+                state.last_decrease = now
+                state.decreases += 1
+                LOGGER.info(
+                    "%s 혼잡 신호(상태 %s) 감지: 요청 속도를 초당 %.2f회 → %.2f회로 낮춥니다.",
+                    host,
+                    status_code if status_code is not None else "시간 초과/연결 오류",
+                    rate,
+                    new_rate,
+                )
+            else:
+                state.ewma_latency = (
+                    latency if state.ewma_latency == 0 else 0.8 * state.ewma_latency + 0.2 * latency
+                )
+                if state.baseline_latency == 0 or state.ewma_latency < state.baseline_latency:
+                    state.baseline_latency = state.ewma_latency
+                if state.ewma_latency > state.baseline_latency * self.latency_tolerance:
+                    return
+                # 응답 하나당 step/rate씩 올려 1초 동안 약 step만큼 증가하게 합니다.
+                new_rate = min(self.max_rate, rate + self.increase_step / max(rate, 1e-6))
+
+            if new_rate != rate:
+                bucket.set_rate(new_rate)
+                state.peak_rate = max(state.peak_rate, new_rate)
+
+    def log_rates(self, logger: logging.Logger = LOGGER) -> None:
+        with self._state_lock:
+            states = dict(self._states)
+        for host, state in sorted(states.items()):
+            logger.info(
+                "%s 적응형 요청 속도: 최종 초당 %.2f회 (최대 %.2f회, 감속 %d회, 평균 지연 %.0fms)",
+                host,
+                self.current_rate(host),
+                state.peak_rate,
+                state.decreases,
+                state.ewma_latency * 1000,
+            )
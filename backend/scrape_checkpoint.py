@@ -0,0 +1,102 @@
+"""대량 수집 작업의 샤드 분할과 진행 상황 체크포인트."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Set
+
+LOGGER = logging.getLogger(__name__)
+
+
+def parse_shard(text: str | None) -> tuple[int, int]:
+    """``"i/N"`` 형식의 샤드 지정을 (i, N)으로 해석합니다. 비어 있으면 (0, 1)입니다."""
+
+    if not text or not text.strip():
+        return 0, 1
+    try:
+        index_text, total_text = text.strip().split("/", 1)
+        index, total = int(index_text), int(total_text)
+    except ValueError as exc:
+        raise ValueError(f"샤드는 'i/N' 형식이어야 합니다: {text!r}") from exc
+    if total < 1 or not 0 <= index < total:
+        raise ValueError(f"샤드 번호가 범위를 벗어났습니다: {text!r}")
+    return index, total
+
+
+def shard_of(ticker: str, total: int) -> int:
+    """실행 환경과 무관하게 같은 값을 주는 CRC32로 종목의 샤드 번호를 계산합니다."""
+
+    return zlib.crc32(ticker.encode("utf-8")) % total
+
+
+def filter_shard(
+    items: Iterable[Dict[str, str]],
+    index: int,
+    total: int,
+) -> Iterator[Dict[str, str]]:
+    """``index`` 번 샤드에 속한 종목만 골라냅니다."""
+
+    if total <= 1:
+        yield from items
+        return
+    for item in items:
+        if shard_of(item["ticker"], total) == index:
+            yield item
+
+
+class ScrapeCheckpoint:
+    """완료한 종목 코드를 한 줄씩 덧붙여 기록하는 로컬 체크포인트 파일.
+
+    첫 줄에는 실행 키(날짜, 샤드 등)를 기록하며, 같은 실행 키로 다시 열면 완료 목록을
+    이어받고 키가 다르면 새로 시작합니다.
+    """
+
+    def __init__(self, path: str | Path, run_key: str) -> None:
+        self.path = Path(path)
+        self.run_key = run_key
+        self._lock = threading.Lock()
+        self.completed: Set[str] = set()
+
+        if self.path.exists():
+            self.completed = self._load()
+        if self.completed:
+            LOGGER.info("체크포인트 '%s'에서 완료된 종목 %d개를 이어받습니다.", self.path, len(self.completed))
+            self._handle = self.path.open("a", encoding="utf-8")
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = self.path.open("w", encoding="utf-8")
+            self._handle.write(json.dumps({"runKey": run_key}, ensure_ascii=False) + "\n")
+            self._handle.flush()
+
+    def _load(self) -> Set[str]:
+        try:
+            with self.path.open("r", encoding="utf-8") as handle:
+                header = json.loads(handle.readline() or "{}")
+                if header.get("runKey") != self.run_key:
+                    LOGGER.info("체크포인트 실행 키가 달라 처음부터 수집합니다: %s", header.get("runKey"))
+                    return set()
+                return {line.strip() for line in handle if line.strip()}
+        except (OSError, json.JSONDecodeError) as exc:
+            LOGGER.warning("체크포인트 파일을 읽지 못해 처음부터 수집합니다: %s", exc)
+            return set()
+
+    def is_done(self, ticker: str) -> bool:
+        return ticker in self.completed
+
+    def mark_done(self, ticker: str) -> None:
+        """종목 완료를 기록하고 즉시 디스크에 반영합니다."""
+
+        with self._lock:
+            if ticker in self.completed:
+                return
+            self.completed.add(ticker)
+            self._handle.write(ticker + "\n")
+            self._handle.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._handle.close()
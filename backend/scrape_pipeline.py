@@ -0,0 +1,183 @@
+"""대량 수집을 내려받기 → 파싱 → 병합·쓰기 단계로 나누어 돌리는 파이프라인 구성 요소.
+
+각 단계는 크기가 제한된 대기열(또는 세마포어)로 연결되어, 뒤 단계가 밀리면 앞 단계가
+자연스럽게 멈춥니다. 단계별 소요 시간은 ``StageTimings``에 모아 실행 끝에 출력합니다.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, TypeVar
+
+LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class StageTiming:
+    """단계별 처리 건수와 소요 시간 누계."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+
+class StageTimings:
+    """여러 스레드에서 동시에 기록할 수 있는 단계별 소요 시간 집계기."""
+
+    def __init__(self) -> None:
+        self._timings: Dict[str, StageTiming] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, elapsed: float) -> None:
+        with self._lock:
+            timing = self._timings.setdefault(stage, StageTiming())
+            timing.count += 1
+            timing.total += elapsed
+            timing.max = max(timing.max, elapsed)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(stage, time.monotonic() - started)
+
+    def snapshot(self) -> Dict[str, StageTiming]:
+        with self._lock:
+            return {stage: StageTiming(**vars(timing)) for stage, timing in self._timings.items()}
+
+    def log_summary(self, logger: logging.Logger = LOGGER) -> None:
+        for stage, timing in sorted(self.snapshot().items()):
+            logger.info(
+                "단계 %s: %d건, 누적 %.1fs, 평균 %.1fms, 최대 %.0fms",
+                stage,
+                timing.count,
+                timing.total,
+                timing.total / timing.count * 1000 if timing.count else 0.0,
+                timing.max * 1000,
+            )
+
+
+class ParseStage:
+    """응답 본문 파싱을 실행하는 단계.
+
+    ``workers``가 0이면 호출한 스레드에서 바로 파싱하고, 1 이상이면 별도 프로세스 풀에
+    맡겨 GIL과 무관하게 여러 코어를 씁니다. 동시에 풀에 들어가는 작업은 ``max_pending``개로
+    제한되어 내려받기 단계가 파싱보다 앞서 나가지 못하게 합니다. 파싱 함수와 인자는
+    피클 가능해야 하므로 모듈 최상위 함수만 넘겨야 합니다.
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        max_pending: int | None = None,
+        timings: StageTimings | None = None,
+    ) -> None:
+        self.workers = max(0, workers)
+        self.timings = timings
+        self._pool: ProcessPoolExecutor | None = None
+        self._slots: threading.BoundedSemaphore | None = None
+        if self.workers:
+            # Firestore(gRPC) 스레드가 떠 있는 부모를 fork하지 않도록 spawn으로 띄웁니다.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            self._slots = threading.BoundedSemaphore(max_pending or self.workers * 2)
+
+    def __call__(self, func: Callable[[str], T], text: str) -> T:
+        if self._pool is None or self._slots is None:
+            return self._timed(func, text)
+        with self._slots:
+            started = time.monotonic()
+            result = self._pool.submit(func, text).result()
+        if self.timings is not None:
+            self.timings.record("parse", time.monotonic() - started)
+        return result
+
+    def _timed(self, func: Callable[[str], T], text: str) -> T:
+        if self.timings is None:
+            return func(text)
+        with self.timings.measure("parse"):
+            return func(text)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __enter__(self) -> "ParseStage":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+_STOP = object()
+
+
+class WriterStage:
+    """단일 스레드에서 병합·쓰기 작업을 차례로 실행하는 단계.
+
+    ``submit``은 대기열이 ``max_queue``개로 차 있으면 자리가 날 때까지 막힙니다. 작업은
+    쓰기를 실제로 요청했는지(``bool``)를 반환해야 하며, 결과는 ``on_done(ticker, wrote)``로
+    전달됩니다.
+    """
+
+    def __init__(
+        self,
+        max_queue: int,
+        on_done: Callable[[str, bool], None] | None = None,
+        timings: StageTimings | None = None,
+    ) -> None:
+        self.on_done = on_done
+        self.timings = timings
+        self.succeeded = 0
+        self.failed = 0
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=max(1, max_queue))
+        self._thread = threading.Thread(target=self._run, name="scrape-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, ticker: str, job: Callable[[], bool]) -> None:
+        started = time.monotonic()
+        self._queue.put((ticker, job))
+        if self.timings is not None:
+            self.timings.record("write_queue_wait", time.monotonic() - started)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            ticker, job = item  # type: ignore[misc]
+            started = time.monotonic()
+            try:
+                wrote = job()
+            except Exception:  # pylint: disable=broad-except
+                self.failed += 1
+                LOGGER.exception("%s 종목 저장 중 오류 발생", ticker)
+                continue
+            finally:
+                if self.timings is not None:
+                    self.timings.record("write", time.monotonic() - started)
+            self.succeeded += 1
+            if self.on_done is not None:
+                self.on_done(ticker, wrote)
+
+    def close(self) -> tuple[int, int]:
+        """남은 작업을 모두 처리한 뒤 (성공, 실패) 건수를 반환합니다."""
+
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        return self.succeeded, self.failed
@@ -0,0 +1,189 @@
+"""종목 목록(stock_list.xlsx)을 한 번만 해석해 캐시해 두고 빠르게 조회하는 모듈.
+
+엑셀 파싱과 pandas 임포트는 캐시가 없거나 원본 파일이 바뀐 경우에만 일어나며,
+평소에는 작은 JSON 캐시 파일만 읽습니다.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DEFAULT_STOCK_LIST_FILE = os.getenv("STOCK_LIST_FILE", str(SCRIPT_DIR / "stock_list.xlsx"))
+STOCK_UNIVERSE_CACHE_DIR = Path(os.getenv("STOCK_UNIVERSE_CACHE_DIR", str(SCRIPT_DIR / ".cache")))
+CACHE_FORMAT_VERSION = 1
+
+TICKER_COLUMN_CANDIDATES = ["단축코드", "단축 코드", "티커", "종목코드"]
+NAME_COLUMN_CANDIDATES = ["한글 종목약명", "한글종목약명", "종목명", "한글명"]
+
+
+class StockUniverse:
+    """(종목 코드, 종목명) 목록과 양방향 조회용 색인."""
+
+    def __init__(self, entries: List[Tuple[str, str]]) -> None:
+        self.entries = entries
+        self._name_by_ticker: Dict[str, str] = {}
+        self._ticker_by_name: Dict[str, str] = {}
+        for ticker, name in entries:
+            self._name_by_ticker.setdefault(ticker, name)
+            self._ticker_by_name.setdefault(_normalise_name(name), ticker)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        for ticker, name in self.entries:
+            yield {"ticker": ticker, "name": name}
+
+    def __contains__(self, ticker: object) -> bool:
+        return ticker in self._name_by_ticker
+
+    def name_of(self, ticker: str) -> str | None:
+        """종목 코드로 종목명을 찾습니다."""
+
+        return self._name_by_ticker.get(str(ticker).strip().zfill(6))
+
+    def ticker_of(self, name: str) -> str | None:
+        """종목명(공백·대소문자 무시)으로 종목 코드를 찾습니다."""
+
+        return self._ticker_by_name.get(_normalise_name(name))
+
+    def search(self, keyword: str) -> List[Tuple[str, str]]:
+        """종목명에 ``keyword``가 포함된 (종목 코드, 종목명) 목록을 반환합니다."""
+
+        needle = _normalise_name(keyword)
+        if not needle:
+            return []
+        return [(ticker, name) for ticker, name in self.entries if needle in _normalise_name(name)]
+
+
+def _normalise_name(name: str) -> str:
+    return "".join(str(name).split()).casefold()
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def compile_stock_list(stock_list_file: str | Path) -> List[Tuple[str, str]]:
+    """엑셀 파일을 읽어 정규화된 (종목 코드, 종목명) 목록을 만듭니다."""
+
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+
+    try:
+        df = pd.read_excel(stock_list_file)
+    except FileNotFoundError as exc:
+        raise FileNotFoundError(
+            f"'{stock_list_file}' 파일을 찾을 수 없습니다. 경로를 확인하세요."
+        ) from exc
+    except Exception as exc:  # pylint: disable=broad-except
+        raise RuntimeError(f"엑셀 파일을 읽는 중 오류가 발생했습니다: {exc}") from exc
+
+    df.columns = [str(col).strip() for col in df.columns]
+
+    def resolve_column(candidates: List[str]) -> str:
+        for candidate in candidates:
+            if candidate in df.columns:
+                return candidate
+        raise KeyError(
+            "엑셀 파일에 필요한 열을 찾을 수 없습니다: "
+            + ", ".join(candidates)
+        )
+
+    ticker_col = resolve_column(TICKER_COLUMN_CANDIDATES)
+    name_col = resolve_column(NAME_COLUMN_CANDIDATES)
+
+    df = df[[ticker_col, name_col]].dropna(how="any")
+    tickers = (
+        df[ticker_col]
+        .astype(str)
+        .str.strip()
+        .str.replace(r"\.0$", "", regex=True)
+        .str.zfill(6)
+    )
+    names = df[name_col].astype(str).str.strip()
+    return list(zip(tickers.tolist(), names.tolist()))
+
+
+def _cache_path_for(source: Path) -> Path:
+    return STOCK_UNIVERSE_CACHE_DIR / f"{source.stem}.universe.json"
+
+
+def load_stock_universe(
+    stock_list_file: str | Path = DEFAULT_STOCK_LIST_FILE,
+    cache_path: str | Path | None = None,
+) -> StockUniverse:
+    """캐시가 원본과 일치하면 캐시에서, 아니면 엑셀을 다시 해석해 종목 목록을 불러옵니다.
+
+    원본의 수정 시각과 크기가 같으면 바로 캐시를 쓰고, 달라졌더라도 SHA-256이 같으면
+    캐시를 재사용하며 메타데이터만 갱신합니다.
+    """
+
+    source = Path(stock_list_file)
+    if not source.exists():
+        raise FileNotFoundError(f"'{stock_list_file}' 파일을 찾을 수 없습니다. 경로를 확인하세요.")
+
+    cache_file = Path(cache_path) if cache_path else _cache_path_for(source)
+    stat = source.stat()
+
+    cached: Dict[str, object] = {}
+    if cache_file.exists():
+        try:
+            cached = json.loads(cache_file.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            LOGGER.warning("종목 목록 캐시를 읽지 못해 다시 생성합니다: %s", exc)
+            cached = {}
+
+    if cached.get("version") == CACHE_FORMAT_VERSION:
+        meta = cached.get("source", {})
+        if meta.get("mtimeNs") == stat.st_mtime_ns and meta.get("size") == stat.st_size:
+            return StockUniverse([tuple(entry) for entry in cached["entries"]])  # type: ignore[misc]
+        digest = _file_digest(source)
+        if meta.get("sha256") == digest:
+            entries = [tuple(entry) for entry in cached["entries"]]  # type: ignore[misc]
+            _write_cache(cache_file, source, stat, digest, entries)  # type: ignore[arg-type]
+            return StockUniverse(entries)  # type: ignore[arg-type]
+    else:
+        digest = _file_digest(source)
+
+    entries = compile_stock_list(source)
+    LOGGER.info("종목 목록 '%s'을 해석해 %d개 종목을 캐시에 저장합니다.", source.name, len(entries))
+    _write_cache(cache_file, source, stat, digest, entries)
+    return StockUniverse(entries)
+
+
+def _write_cache(
+    cache_file: Path,
+    source: Path,
+    stat: os.stat_result,
+    digest: str,
+    entries: List[Tuple[str, str]],
+) -> None:
+    payload = {
+        "version": CACHE_FORMAT_VERSION,
+        "source": {
+            "path": str(source),
+            "mtimeNs": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+        },
+        "entries": entries,
+    }
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(cache_file.suffix + ".tmp")
+        tmp_file.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_file, cache_file)
+    except OSError as exc:
+        LOGGER.warning("종목 목록 캐시를 저장하지 못했습니다: %s", exc)
@@ -0,0 +1,116 @@
+"""포트폴리오 레그의 목표가 도달일을 시세 이력 전체에서 한 번에 찾는 엔진.
+
+매수 레그는 저가가 목표가 이하로, 매도 레그는 고가가 목표가 이상으로 내려가거나 올라간
+첫 거래일을 도달일(``hitDate``)로 봅니다. 장중에 닿았다가 되돌아온 경우도 도달로 셉니다.
+
+종목 하나의 레그 전체를 (레그 × 봉) 불리언 행렬 하나로 비교하고 ``argmax``로 첫 도달
+위치를 찾습니다. 이미 평가한 레그는 종목 문서의 ``hitsEvaluatedThrough`` 날짜부터만
+다시 보고, 목표가가 바뀐 레그와 새 레그는 레그 생성일부터 봅니다. 평가 기준이 된
+목표가는 레그의 ``hitTargetPrice``에 함께 저장합니다.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Mapping, Sequence
+
+import numpy as np
+
+from price_merge import date_key
+from price_series import PriceSeries
+
+_KST = timezone(timedelta(hours=9))
+
+Leg = Mapping[str, object]
+
+
+def first_hit_dates(
+    dates: np.ndarray,
+    lows: np.ndarray,
+    highs: np.ndarray,
+    targets: np.ndarray,
+    is_buy: np.ndarray,
+    start_keys: np.ndarray,
+) -> np.ndarray:
+    """레그마다 ``start_keys`` 날짜 이후 목표가에 처음 닿은 날짜(YYYYMMDD)를 반환합니다.
+
+    닿지 않은 레그는 0입니다. 거래 정지로 저가가 0인 봉은 매수 도달로 보지 않습니다.
+    """
+
+    if not len(dates) or not len(targets):
+        return np.zeros(len(targets), dtype=np.int64)
+
+    traded = lows > 0
+    touched = np.where(
+        is_buy[:, None],
+        (lows[None, :] <= targets[:, None]) & traded[None, :],
+        highs[None, :] >= targets[:, None],
+    )
+    touched &= dates[None, :] >= start_keys[:, None]
+    first = touched.argmax(axis=1)
+    hit = touched[np.arange(len(targets)), first]
+    return np.where(hit, dates[first], 0).astype(np.int64)
+
+
+def _created_key(value: object) -> int:
+    # Firestore 시각은 UTC이므로 한국 날짜로 바꿔야 생성 전날 봉을 잘못 보지 않습니다.
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(_KST)
+    return date_key(value) or 0
+
+
+def _iso(key: int) -> str:
+    return f"{key // 10000:04d}-{key // 100 % 100:02d}-{key % 100:02d}"
+
+
+def needs_evaluation(leg: Leg) -> bool:
+    """도달일이 확정되지 않았거나 목표가가 바뀐 레그인지 확인합니다."""
+
+    return not leg.get("hitDate") or leg.get("hitTargetPrice") != leg.get("targetPrice")
+
+
+def start_key(leg: Leg, evaluated_through: object = None) -> int:
+    """레그를 다시 볼 첫 날짜를 구합니다. 0이면 이력 처음부터입니다.
+
+    같은 목표가로 이미 평가한 레그는 ``evaluated_through``부터 보고(그날 봉이 장중에
+    바뀌었을 수 있어 포함합니다), 그 밖에는 레그 생성일부터 봅니다.
+    """
+
+    if evaluated_through and leg.get("hitTargetPrice") == leg.get("targetPrice"):
+        return date_key(evaluated_through) or 0
+    return _created_key(leg.get("createdAt"))
+
+
+def plan_leg_hits(
+    series: PriceSeries,
+    legs: Sequence[Leg],
+    evaluated_through: object = None,
+) -> List[Dict[str, object] | None]:
+    """레그별로 저장할 ``hitDate``/``hitTargetPrice`` 변경분을 계산합니다. 바뀔 것이 없으면 ``None``입니다."""
+
+    updates: List[Dict[str, object] | None] = [None] * len(legs)
+    pending = [
+        index
+        for index, leg in enumerate(legs)
+        if needs_evaluation(leg) and leg.get("type") in ("BUY", "SELL") and leg.get("targetPrice") is not None
+    ]
+    if not pending:
+        return updates
+
+    targets = np.array([float(legs[index]["targetPrice"]) for index in pending])  # type: ignore[arg-type]
+    hits = first_hit_dates(
+        series.column("dates").astype(np.int64),
+        series.column("low").astype(np.int64),
+        series.column("high").astype(np.int64),
+        targets,
+        np.array([legs[index].get("type") == "BUY" for index in pending]),
+        np.array([start_key(legs[index], evaluated_through) for index in pending], dtype=np.int64),
+    )
+
+    for index, hit in zip(pending, hits.tolist()):
+        leg = legs[index]
+        hit_date = _iso(hit) if hit else None
+        if hit_date == leg.get("hitDate") and leg.get("hitTargetPrice") == leg.get("targetPrice"):
+            continue
+        updates[index] = {"hitDate": hit_date, "hitTargetPrice": leg.get("targetPrice")}
+    return updates
@@ -0,0 +1,8 @@
+"""백엔드 모듈을 패키지 설치 없이 가져오도록 ``backend``를 경로에 추가합니다."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,62 @@
+"""``FirestoreWriteSink``의 BulkWriter 실패 콜백 테스트."""
+
+# pylint: disable=protected-access
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from firestore_writer import FirestoreWriteSink
+
+
+def _failure(path: str, attempts: int) -> SimpleNamespace:
+    """``BulkWriteFailure``처럼 문서를 ``operation.reference``로만 가리키는 실패."""
+
+    reference = SimpleNamespace(path=path, id=path.rsplit("/", 1)[-1])
+    return SimpleNamespace(operation=SimpleNamespace(reference=reference), code=14, message="unavailable", attempts=attempts)
+
+
+def test_write_error_retries_until_max_attempts() -> None:
+    sink = FirestoreWriteSink(SimpleNamespace(), max_attempts=3)
+
+    assert sink._on_write_error(_failure("stock_prices/005930", 1), None) is True
+    assert sink.stats.failed == 0
+    assert sink.stats.failed_paths == []
+
+
+def test_write_error_records_failed_path_after_last_attempt() -> None:
+    sink = FirestoreWriteSink(SimpleNamespace(), max_attempts=3)
+
+    assert sink._on_write_error(_failure("stock_prices/005930", 3), None) is False
+    assert sink.stats.failed == 1
+    assert sink.stats.failed_paths == ["stock_prices/005930"]
+
+
+class _Batch:
+    def __init__(self, commits: list) -> None:
+        self._commits = commits
+        self.operations: list = []
+
+    def set(self, doc_ref, data, merge=False) -> None:
+        self.operations.append(("set", doc_ref.path, merge))
+
+    def commit(self) -> None:
+        self._commits.append(self.operations)
+
+
+def test_commit_together_writes_one_batch_and_notifies_head_only() -> None:
+    commits: list = []
+    done: list = []
+    db = SimpleNamespace(batch=lambda: _Batch(commits))
+    sink = FirestoreWriteSink(db, on_success=done.append)
+    year_ref = SimpleNamespace(path="stock_prices/005930/years/2023")
+    head_ref = SimpleNamespace(path="stock_prices/005930")
+
+    sink.commit_together([
+        ("set", year_ref, {"prices": []}, {"notify": False}),
+        ("set", head_ref, {"ticker": "005930"}, {"merge": True}),
+    ])
+
+    assert commits == [[("set", year_ref.path, False), ("set", head_ref.path, True)]]
+    assert done == ["005930"]
+    assert sink.stats.succeeded == 2
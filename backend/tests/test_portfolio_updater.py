@@ -0,0 +1,34 @@
+"""``portfolio_updater``의 거래일 단위 전 종목 조회 테스트."""
+
+from __future__ import annotations
+
+from datetime import date
+
+import pandas as pd
+
+import portfolio_updater
+
+
+def _market_frame(close: int) -> pd.DataFrame:
+    index = pd.Index(["005930", "000660"], name="티커")
+    return pd.DataFrame(
+        {"시가": close, "고가": close, "저가": close, "종가": close, "거래량": close * 10},
+        index=index,
+    )
+
+
+def test_fetch_market_snapshots_skips_zero_filled_holiday(monkeypatch) -> None:
+    # 2024-10-09(수)는 한글날 휴장일이며, pykrx는 값이 모두 0인 표를 돌려줍니다.
+    frames = {"20241008": _market_frame(100), "20241009": _market_frame(0), "20241010": _market_frame(110)}
+    monkeypatch.setattr(
+        portfolio_updater.stock,
+        "get_market_ohlcv",
+        lambda day, market: frames[day],
+        raising=False,
+    )
+
+    snapshots = portfolio_updater.fetch_market_snapshots(date(2024, 10, 8), date(2024, 10, 10), ["005930"])
+
+    assert [key for key, _ in snapshots] == [20241008, 20241010]
+    prices = portfolio_updater.pivot_snapshots(snapshots)["005930"]
+    assert list(prices.close) == [100, 110]
@@ -4,12 +4,17 @@ import sys
 import time
 from typing import Dict, List, Tuple
 
-import pandas as pd
 import requests
-from bs4 import BeautifulSoup
 import firebase_admin
 from firebase_admin import credentials, firestore
 
+import http_client
+from freshness_ledger import latest_bar, open_ledger
+from naver_sise_parser import parse_sise_day, rows_to_records
+from price_merge import merge_price_records
+from price_storage import PRICE_STORAGE_MODE, STORAGE_MODE_CHUNKED, is_chunked, plan_chunked_update
+from stock_universe import load_stock_universe
+
 # --- 설정 부분 ---
 
 # 1. Firebase Admin SDK 초기화
@@ -46,50 +51,20 @@ def scrape_daily_prices(ticker):
         url = f"https://finance.naver.com/item/sise_day.naver?code={ticker}&page={page}"
         
         try:
-            response = requests.get(url, headers=headers)
+            response = http_client.get(url, headers=headers)
             response.raise_for_status() # HTTP 오류 발생 시 예외 발생
         except requests.exceptions.RequestException as e:
             print(f"    - [{ticker}] {page}페이지 요청 중 오류 발생: {e}")
             break # 오류 발생 시 해당 종목 중단
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # 데이터가 있는 tr 태그 찾기
-        data_rows = soup.select('table.type2 > tr[onmouseover]')
-        
+        # 일별 시세 표에서 (날짜, 시가, 고가, 저가, 종가, 거래량) 행을 추출
+        rows = parse_sise_day(response.text)
+
         # 데이터가 더 이상 없으면 중단
-        if not data_rows:
+        if not rows:
             break
 
-        for row in data_rows:
-            cols = row.find_all('td')
-            
-            # 비어있는 행은 건너뛰기
-            if len(cols) < 7:
-                continue
-
-            # 데이터 파싱
-            date_str = cols[0].get_text(strip=True)
-            if not date_str: # 날짜가 없는 행은 건너뛰기
-                continue
-                
-            close_price = int(cols[1].get_text(strip=True).replace(',', ''))
-            open_price = int(cols[3].get_text(strip=True).replace(',', ''))
-            high_price = int(cols[4].get_text(strip=True).replace(',', ''))
-            low_price = int(cols[5].get_text(strip=True).replace(',', ''))
-            volume = int(cols[6].get_text(strip=True).replace(',', ''))
-            
-            # 날짜 형식 변환 (YYYY.MM.DD -> YYYY-MM-DD)
-            formatted_date = date_str.replace('.', '-')
-
-            prices.append({
-                'date': formatted_date,
-                'open': open_price,
-                'high': high_price,
-                'low': low_price,
-                'close': close_price,
-                'volume': volume
-            })
+        prices.extend(rows_to_records(rows))
         
         # 서버에 부담을 주지 않기 위해 약간의 딜레이 추가
         time.sleep(0.3)
@@ -105,40 +80,68 @@ def merge_prices(
     기존 데이터와 신규 데이터를 날짜 기준으로 병합합니다.
 
     같은 날짜가 존재하면 최신 스크래핑 데이터로 갱신하고,
-    변경 건수를 함께 반환합니다.
+    변경 건수를 함께 반환합니다. 결과는 최근 데이터가 앞에 오는 내림차순입니다.
     """
 
-    merged: Dict[str, Dict[str, int | str]] = {}
-    for record in existing_prices:
-        date_key = str(record.get('date', '')).strip()
-        if date_key:
-            merged[date_key] = record
+    result = merge_price_records(existing_prices, new_prices, descending=True)
+    if not result.changed:
+        # 기존 데이터와 완전히 동일하면 정렬만 수행하지 않고 기존 순서를 유지합니다.
+        return existing_prices, 0
+    return result.records, result.changed  # type: ignore[return-value]
 
-    change_count = 0
-    for record in new_prices:
-        date_key = str(record.get('date', '')).strip()
-        if not date_key:
-            continue
 
-        if date_key not in merged or merged[date_key] != record:
-            merged[date_key] = record
-            change_count += 1
+def latest_price_fields(prices):
+    """화면과 알림이 먼저 보는 ``currentPrice``/``priceDate``를 최신 봉으로 맞춥니다."""
+
+    newest = latest_bar(prices)
+    if newest is None:
+        return {}
+    return {'currentPrice': newest.get('close'), 'priceDate': newest.get('date')}
 
-    if change_count == 0:
-        # 기존 데이터와 완전히 동일하면 정렬만 수행하지 않고 기존 순서를 유지합니다.
-        return existing_prices, 0
 
-    # 날짜 기준 내림차순 정렬 (최근 데이터가 앞으로 오도록)
-    merged_list = sorted(
-        merged.values(),
-        key=lambda item: str(item.get('date', '')),
-        reverse=True,
+def upload_chunked(doc_ref, ticker, name, existing_data, prices, ledger=None):
+    """연도 분할 저장 방식으로 바뀐 연도 문서와 헤드 문서만 한 배치로 씁니다."""
+
+    plan = plan_chunked_update(db, doc_ref, existing_data, prices)
+    if not plan.year_writes:
+        print(f"    - [{ticker}] {name}: 새로운 데이터가 없어 건너뜁니다.")
+        return
+    recent = plan.head_fields.get('prices') or prices
+
+    batch = db.batch()
+    # 연도 문서를 먼저 넣어 헤드가 가리키는 연도가 항상 존재하도록 합니다.
+    for year_ref, year_data in plan.year_writes:
+        batch.set(year_ref, year_data)
+    batch.set(
+        doc_ref,
+        {
+            'ticker': ticker,
+            'name': name,
+            **plan.head_fields,
+            **latest_price_fields(recent),
+            'updatedAt': firestore.SERVER_TIMESTAMP,
+        },
+        merge=True,
     )
-    return merged_list, change_count
 
+    try:
+        batch.commit()
+        print(
+            f"    - [{ticker}] {name}: {plan.changed}건 갱신, 연도 문서 {len(plan.year_writes)}개 저장 완료."
+        )
+        if ledger is not None:
+            ledger.record_prices(ticker, recent)
+    except Exception as e:
+        print(f"    - [{ticker}] {name}: Firestore 업로드 중 오류 발생: {e}")
+
+
+def upload_to_firestore(ticker, name, prices, ledger=None):
+    """스크래핑한 데이터를 Firestore에 누적 저장합니다.
 
-def upload_to_firestore(ticker, name, prices):
-    """스크래핑한 데이터를 Firestore에 누적 저장합니다."""
+    이미 연도 분할 형식인 문서이거나 ``PRICE_STORAGE_MODE``가 ``chunked``이면 헤드에 전체
+    이력을 넣지 않고 ``upload_chunked``로 연도 문서에 병합합니다. ``ledger``가 주어지면
+    쓴 종목의 최신 봉을 신선도 장부에 기록합니다(쓰기는 ``flush`` 때).
+    """
 
     if not prices:
         print(f"    - [{ticker}] {name}: 업로드할 데이터가 없습니다. 건너뜁니다.")
@@ -153,6 +156,10 @@ def upload_to_firestore(ticker, name, prices):
         existing_data = {}
         print(f"    - [{ticker}] {name}: 기존 데이터 조회 중 오류 발생: {e}")
 
+    if PRICE_STORAGE_MODE == STORAGE_MODE_CHUNKED or is_chunked(existing_data):
+        upload_chunked(doc_ref, ticker, name, existing_data, prices, ledger)
+        return
+
     existing_prices = list(existing_data.get('prices', [])) if existing_data else []
     merged_prices, change_count = merge_prices(existing_prices, prices)
 
@@ -164,6 +171,7 @@ def upload_to_firestore(ticker, name, prices):
         'ticker': ticker,
         'name': name,
         'prices': merged_prices,
+        **latest_price_fields(merged_prices),
         'updatedAt': firestore.SERVER_TIMESTAMP,
     }
 
@@ -172,6 +180,8 @@ def upload_to_firestore(ticker, name, prices):
         print(
             f"    - [{ticker}] {name}: {change_count}건 갱신, 총 {len(merged_prices)}일치 데이터 누적 저장 완료."
         )
+        if ledger is not None:
+            ledger.record_prices(ticker, merged_prices)
     except Exception as e:
         print(f"    - [{ticker}] {name}: Firestore 업로드 중 오류 발생: {e}")
 
@@ -181,11 +191,9 @@ def main():
     메인 실행 함수
     """
     try:
-        # 엑셀 파일 읽기 (실제 열 이름으로 수정)
-        df = pd.read_excel(STOCK_LIST_FILE, dtype={'단축코드': str})
-        # 단축코드가 6자리가 되도록 앞에 0을 채워줌
-        df['단축코드'] = df['단축코드'].str.zfill(6) 
-        print(f"✅ 총 {len(df)}개의 종목을 엑셀 파일에서 읽었습니다.")
+        # 종목 목록 읽기 (엑셀 해석 결과는 캐시되어 다음 실행부터 재사용됨)
+        universe = load_stock_universe(STOCK_LIST_FILE)
+        print(f"✅ 총 {len(universe)}개의 종목을 엑셀 파일에서 읽었습니다.")
     except FileNotFoundError:
         print(f"🔥 오류: '{STOCK_LIST_FILE}' 파일을 찾을 수 없습니다. 파일명과 경로를 확인하세요.")
         return
@@ -193,19 +201,24 @@ def main():
         print(f"🔥 엑셀 파일 읽기 오류: {e}")
         return
 
+    ledger = open_ledger(db)
+
     # 모든 종목에 대해 작업 수행
-    for index, row in df.iterrows():
-        # 실제 열 이름으로 수정
-        ticker = row['단축코드']
-        name = row['한글 종목약명']
-        
-        print(f"\n({index + 1}/{len(df)}) '{name}' ({ticker}) 데이터 수집 시작...")
-        
-        # 1. 데이터 스크래핑
-        daily_prices = scrape_daily_prices(ticker)
-        
-        # 2. Firestore에 업로드
-        upload_to_firestore(ticker, name, daily_prices)
+    try:
+        for index, item in enumerate(universe):
+            ticker = item['ticker']
+            name = item['name']
+
+            print(f"\n({index + 1}/{len(universe)}) '{name}' ({ticker}) 데이터 수집 시작...")
+
+            # 1. 데이터 스크래핑
+            daily_prices = scrape_daily_prices(ticker)
+
+            # 2. Firestore에 업로드
+            upload_to_firestore(ticker, name, daily_prices, ledger)
+    finally:
+        if ledger is not None:
+            ledger.flush()
 
     print("\n🎉 모든 종목에 대한 작업이 완료되었습니다.")
 
@@ -0,0 +1,274 @@
+"""관심 종목(``adminWatchlist``) 컬렉션을 메모리에 유지하는 증분 색인.
+
+처음 한 번만 컬렉션 전체를 읽고, 그 뒤로는 바뀐 문서만 반영합니다.
+
+* 기본은 ``on_snapshot`` 리스너로, Firestore가 추가·수정·삭제된 문서만 보내 줍니다.
+* 리스너를 붙일 수 없거나 도중에 끊기면 ``updatedAt`` 커서 이후에 수정된 문서만 조회하는
+  폴링으로 바꿉니다. 삭제는 커서로 알 수 없어 ``WATCHLIST_FULL_SYNC_SECONDS``마다 한 번
+  전체를 다시 읽어 맞춥니다.
+
+새로 생기거나 사라진 종목은 ``drain``으로 꺼내 갱신 큐에 반영합니다.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Mapping, Set, Tuple
+
+from google.cloud import firestore as google_firestore
+
+try:
+    from google.cloud.firestore_v1.base_query import FieldFilter
+except ImportError:  # pragma: no cover - 오래된 google-cloud-firestore
+    FieldFilter = None  # type: ignore[assignment,misc]
+
+LOGGER = logging.getLogger(__name__)
+
+WATCHLIST_LISTENER = os.getenv("WATCHLIST_LISTENER", "1").strip().lower() not in {"0", "false", "no"}
+WATCHLIST_LISTENER_TIMEOUT = float(os.getenv("WATCHLIST_LISTENER_TIMEOUT", "30"))
+WATCHLIST_POLL_SECONDS = max(5, int(os.getenv("WATCHLIST_POLL_SECONDS", "60")))
+WATCHLIST_FULL_SYNC_SECONDS = max(WATCHLIST_POLL_SECONDS, int(os.getenv("WATCHLIST_FULL_SYNC_SECONDS", "1800")))
+
+MODE_LISTENER = "listener"
+MODE_POLLING = "polling"
+
+
+def watchlist_entry(data: Mapping[str, object] | None) -> Tuple[str, str] | None:
+    """관심 종목 문서에서 (티커, 종목명)을 꺼냅니다. 티커가 없으면 ``None``입니다."""
+
+    data = data or {}
+    ticker = str(data.get("ticker", "")).strip().upper()
+    if not ticker:
+        return None
+    name = str(data.get("name") or data.get("company") or "").strip()
+    return ticker, name
+
+
+class WatchlistIndex:
+    """문서 ID별 (티커, 종목명)과 티커별 종목명을 메모리에 들고 있는 색인.
+
+    리스너 콜백은 Firestore 감시 스레드에서 불리므로 모든 상태는 ``_lock`` 아래에서 바꿉니다.
+    ``on_change``는 종목이 추가되거나 빠졌을 때 그 스레드에서 호출되며, 갱신 루프를 깨우는
+    용도로만 씁니다.
+    """
+
+    def __init__(
+        self,
+        db: google_firestore.Client,
+        collection: str,
+        on_change: Callable[[], None] | None = None,
+        use_listener: bool = WATCHLIST_LISTENER,
+    ) -> None:
+        self._collection_ref = db.collection(collection)
+        self._on_change = on_change
+        self._use_listener = use_listener
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._watch = None
+        self.mode = MODE_POLLING
+
+        self._docs: Dict[str, Tuple[str, str]] = {}
+        self._doc_ids: Dict[str, Set[str]] = {}
+        self._names: Dict[str, str] = {}
+        self._added: Dict[str, None] = {}
+        self._removed: Set[str] = set()
+        self._cursor: datetime | None = None
+        self._next_full_sync = 0.0
+        self.reads = 0
+
+    # --- 조회 -------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._names)
+
+    def __contains__(self, ticker: object) -> bool:
+        with self._lock:
+            return ticker in self._names
+
+    def name_of(self, ticker: str) -> str | None:
+        with self._lock:
+            return self._names.get(ticker)
+
+    def entries(self) -> List[Tuple[str, str]]:
+        """(티커, 종목명) 목록을 티커 순으로 반환합니다."""
+
+        with self._lock:
+            return sorted(self._names.items())
+
+    def drain(self) -> Tuple[List[str], List[str]]:
+        """지난 호출 이후 새로 생긴 종목과 빠진 종목을 꺼냅니다."""
+
+        with self._lock:
+            added, removed = list(self._added), sorted(self._removed)
+            self._added.clear()
+            self._removed.clear()
+        return added, removed
+
+    # --- 시작·종료 ---------------------------------------------------------------------
+
+    def start(self) -> "WatchlistIndex":
+        """처음 목록을 읽어 들입니다. 가능하면 리스너를 붙이고, 아니면 폴링으로 시작합니다."""
+
+        if self._use_listener and self._start_listener():
+            return self
+        self._full_sync(record=False)
+        return self
+
+    def close(self) -> None:
+        watch, self._watch = self._watch, None
+        if watch is not None:
+            try:
+                watch.unsubscribe()
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.debug("관심 종목 리스너를 해제하지 못했습니다.", exc_info=True)
+
+    def __enter__(self) -> "WatchlistIndex":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _start_listener(self) -> bool:
+        try:
+            self._watch = self._collection_ref.on_snapshot(self._on_snapshot)
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.warning("관심 종목 리스너를 붙이지 못해 폴링으로 추적합니다.", exc_info=True)
+            return False
+        if not self._ready.wait(WATCHLIST_LISTENER_TIMEOUT):
+            LOGGER.warning(
+                "관심 종목 리스너가 %.0f초 안에 응답하지 않아 폴링으로 추적합니다.", WATCHLIST_LISTENER_TIMEOUT
+            )
+            self.close()
+            return False
+        self.mode = MODE_LISTENER
+        LOGGER.info("관심 종목 %d개를 리스너로 추적합니다.", len(self))
+        return True
+
+    # --- 변경 반영 ---------------------------------------------------------------------
+
+    def poll(self, now: float | None = None) -> None:
+        """폴링 모드이면 ``updatedAt`` 커서 이후 바뀐 문서를 읽어 반영합니다.
+
+        리스너 모드에서는 리스너가 끊겼는지만 확인하고, 끊겼으면 전체를 다시 읽은 뒤
+        폴링으로 바꿉니다.
+        """
+
+        now = time.time() if now is None else now
+        if self.mode == MODE_LISTENER:
+            if self._watch is not None and getattr(self._watch, "is_active", True):
+                return
+            LOGGER.warning("관심 종목 리스너가 끊겨 폴링으로 전환합니다.")
+            self.close()
+            self.mode = MODE_POLLING
+            self._full_sync(record=True, now=now)
+            return
+
+        if self._cursor is None or now >= self._next_full_sync:
+            self._full_sync(record=True, now=now)
+            return
+
+        if FieldFilter is not None:
+            query = self._collection_ref.where(filter=FieldFilter("updatedAt", ">", self._cursor))
+        else:  # pragma: no cover - 오래된 google-cloud-firestore
+            query = self._collection_ref.where("updatedAt", ">", self._cursor)
+        changed = False
+        for snapshot in query.stream():
+            self.reads += 1
+            with self._lock:
+                changed |= self._upsert_locked(snapshot.id, snapshot.to_dict(), record=True)
+        if changed:
+            self._notify()
+
+    def _full_sync(self, record: bool, now: float | None = None) -> None:
+        seen: Set[str] = set()
+        changed = False
+        for snapshot in self._collection_ref.stream():
+            self.reads += 1
+            seen.add(snapshot.id)
+            with self._lock:
+                changed |= self._upsert_locked(snapshot.id, snapshot.to_dict(), record=record)
+        with self._lock:
+            for doc_id in set(self._docs) - seen:
+                changed |= self._remove_locked(doc_id, record=record)
+        self._next_full_sync = (time.time() if now is None else now) + WATCHLIST_FULL_SYNC_SECONDS
+        if changed and record:
+            self._notify()
+
+    def _on_snapshot(self, _docs: object, changes: List[object], _read_time: object) -> None:
+        # 첫 콜백은 컬렉션 전체가 ADDED로 들어오는 초기 목록이므로 새 종목으로 치지 않습니다.
+        record = self._ready.is_set()
+        changed = False
+        try:
+            with self._lock:
+                for change in changes:
+                    document = change.document  # type: ignore[attr-defined]
+                    self.reads += 1
+                    if change.type.name == "REMOVED":  # type: ignore[attr-defined]
+                        changed |= self._remove_locked(document.id, record=record)
+                    else:
+                        changed |= self._upsert_locked(document.id, document.to_dict(), record=record)
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.exception("관심 종목 변경을 반영하지 못했습니다.")
+        finally:
+            self._ready.set()
+        if changed and record:
+            self._notify()
+
+    def _notify(self) -> None:
+        if self._on_change is not None:
+            self._on_change()
+
+    def _upsert_locked(self, doc_id: str, data: Mapping[str, object] | None, record: bool) -> bool:
+        updated_at = (data or {}).get("updatedAt")
+        if isinstance(updated_at, datetime) and (self._cursor is None or updated_at > self._cursor):
+            self._cursor = updated_at
+
+        entry = watchlist_entry(data)
+        previous = self._docs.get(doc_id)
+        if entry == previous:
+            return False
+        if entry is None:
+            return self._remove_locked(doc_id, record=record)
+
+        self._docs[doc_id] = entry
+        if previous is not None and previous[0] != entry[0]:
+            self._doc_ids[previous[0]].discard(doc_id)
+        self._doc_ids.setdefault(entry[0], set()).add(doc_id)
+        changed = self._refresh_ticker_locked(entry[0], record)
+        if previous is not None and previous[0] != entry[0]:
+            changed |= self._refresh_ticker_locked(previous[0], record)
+        return changed
+
+    def _remove_locked(self, doc_id: str, record: bool) -> bool:
+        previous = self._docs.pop(doc_id, None)
+        if previous is None:
+            return False
+        self._doc_ids.get(previous[0], set()).discard(doc_id)
+        return self._refresh_ticker_locked(previous[0], record)
+
+    def _refresh_ticker_locked(self, ticker: str, record: bool) -> bool:
+        """티커를 가리키는 문서들로 종목명을 다시 정하고, 종목이 생기거나 빠졌으면 참을 반환합니다."""
+
+        doc_ids = self._doc_ids.get(ticker)
+        if not doc_ids:
+            self._doc_ids.pop(ticker, None)
+            if self._names.pop(ticker, None) is None:
+                return False
+            if record:
+                self._added.pop(ticker, None)
+                self._removed.add(ticker)
+            return True
+
+        names = [self._docs[doc_id][1] for doc_id in sorted(doc_ids)]
+        name = next((value for value in names if value), ticker)
+        is_new = ticker not in self._names
+        self._names[ticker] = name
+        if is_new and record:
+            self._removed.discard(ticker)
+            self._added[ticker] = None
+        return is_new
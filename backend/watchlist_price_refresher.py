@@ -2,15 +2,39 @@
 
 from __future__ import annotations
 
+import argparse
+import heapq
+import itertools
 import logging
 import os
-from datetime import datetime, time, timedelta, timezone
-from typing import Dict, Iterable, List, Tuple
+import threading
+import time as time_module
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Sequence, Tuple
 
 from firebase_admin import firestore
 from google.cloud import firestore as google_firestore
 
-from daily_price_uploader import initialize_firestore, is_korean_trading_day, scrape_daily_prices
+from daily_price_uploader import (
+    NAVER_HEADERS,
+    RATE_LIMITER,
+    find_resume_date,
+    has_trading_day_between,
+    initialize_firestore,
+    is_korean_trading_day,
+    prefetch_documents,
+    scrape_daily_prices,
+)
+from freshness_ledger import FreshnessLedger, latest_bar, open_ledger
+from naver_realtime import RealtimeQuote, fetch_realtime_quotes
+from price_merge import merge_price_records
+from price_storage import (
+    HEAD_SUMMARY_FIELDS,
+    PRICE_STORAGE_MODE,
+    STORAGE_MODE_CHUNKED,
+    plan_chunked_update,
+)
+from watchlist_index import WATCHLIST_POLL_SECONDS, WatchlistIndex, watchlist_entry
 
 try:  # Python 3.9+
     from zoneinfo import ZoneInfo
@@ -24,8 +48,17 @@ WATCHLIST_COLLECTION = os.getenv("WATCHLIST_COLLECTION", "adminWatchlist")
 STOCK_PRICE_COLLECTION = os.getenv("STOCK_PRICE_COLLECTION", "stock_prices")
 REFRESH_INTERVAL_MINUTES = int(os.getenv("WATCHLIST_REFRESH_INTERVAL_MINUTES", "30"))
 SCRAPE_PAGES_PER_TICKER = int(os.getenv("WATCHLIST_SCRAPE_PAGES", "1"))
+# 장중에는 실시간 시세 API로 여러 종목의 오늘 봉을 한꺼번에 갱신합니다. "0"이면 항상 sise_day를 읽습니다.
+REALTIME_QUOTES = os.getenv("WATCHLIST_REALTIME_QUOTES", "1").strip().lower() not in {"0", "false", "no"}
+# 갱신 여부 판단에는 타임스탬프만, 실제 갱신에는 병합에 필요한 필드만 읽습니다.
+FRESHNESS_FIELD_MASK = ["intradayRefreshedAt", "updatedAt"]
+REFRESH_FIELD_MASK = ["prices", "name", "gapsCheckedThrough", *FRESHNESS_FIELD_MASK, *HEAD_SUMMARY_FIELDS]
+PRICE_DATE_FIELDS = ("date", "tradeDate", "timestamp")
 TRADING_START = time(hour=9)
 TRADING_END = time(hour=17)
+# 데몬 모드 설정: 한 번에 꺼내 처리할 최대 종목 수, 관심 종목 목록 재조회 주기, 실패 시 재시도 간격
+DAEMON_BATCH_SIZE = max(1, int(os.getenv("WATCHLIST_DAEMON_BATCH_SIZE", "20")))
+DAEMON_RETRY_SECONDS = float(os.getenv("WATCHLIST_DAEMON_RETRY_SECONDS", "60"))
 
 if ZoneInfo:
     KST = ZoneInfo("Asia/Seoul")
@@ -80,77 +113,24 @@ def _normalise_timestamp(value) -> datetime | None:
     return dt.astimezone(KST)
 
 
-def _normalise_date_key(entry: Dict[str, object]) -> Tuple[int, object]:
-    """가격 항목에서 정렬 기준으로 사용할 키를 추출합니다."""
-
-    for key in ("date", "tradeDate", "timestamp"):
-        if key in entry and entry[key]:
-            value = entry[key]
-            if isinstance(value, (int, float)):
-                return (0, float(value))
-            text = str(value).strip()
-            if not text:
-                continue
-            for fmt in ("%Y-%m-%d", "%Y.%m.%d", "%Y/%m/%d", "%Y%m%d"):
-                try:
-                    parsed = datetime.strptime(text, fmt)
-                    return (0, parsed.timestamp())
-                except ValueError:
-                    continue
-            try:
-                parsed = datetime.fromisoformat(text)
-                return (0, parsed.timestamp())
-            except ValueError:
-                pass
-            return (1, text)
-    return (2, "")
-
-
 def merge_price_entries(
     existing_prices: Iterable[Dict[str, object]] | None,
     new_prices: Iterable[Dict[str, object]] | None,
 ) -> Tuple[List[Dict[str, object]], bool]:
-    """기존 가격 데이터와 신규 데이터를 병합해 최신순으로 정렬합니다."""
+    """기존 가격 데이터와 신규 데이터를 병합해 최신순으로 정렬합니다.
 
-    merged_map: Dict[Tuple[int, object], Dict[str, object]] = {}
-    changed = False
+    같은 날짜의 항목은 기존 필드 위에 신규 필드를 덮어쓰며, 기존 목록의 순서를
+    바로잡아야 했던 경우도 변경으로 봅니다.
+    """
 
-    if existing_prices:
-        for record in existing_prices:
-            sort_key = _normalise_date_key(record)
-            if sort_key[0] == 2:
-                continue
-            merged_map[sort_key] = dict(record)
-
-    if new_prices:
-        for record in new_prices:
-            sort_key = _normalise_date_key(record)
-            if sort_key[0] == 2:
-                continue
-            base_record = merged_map.get(sort_key, {})
-            merged_record = {**base_record, **record}
-            if "date" not in merged_record and sort_key[0] == 0:
-                merged_record["date"] = record.get("date")
-            if merged_map.get(sort_key) != merged_record:
-                merged_map[sort_key] = merged_record
-                changed = True
-
-    sorted_entries = [
-        merged_map[key]
-        for key in sorted(merged_map.keys(), reverse=True)
-    ]
-
-    if not changed and existing_prices is not None:
-        existing_list = list(existing_prices)
-        if len(existing_list) != len(sorted_entries):
-            changed = True
-        else:
-            for left, right in zip(sorted_entries, existing_list):
-                if left != right:
-                    changed = True
-                    break
-
-    return sorted_entries, changed
+    result = merge_price_records(
+        existing_prices,
+        new_prices,
+        descending=True,
+        overlay=True,
+        fields=PRICE_DATE_FIELDS,
+    )
+    return result.records, bool(result.changed or result.reordered)  # type: ignore[return-value]
 
 
 def should_run_now(now: datetime | None = None) -> bool:
@@ -197,50 +177,121 @@ def fetch_watchlist_entries(db: google_firestore.Client) -> List[Tuple[str, str]
     snapshot = db.collection(WATCHLIST_COLLECTION).stream()
     aggregated: Dict[str, str] = {}
     for doc_snap in snapshot:
-        data = doc_snap.to_dict() or {}
-        ticker = str(data.get("ticker", "")).strip().upper()
-        if not ticker:
+        entry = watchlist_entry(doc_snap.to_dict())
+        if entry is None:
             continue
-        name = str(data.get("name") or data.get("company") or "").strip()
+        ticker, name = entry
         existing_name = aggregated.get(ticker)
         if not existing_name or (not existing_name.strip() and name):
             aggregated[ticker] = name or ticker
     return sorted(aggregated.items(), key=lambda item: item[0])
 
 
+def can_apply_quote(
+    existing_prices: Iterable[Dict[str, object]] | None,
+    trade_date: date,
+    checked_through: object = None,
+) -> bool:
+    """저장된 시세가 ``trade_date`` 직전 거래일까지 빈틈없이 이어져 오늘 봉만 덧붙여도 되는지 확인합니다.
+
+    ``checked_through``(``gapsCheckedThrough``) 이전의 빈 구간은 이미 확인된 거래 정지 등으로 봅니다.
+    """
+
+    resume = find_resume_date(existing_prices, checked_through=checked_through)
+    if resume is None:
+        return False
+    try:
+        last_date = date.fromisoformat(resume)
+    except ValueError:
+        return False
+    return last_date <= trade_date and not has_trading_day_between(last_date, trade_date)
+
+
+def fetch_quotes(tickers: Sequence[str]) -> Dict[str, RealtimeQuote]:
+    if not REALTIME_QUOTES or not tickers:
+        return {}
+    return fetch_realtime_quotes(tickers, rate_limiter=RATE_LIMITER, headers=NAVER_HEADERS)
+
+
 def refresh_single_ticker(
     db: google_firestore.Client,
     ticker: str,
     name: str,
     now: datetime,
-) -> None:
-    """단일 관심 종목의 가격 정보를 갱신합니다."""
+    existing_data: Dict[str, object] | None = None,
+    ledger: FreshnessLedger | None = None,
+    quote: RealtimeQuote | None = None,
+) -> bool:
+    """단일 관심 종목의 가격 정보를 갱신하고 실제로 수집했는지 반환합니다.
+
+    ``existing_data``가 주어지면 미리 읽어 둔 문서로 보고 개별 조회를 생략합니다.
+    ``ledger``가 주어지면 갱신 시각과 최신 봉을 신선도 장부에 기록합니다(쓰기는 ``flush`` 때).
+    ``quote``가 주어지고 저장된 시세에 빈 거래일이 없으면 sise_day를 읽지 않고 실시간
+    시세로 오늘 봉과 ``currentPrice``만 갱신합니다.
+    """
 
     doc_ref = db.collection(STOCK_PRICE_COLLECTION).document(ticker)
-    snapshot = doc_ref.get()
-    existing_data = snapshot.to_dict() if snapshot.exists else {}
+    if existing_data is None:
+        snapshot = doc_ref.get()
+        existing_data = snapshot.to_dict() if snapshot.exists else {}
 
     if not should_refresh(existing_data, now):
         LOGGER.info("%s: 최근에 갱신되어 건너뜁니다.", ticker)
-        return
-
-    prices = scrape_daily_prices(ticker, pages_to_scrape=SCRAPE_PAGES_PER_TICKER)
-    if not prices:
-        LOGGER.warning("%s: 네이버 금융에서 데이터를 가져오지 못했습니다.", ticker)
-        return
+        return False
 
     existing_prices = existing_data.get("prices")
     if not isinstance(existing_prices, list):
         existing_prices = []
 
-    merged_prices, changed = merge_price_entries(existing_prices, prices)
-
     updates: Dict[str, object] = {
         "ticker": ticker,
         "name": name or existing_data.get("name") or ticker,
         "intradayRefreshedAt": firestore.SERVER_TIMESTAMP,
     }
 
+    trade_date = (quote.as_of or now).astimezone(KST).date() if quote is not None else now.date()
+    use_quote = quote is not None and quote.price > 0 and can_apply_quote(
+        existing_prices, trade_date, existing_data.get("gapsCheckedThrough")
+    )
+    source = " (실시간 시세)" if use_quote else ""
+    if use_quote:
+        bar = quote.today_bar(trade_date.isoformat())  # type: ignore[union-attr]
+        # 아직 체결이 없으면 봉은 건드리지 않고 현재가만 갱신합니다.
+        prices: List[Dict[str, object]] = [bar] if bar else []
+        updates["currentPrice"] = quote.price  # type: ignore[union-attr]
+        # priceDate는 다른 작성기와 같은 YYYY-MM-DD 날짜로 두고, 장중 시각은 따로 남깁니다.
+        updates["priceDate"] = trade_date.isoformat()
+        updates["priceAsOf"] = quote.as_of or now  # type: ignore[union-attr]
+    else:
+        prices = scrape_daily_prices(ticker, pages_to_scrape=SCRAPE_PAGES_PER_TICKER)  # type: ignore[assignment]
+        if not prices:
+            LOGGER.warning("%s: 네이버 금융에서 데이터를 가져오지 못했습니다.", ticker)
+            return False
+        newest = latest_bar(prices)
+        if newest is not None:
+            updates["currentPrice"] = newest.get("close")
+            updates["priceDate"] = newest.get("date")
+
+    if PRICE_STORAGE_MODE == STORAGE_MODE_CHUNKED:
+        plan = plan_chunked_update(db, doc_ref, existing_data, prices)
+        if plan.year_writes:
+            updates.update(plan.head_fields)
+            updates["updatedAt"] = firestore.SERVER_TIMESTAMP
+        # 연도 문서와 헤드가 어긋나지 않도록 한 배치로 커밋합니다.
+        batch = db.batch()
+        for year_ref, year_data in plan.year_writes:
+            batch.set(year_ref, year_data)
+        batch.set(doc_ref, updates, merge=True)
+        batch.commit()
+        if ledger is not None:
+            ledger.record_prices(ticker, updates.get("prices") or existing_data.get("prices") or prices)
+        LOGGER.info(
+            "%s: %d건 가격 정보 반영 (연도 문서 %d개)%s", ticker, plan.changed, len(plan.year_writes), source
+        )
+        return True
+
+    merged_prices, changed = merge_price_entries(existing_prices, prices)
+
     if changed or not existing_data:
         updates.update(
             {
@@ -249,18 +300,232 @@ def refresh_single_ticker(
             }
         )
 
-    LOGGER.info("%s: %d건 가격 정보 반영", ticker, len(merged_prices))
+    LOGGER.info("%s: %d건 가격 정보 반영%s", ticker, len(merged_prices), source)
     doc_ref.set(updates, merge=True)
+    if ledger is not None:
+        ledger.record_prices(ticker, merged_prices)
+    return True
+
+
+class RefreshQueue:
+    """다음 갱신 예정 시각(유닉스 초) 순으로 종목을 꺼내 주는 우선순위 큐.
+
+    같은 종목을 다시 넣으면 이전 예정 시각은 무시되고, ``discard``한 종목은 꺼내지지
+    않습니다. 예정 시각이 같으면 먼저 넣은 종목이 먼저 나옵니다.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, str]] = []
+        self._due: Dict[str, float] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, ticker: object) -> bool:
+        return ticker in self._due
+
+    def push(self, ticker: str, due_at: float) -> None:
+        self._due[ticker] = due_at
+        heapq.heappush(self._heap, (due_at, next(self._counter), ticker))
 
+    def discard(self, ticker: str) -> None:
+        self._due.pop(ticker, None)
 
-def main() -> int:
+    def _prune(self) -> None:
+        while self._heap and self._due.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def next_due(self) -> float | None:
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float, limit: int | None = None) -> List[str]:
+        """``now``까지 예정된 종목을 최대 ``limit``개 꺼냅니다."""
+
+        due: List[str] = []
+        while limit is None or len(due) < limit:
+            self._prune()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            _, _, ticker = heapq.heappop(self._heap)
+            del self._due[ticker]
+            due.append(ticker)
+        return due
+
+
+def load_freshness(
+    db: google_firestore.Client,
+    ledger: FreshnessLedger | None,
+    tickers: Sequence[str],
+) -> Dict[str, Dict[str, object] | None]:
+    """종목별 마지막 갱신 시각을 ``should_refresh``가 받는 형태로 읽습니다.
+
+    신선도 장부에서 먼저 찾고, 장부에 없는 종목만 시세 문서의 시각 필드를 읽습니다.
+    """
+
+    freshness: Dict[str, Dict[str, object] | None] = {}
+    if ledger is not None:
+        try:
+            recorded = ledger.read(tickers)
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.warning("신선도 장부를 읽지 못해 시세 문서에서 확인합니다.", exc_info=True)
+            recorded = {}
+        for ticker, entry in recorded.items():
+            freshness[ticker] = {"intradayRefreshedAt": entry.get("refreshedAt")}
+    missing = [ticker for ticker in tickers if ticker not in freshness]
+    if missing:
+        freshness.update(
+            prefetch_documents(db, STOCK_PRICE_COLLECTION, missing, field_paths=FRESHNESS_FIELD_MASK)
+        )
+    return freshness
+
+
+def next_due_time(existing_data: Dict[str, object] | None, now: float) -> float:
+    """마지막 갱신 시각에 ``REFRESH_INTERVAL_MINUTES``를 더한 다음 갱신 예정 시각을 구합니다."""
+
+    if not existing_data:
+        return now
+    last_refresh = existing_data.get("intradayRefreshedAt")
+    if last_refresh is None:
+        last_refresh = existing_data.get("updatedAt")
+    last_dt = _normalise_timestamp(last_refresh)
+    if last_dt is None:
+        return now
+    # 시계가 어긋나 갱신 시각이 미래로 기록돼 있어도 간격 이상 미루지 않습니다.
+    return min(now, last_dt.timestamp()) + REFRESH_INTERVAL_MINUTES * 60
+
+
+def schedule_tickers(
+    db: google_firestore.Client,
+    queue: RefreshQueue,
+    tickers: Sequence[str],
+    now: float,
+    ledger: FreshnessLedger | None = None,
+) -> None:
+    """저장된 갱신 시각을 한 번에 읽어 각 종목의 다음 갱신 예정 시각을 큐에 넣습니다."""
+
+    freshness = load_freshness(db, ledger, tickers)
+    for ticker in tickers:
+        queue.push(ticker, next_due_time(freshness.get(ticker), now))
+
+
+def trading_session_end(now: datetime) -> float:
+    return datetime.combine(now.date(), TRADING_END, tzinfo=KST).timestamp()
+
+
+def run_daemon(db: google_firestore.Client, stop_event: threading.Event | None = None) -> int:
+    """거래 시간 동안 떠 있으면서 종목마다 갱신 예정 시각에 맞춰 시세를 갱신합니다.
+
+    Firestore 클라이언트와 HTTP 연결 풀을 계속 재사용하고, 관심 종목은 ``WatchlistIndex``로
+    바뀐 문서만 받아 반영합니다. 새 종목은 큐 맨 앞에 넣어 바로 갱신하고, 그 밖에는 다음 예정
+    시각까지 잠들었다가 깨어납니다. 장이 끝나거나 ``stop_event``가 설정되면 종료합니다.
+    """
+
+    stop_event = stop_event or threading.Event()
+    wake = threading.Event()
+    index = WatchlistIndex(db, WATCHLIST_COLLECTION, on_change=wake.set).start()
+    ledger = open_ledger(db)
+    queue = RefreshQueue()
+    schedule_tickers(db, queue, [ticker for ticker, _ in index.entries()], time_module.time(), ledger)
+    next_poll = time_module.time() + WATCHLIST_POLL_SECONDS
+    refreshed = failed = 0
+    LOGGER.info(
+        "데몬 모드로 관심 종목 %d개를 %d분 간격으로 갱신합니다 (관심 종목 추적: %s).",
+        len(index),
+        REFRESH_INTERVAL_MINUTES,
+        index.mode,
+    )
+
+    try:
+        while not stop_event.is_set():
+            now_dt = datetime.now(tz=KST)
+            if not should_run_now(now_dt):
+                break
+            now = now_dt.timestamp()
+
+            if now >= next_poll:
+                index.poll(now)
+                next_poll = now + WATCHLIST_POLL_SECONDS
+            added, removed = index.drain()
+            for ticker in removed:
+                queue.discard(ticker)
+            if added:
+                LOGGER.info("관심 종목 %d개가 추가되었습니다: %s", len(added), ", ".join(added))
+                for ticker in added:
+                    queue.push(ticker, 0.0)
+
+            due = queue.pop_due(now, limit=DAEMON_BATCH_SIZE)
+            if due:
+                documents = prefetch_documents(db, STOCK_PRICE_COLLECTION, due, field_paths=REFRESH_FIELD_MASK)
+                quotes = fetch_quotes(due)
+                for ticker in due:
+                    existing_data = (documents[ticker] or {}) if ticker in documents else None
+                    try:
+                        if refresh_single_ticker(
+                            db,
+                            ticker,
+                            index.name_of(ticker) or ticker,
+                            now_dt,
+                            existing_data,
+                            ledger,
+                            quotes.get(ticker),
+                        ):
+                            refreshed += 1
+                        queue.push(ticker, time_module.time() + REFRESH_INTERVAL_MINUTES * 60)
+                    except Exception as exc:  # pylint: disable=broad-except
+                        failed += 1
+                        LOGGER.exception("%s 갱신 중 오류 발생: %s", ticker, exc)
+                        queue.push(ticker, time_module.time() + DAEMON_RETRY_SECONDS)
+                if ledger is not None:
+                    ledger.flush()
+                continue
+
+            next_due = queue.next_due()
+            wake_at = min(
+                next_due if next_due is not None else float("inf"),
+                next_poll,
+                trading_session_end(now_dt),
+            )
+            wake.wait(max(0.0, wake_at - time_module.time()))
+            wake.clear()
+    finally:
+        index.close()
+        if ledger is not None:
+            ledger.flush()
+
+    LOGGER.info(
+        "데몬 모드를 종료합니다 (갱신 %d건, 실패 %d건, 관심 종목 문서 읽기 %d건).",
+        refreshed,
+        failed,
+        index.reads,
+    )
+    return 0
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="관심 종목 주가를 네이버 금융에서 갱신합니다.")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        default=os.getenv("WATCHLIST_DAEMON", "").strip().lower() in {"1", "true", "yes"},
+        help="거래 시간 동안 계속 실행하며 종목별 갱신 예정 시각에 맞춰 갱신합니다.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
     """스크립트 실행 진입점."""
 
+    args = parse_args(argv)
     now = datetime.now(tz=KST)
     if not should_run_now(now):
         return 0
 
     db = initialize_firestore()
+    if args.daemon:
+        return run_daemon(db)
+
     entries = fetch_watchlist_entries(db)
     if not entries:
         LOGGER.info("관심 종목이 없어 작업을 종료합니다.")
@@ -268,12 +533,38 @@ def main() -> int:
 
     LOGGER.info("총 %d개 관심 종목 가격을 갱신합니다.", len(entries))
 
-    for ticker, name in entries:
+    tickers = [ticker for ticker, _ in entries]
+    ledger = open_ledger(db)
+    freshness = load_freshness(db, ledger, tickers)
+    due_entries = [
+        (ticker, name)
+        for ticker, name in entries
+        if ticker not in freshness or should_refresh(freshness[ticker], now)
+    ]
+    skipped = len(entries) - len(due_entries)
+    if skipped:
+        LOGGER.info("최근에 갱신된 %d개 종목은 건너뜁니다.", skipped)
+
+    documents = prefetch_documents(
+        db,
+        STOCK_PRICE_COLLECTION,
+        [ticker for ticker, _ in due_entries],
+        field_paths=REFRESH_FIELD_MASK,
+    )
+    quotes = fetch_quotes([ticker for ticker, _ in due_entries])
+    if quotes:
+        LOGGER.info("실시간 시세 %d개 종목을 받았습니다.", len(quotes))
+
+    for ticker, name in due_entries:
+        existing_data = (documents[ticker] or {}) if ticker in documents else None
         try:
-            refresh_single_ticker(db, ticker, name, now)
+            refresh_single_ticker(db, ticker, name, now, existing_data, ledger, quotes.get(ticker))
         except Exception as exc:  # pylint: disable=broad-except
             LOGGER.exception("%s 갱신 중 오류 발생: %s", ticker, exc)
 
+    if ledger is not None:
+        ledger.flush()
+
     LOGGER.info("관심 종목 가격 갱신이 완료되었습니다.")
     return 0
 